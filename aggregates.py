@@ -0,0 +1,267 @@
+import numpy as np
+from blocks import openJobs
+from columns import JobColumns
+from expressions import Expression, parseStat
+from filters import columnKeys, partitionColumns, partitionKeys
+from jobstore import JobBuffer, Selection, decompressJob
+from typing import Dict, Iterable, List, Optional, Union, cast
+import ujson
+
+
+class GroupStats:
+    """
+    The count, sum and sum of squares of a stat for every key of a field, gathered in one scan.
+
+    A job counts toward the group of every key it holds, so a job is in the
+    groups of all four players' weapons. The same three sums are kept over every
+    job, so the jobs without a key are the totals minus its group and never need
+    a scan of their own. Jobs without a value for the stat are left out of every
+    sum. ``names`` holds the localized names of the keys where the jobs have
+    them.
+
+    :Example:
+
+    >>> import aggregates
+    >>> import core
+    >>> jobs = core.loadJobsFromFile("data/salmonAll.jl.gz", header=True)
+    >>> weapons = aggregates.groupStats("mem", jobs, "weapons", "clear_waves")
+    >>> difference = weapons.mean("splatscope") - weapons.meanWithout("splatscope")
+
+    """
+
+    __slots__ = [
+        "counts",
+        "sums",
+        "squares",
+        "totalCount",
+        "totalSum",
+        "totalSquares",
+        "names",
+    ]
+
+    def __init__(self):
+        self.counts: Dict[str, float] = {}
+        self.sums: Dict[str, float] = {}
+        self.squares: Dict[str, float] = {}
+        self.totalCount: float = 0.0
+        self.totalSum: float = 0.0
+        self.totalSquares: float = 0.0
+        self.names: Dict[str, Dict[str, str]] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.counts
+
+    def __iter__(self):
+        return iter(self.counts)
+
+    def add(self, keys: Iterable[str], value: float) -> None:
+        """
+        Count one job.
+
+        :param keys: the keys the job holds
+        :type keys: Iterable[str]
+        :param value: the job's value of the stat, or NaN if it has none
+        :type value: float
+
+        """
+        if value != value:
+            return
+        self.totalCount += 1.0
+        self.totalSum += value
+        self.totalSquares += value * value
+        for key in keys:
+            if key not in self.counts:
+                self.counts[key] = 0.0
+                self.sums[key] = 0.0
+                self.squares[key] = 0.0
+            self.counts[key] += 1.0
+            self.sums[key] += value
+            self.squares[key] += value * value
+
+    def count(self, key: str) -> float:
+        return self.counts.get(key, 0.0)
+
+    def countWithout(self, key: str) -> float:
+        return self.totalCount - self.count(key)
+
+    def mean(self, key: str) -> float:
+        return self.sums[key] / self.counts[key]
+
+    def meanWithout(self, key: str) -> float:
+        return (self.totalSum - self.sums.get(key, 0.0)) / self.countWithout(key)
+
+    def variance(self, key: str) -> float:
+        return max(self.squares[key] / self.counts[key] - self.mean(key) ** 2, 0.0)
+
+    def varianceWithout(self, key: str) -> float:
+        return max(
+            (self.totalSquares - self.squares.get(key, 0.0)) / self.countWithout(key)
+            - self.meanWithout(key) ** 2,
+            0.0,
+        )
+
+    def name(self, key: str, locale: str) -> str:
+        """
+        Find the localized name of a key.
+
+        :param key: the key
+        :type key: str
+        :param locale: the locale of the name
+        :type locale: str
+        :return: the name, or the key itself if the jobs didn't name it
+        :rtype: str
+
+        """
+        return self.names.get(key, {}).get(locale, key)
+
+
+def keyNames(job: dict, field: str) -> Dict[str, Dict[str, str]]:
+    """
+    Find the localized names of the keys a job holds for a field.
+
+    :param job: one job, as parsed from its JSON line
+    :type job: dict
+    :param field: one of filters.partitionFields
+    :type field: str
+    :return: the names of each key in every locale, empty for fields without names
+    :rtype: Dict[str, Dict[str, str]]
+
+    """
+    entities: List[Optional[dict]] = []
+    if field == "stages":
+        entities = [job.get("stage")]
+    elif field == "specials":
+        entities = [job["my_data"].get("special")]
+    elif field == "fail_reasons":
+        entities = [job.get("fail_reason")]
+    elif field == "events":
+        entities = [wave.get("known_occurrence") for wave in job.get("waves") or []]
+    elif field == "tides":
+        entities = [wave.get("water_level") for wave in job.get("waves") or []]
+    elif field in ("weapons", "my_weapons"):
+        players: List[dict] = [job["my_data"]]
+        if field == "weapons":
+            players += job.get("teammates") or []
+        for player in players:
+            entities += player.get("weapons") or []
+    return {
+        entity["key"]: entity["name"]
+        for entity in entities
+        if isinstance(entity, dict) and isinstance(entity.get("name"), dict)
+    }
+
+
+def columnStats(columns: JobColumns, field: str, stat: str) -> GroupStats:
+    """
+    Gather the sums of a stat for every key of a field from the columns of a data set.
+
+    :param columns: the columns of the data set
+    :type columns: JobColumns
+    :param field: one of filters.partitionFields
+    :type field: str
+    :param stat: the stat expression, such as "clear_waves" or "quota 0"
+    :type stat: Union[str, Expression]
+    :return: the sums of every key
+    :rtype: GroupStats
+    :raises KeyError: if the stat or the column of the field isn't stored in the columns
+
+    """
+    values: np.ndarray = parseStat(stat).column(columns)
+    names, groups, rows = columnKeys(columns, field)
+    present: np.ndarray = ~np.isnan(values)
+    result: GroupStats = GroupStats()
+    result.totalCount = float(present.sum())
+    result.totalSum = float(values[present].sum())
+    result.totalSquares = float(np.square(values[present]).sum())
+    kept: np.ndarray = present[rows]
+    groups = groups[kept]
+    values = values[rows[kept]]
+    counts: List[float] = np.bincount(groups, minlength=len(names)).tolist()
+    sums: List[float] = np.bincount(groups, values, len(names)).tolist()
+    squares: List[float] = np.bincount(groups, np.square(values), len(names)).tolist()
+    for i in np.unique(groups).tolist():
+        result.counts[names[i]] = float(counts[i])
+        result.sums[names[i]] = sums[i]
+        result.squares[names[i]] = squares[i]
+    if field in partitionColumns:
+        vocabulary: Dict[str, Dict[str, str]] = columns.names.get(
+            partitionColumns[field][1], {}
+        )
+        result.names = {
+            key: vocabulary[key] for key in result.counts if key in vocabulary
+        }
+    return result
+
+
+def scanStats(
+    lines: Iterable,
+    field: str,
+    stat: str,
+    compressed: Union[JobBuffer, Selection] = None,
+) -> GroupStats:
+    """
+    Gather the sums of a stat for every key of a field, reading each job once.
+
+    :param lines: the JSON lines of the jobs
+    :type lines: Iterable
+    :param field: one of filters.partitionFields
+    :type field: str
+    :param stat: the stat expression, such as "quota 0"
+    :type stat: Union[str, Expression]
+    :param compressed: the data set the lines are compressed for, or None if they're plain
+    :type compressed: Union[JobBuffer, Selection]
+    :return: the sums of every key
+    :rtype: GroupStats
+
+    """
+    expression: Expression = parseStat(stat)
+    result: GroupStats = GroupStats()
+    for line in lines:
+        if compressed is not None:
+            line = decompressJob(compressed, line)
+        job: dict = ujson.loads(line)
+        keys = partitionKeys(job, field)
+        result.add(keys, expression(job))
+        if any(key not in result.names for key in keys):
+            result.names.update(keyNames(job, field))
+    return result
+
+
+def groupStats(
+    location,
+    data: Union[str, List[bytes], JobColumns],
+    field: str,
+    stat: Union[str, Expression],
+) -> GroupStats:
+    """
+    Gather the count, sum and sum of squares of a stat for every key of a field in one scan.
+
+    In memory, the header columns are used when they hold the stat and the
+    field, and each job is decoded once otherwise.
+
+    :param location: "disk", "mem" or "columns"
+    :type location: str
+    :param data: the data set, or the full path of the data or selection file
+    :type data: Union[str, List[bytes], JobColumns]
+    :param field: one of filters.partitionFields, such as "stages" or "weapons"
+    :type field: str
+    :param stat: the stat expression, such as "quota 0" or "sum(team golden_egg_delivered)"
+    :type stat: Union[str, Expression]
+    :return: the sums of every key and of every job
+    :rtype: GroupStats
+
+    """
+    if location == "disk":
+        with openJobs(cast(str, data)) as reader:
+            return scanStats(reader, field, stat)
+    if location == "columns":
+        return columnStats(cast(JobColumns, data), field, stat)
+    if not isinstance(data, (JobBuffer, Selection)):
+        data = JobBuffer(data)
+    header: Optional[JobColumns] = data.header
+    if header is not None:
+        try:
+            return columnStats(header, field, stat)
+        except KeyError:
+            pass
+    return scanStats(data, field, stat, data)
@@ -0,0 +1,717 @@
+import bisect
+import collections
+import gzip
+import os
+import ujson
+import zlib
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from gzip import GzipFile
+from typing import (
+    BinaryIO,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+BLOCK_JOBS = 1024
+SELECTION_SUFFIX = ".sel.z"
+
+
+def blockIndexPath(data: str) -> str:
+    """
+    Find the block index of a data file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the full path of the block index
+    :rtype: str
+
+    """
+    return data[0:-6] + "Blocks.json"
+
+
+def newBlockIndex() -> dict:
+    return {"offsets": [], "first_index": [], "first_id": [], "count": 0, "size": 0}
+
+
+def readBlockIndex(data: str) -> Optional[dict]:
+    """
+    Read the block index of a data file, if it still matches the file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the block offsets, the index and ID of the first job of each block, the job count and the byte length of the file, or None if the index is missing or stale
+    :rtype: Optional[dict]
+
+    """
+    try:
+        with open(blockIndexPath(data), "r") as reader:
+            index: dict = ujson.load(reader)
+    except (FileNotFoundError, ValueError):
+        return None
+    if index.get("size") != os.path.getsize(data):
+        return None
+    return index
+
+
+def writeBlockIndex(data: str, index: dict) -> None:
+    """
+    Atomically replace the block index of a data file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param index: the block index
+    :type index: dict
+
+    """
+    with open(blockIndexPath(data) + ".tmp", "w") as writer:
+        ujson.dump(index, writer)
+        writer.flush()
+        os.fsync(writer.fileno())
+    os.replace(blockIndexPath(data) + ".tmp", blockIndexPath(data))
+
+
+def addBlock(index: dict, offset: int, count: int, firstId: int) -> None:
+    index["offsets"].append(offset)
+    index["first_index"].append(index["count"])
+    index["first_id"].append(firstId)
+    index["count"] += count
+
+
+class BlockWriter:
+    """
+    Write JSON lines as gzip blocks, compressing blocks on a thread pool like pigz.
+
+    Each block of blockJobs lines is compressed as its own gzip member while the
+    caller keeps writing. The members are written in order, and each one is
+    added to the block index. At most ``ahead`` blocks wait to be written.
+
+    Given a path, the writer opens the file itself and writes the block index
+    beside it when closed. Appending to a file without a matching block index
+    leaves it without one. Given an open binary file, the writer starts at its
+    current position and leaves writing the index to the caller.
+
+    """
+
+    __slots__ = [
+        "raw",
+        "path",
+        "index",
+        "blockJobs",
+        "level",
+        "ahead",
+        "pool",
+        "pending",
+        "block",
+    ]
+
+    def __init__(
+        self,
+        raw: Union[str, BinaryIO],
+        index: Optional[dict] = None,
+        blockJobs: int = BLOCK_JOBS,
+        level: int = 6,
+        workers: Optional[int] = None,
+        ahead: Optional[int] = None,
+        append: bool = False,
+    ):
+        self.path: Optional[str] = None
+        if isinstance(raw, str):
+            self.path = raw
+            if append and os.path.exists(raw) and os.path.getsize(raw) > 0:
+                index = readBlockIndex(raw)
+            else:
+                index = newBlockIndex()
+            raw = open(raw, "ab" if append else "wb")
+        elif index is None:
+            index = newBlockIndex()
+        self.raw: BinaryIO = raw
+        self.index: Optional[dict] = index
+        self.blockJobs: int = blockJobs
+        self.level: int = level
+        workers = workers or os.cpu_count() or 1
+        self.ahead: int = ahead or 2 * workers
+        self.pool: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(workers)
+        self.pending: Deque[Tuple[Future, int, int]] = collections.deque()
+        self.block: List[bytes] = []
+
+    def __enter__(self) -> "BlockWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def write(self, line: bytes) -> None:
+        self.block.append(line)
+        if len(self.block) == self.blockJobs:
+            self.submit()
+
+    def submit(self) -> None:
+        self.pending.append(
+            (
+                self.pool.submit(gzip.compress, b"".join(self.block), self.level),
+                len(self.block),
+                ujson.loads(self.block[0])["id"],
+            )
+        )
+        self.block = []
+        while len(self.pending) > self.ahead:
+            self.writeNext()
+
+    def writeNext(self) -> None:
+        future, count, firstId = self.pending.popleft()
+        if self.index is not None:
+            addBlock(self.index, self.raw.tell(), count, firstId)
+        self.raw.write(future.result())
+
+    def flush(self) -> None:
+        if len(self.block) > 0:
+            self.submit()
+        while len(self.pending) > 0:
+            self.writeNext()
+        if self.index is not None:
+            self.index["size"] = self.raw.tell()
+
+    def close(self) -> None:
+        if self.pool is None:
+            return
+        self.flush()
+        self.pool.shutdown()
+        self.pool = None
+        if self.path is not None:
+            self.raw.close()
+            if self.index is not None:
+                writeBlockIndex(self.path, self.index)
+
+
+def writeBlocks(
+    writer: BinaryIO,
+    lines: Iterable[bytes],
+    index: dict,
+    blockJobs: int = BLOCK_JOBS,
+    level: int = 6,
+) -> None:
+    """
+    Write JSON lines as gzip members of blockJobs lines each, recording each one in a block index.
+
+    Concatenated gzip members are still one valid gzip file, so the result can
+    be read with gzip.open like any other data file. The blocks are compressed in
+    parallel by a BlockWriter.
+
+    :param writer: the binary file to write to, positioned where the blocks start
+    :type writer: BinaryIO
+    :param lines: the JSON lines, in ID order
+    :type lines: Iterable[bytes]
+    :param index: the block index to add the blocks to
+    :type index: dict
+    :param blockJobs: the number of jobs in each block
+    :type blockJobs: int
+    :param level: the gzip compression level, from 1 (fastest) to 9 (smallest)
+    :type level: int
+
+    """
+    with BlockWriter(writer, index, blockJobs, level) as blockWriter:
+        for line in lines:
+            blockWriter.write(line)
+
+
+def findBlock(index: dict, position: int) -> int:
+    """
+    Find the block holding the job at a position in a data file.
+
+    :param index: the block index of the data file
+    :type index: dict
+    :param position: the index of the job in the data file
+    :type position: int
+    :return: the number of the block
+    :rtype: int
+
+    """
+    return bisect.bisect_right(index["first_index"], position) - 1
+
+
+def findBlockById(index: dict, jobId: int) -> int:
+    """
+    Find the block that would hold a job ID in a data file.
+
+    :param index: the block index of the data file
+    :type index: dict
+    :param jobId: the stat.ink ID of the job
+    :type jobId: int
+    :return: the number of the block, or -1 if the ID is before the first job
+    :rtype: int
+
+    """
+    return bisect.bisect_right(index["first_id"], jobId) - 1
+
+
+def blockLength(index: dict, block: int) -> int:
+    if block + 1 < len(index["first_index"]):
+        return index["first_index"][block + 1] - index["first_index"][block]
+    return index["count"] - index["first_index"][block]
+
+
+def blockSpan(index: dict, block: int) -> int:
+    if block + 1 < len(index["offsets"]):
+        return index["offsets"][block + 1] - index["offsets"][block]
+    return index["size"] - index["offsets"][block]
+
+
+def readBlock(data: str, index: dict, block: int) -> List[bytes]:
+    """
+    Decompress one block of a data file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param index: the block index of the data file
+    :type index: dict
+    :param block: the number of the block
+    :type block: int
+    :return: the JSON lines in the block
+    :rtype: List[bytes]
+
+    :Example:
+
+    >>> import blocks
+    >>> index = blocks.readBlockIndex("data/salmonAll.jl.gz")
+    >>> len(blocks.readBlock("data/salmonAll.jl.gz", index, 0))
+    1024
+
+    """
+    with open(data, "rb") as raw:
+        raw.seek(index["offsets"][block])
+        return gzip.decompress(raw.read(blockSpan(index, block))).splitlines(True)
+
+
+def readLines(
+    data: str, index: dict, start: int = 0, stop: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Read a range of jobs from a data file, starting at the block holding the first one.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param index: the block index of the data file
+    :type index: dict
+    :param start: the index of the first job to read
+    :type start: int
+    :param stop: the index after the last job to read, or None to read to the end
+    :type stop: Optional[int]
+    :return: the JSON lines of the jobs
+    :rtype: Iterator[bytes]
+
+    """
+    if stop is None or stop > index["count"]:
+        stop = index["count"]
+    if start >= stop:
+        return
+    block: int = findBlock(index, start)
+    position: int = index["first_index"][block]
+    with open(data, "rb") as raw:
+        raw.seek(index["offsets"][block])
+        with gzip.GzipFile(fileobj=raw) as reader:
+            for line in reader:
+                if position >= stop:
+                    return
+                if position >= start:
+                    yield line
+                position += 1
+
+
+def readJobsAfter(
+    data: str, index: Optional[dict], count: int, lastId: Optional[int]
+) -> Iterator[bytes]:
+    """
+    Read the jobs of a data file after its first count, checking it still starts with them.
+
+    A cache of a data file, such as its posting index or an aggregate, covers
+    its first count jobs, the last of them being lastId. The file may have been
+    compacted or fetched again since, so the job at count - 1 is checked before
+    the cache is resumed from it.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param index: the block index of the data file, or None if it has none
+    :type index: Optional[dict]
+    :param count: the number of jobs already covered
+    :type count: int
+    :param lastId: the ID of the last job covered, or None if count is 0
+    :type lastId: Optional[int]
+    :return: the JSON lines of the jobs after the first count
+    :rtype: Iterator[bytes]
+    :raises ValueError: if the file holds fewer jobs or the last one covered isn't lastId
+
+    """
+    if index is not None:
+        if count > index["count"]:
+            raise ValueError("the jobs covered are no longer in " + data)
+        if count > 0:
+            block: int = findBlock(index, count - 1)
+            line: bytes = readBlock(data, index, block)[
+                count - 1 - index["first_index"][block]
+            ]
+            if ujson.loads(line)["id"] != lastId:
+                raise ValueError("the jobs covered are no longer in " + data)
+        with BlockReader(data, index, count) as reader:
+            yield from reader
+        return
+    with gzip.open(data) as reader:
+        position: int = 0
+        while position < count:
+            line = reader.readline()
+            if len(line) == 0:
+                raise ValueError("the jobs covered are no longer in " + data)
+            position += 1
+            if position == count and ujson.loads(line)["id"] != lastId:
+                raise ValueError("the jobs covered are no longer in " + data)
+        yield from reader
+
+
+class BlockReader:
+    """
+    Read the jobs of a blocked data file, decompressing blocks on a thread pool.
+
+    zlib releases the GIL while it inflates, so several blocks decompress at once
+    while the caller parses the lines of the earlier ones. Lines come out in file
+    order, and at most ``ahead`` blocks are read but not yet handed over. It can
+    be used like the file gzip.open returns: iterated, closed, or used in a with
+    statement.
+
+    Given ``chosen``, only those blocks are read, and readBlocks hands them over
+    one whole block at a time.
+
+    """
+
+    __slots__ = ["data", "index", "start", "chosen", "workers", "ahead", "pool", "raw"]
+
+    def __init__(
+        self,
+        data: str,
+        index: dict,
+        start: int = 0,
+        workers: Optional[int] = None,
+        ahead: Optional[int] = None,
+        chosen: Optional[List[int]] = None,
+    ):
+        self.data: str = data
+        self.index: dict = index
+        self.start: int = start
+        self.chosen: Optional[List[int]] = chosen
+        self.workers: int = workers or os.cpu_count() or 1
+        self.ahead: int = ahead or 2 * self.workers
+        self.pool: Optional[ThreadPoolExecutor] = None
+        self.raw: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "BlockReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.start >= self.index["count"]:
+            return
+        skip: int = (
+            self.start - self.index["first_index"][findBlock(self.index, self.start)]
+        )
+        for _, lines in self.readBlocks():
+            yield from lines[skip:]
+            skip = 0
+
+    def readBlocks(self) -> Iterator[Tuple[int, List[bytes]]]:
+        if self.chosen is None:
+            if self.start >= self.index["count"]:
+                return
+            blocks: Iterable[int] = range(
+                findBlock(self.index, self.start), len(self.index["offsets"])
+            )
+        else:
+            blocks = self.chosen
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.raw = open(self.data, "rb")
+        remaining: Iterator[int] = iter(blocks)
+        pending: Deque[Tuple[int, Future]] = collections.deque()
+        try:
+            for block in remaining:
+                self.raw.seek(self.index["offsets"][block])
+                span: bytes = self.raw.read(blockSpan(self.index, block))
+                pending.append((block, self.pool.submit(gzip.decompress, span)))
+                if len(pending) >= self.ahead:
+                    done, future = pending.popleft()
+                    yield (done, future.result().splitlines(True))
+            while len(pending) > 0:
+                done, future = pending.popleft()
+                yield (done, future.result().splitlines(True))
+        finally:
+            for _, future in pending:
+                future.cancel()
+            self.close()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+        if self.raw is not None:
+            self.raw.close()
+            self.raw = None
+
+
+def openJobs(
+    data: str, workers: Optional[int] = None
+) -> Union[BlockReader, GzipFile, "SelectedReader"]:
+    """
+    Open a data file for a full scan, reading blocks in parallel when it has a block index.
+
+    A file without a matching block index is read with gzip.open as before. A
+    selection file is read as the jobs it selects from its data file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param workers: the number of threads to decompress with, by default one per core
+    :type workers: Optional[int]
+    :return: an iterable of the JSON lines that can be closed
+    :rtype: Union[BlockReader, GzipFile, SelectedReader]
+    :raises FileNotFoundError: if the file doesn't exist
+
+    :Example:
+
+    >>> import blocks
+    >>> import ujson
+    >>> with blocks.openJobs("data/salmonAll.jl.gz") as reader:
+    ...     sum(ujson.loads(line)["clear_waves"] for line in reader)
+    ...
+    2987415
+
+    """
+    if isSelection(data):
+        base, rows, _ = readSelection(data)
+        return SelectedReader(base, rows, workers)
+    index: Optional[dict] = readBlockIndex(data)
+    if index is None:
+        return gzip.open(data)
+    return BlockReader(data, index, workers=workers)
+
+
+def isSelection(data: str) -> bool:
+    return data.endswith(SELECTION_SUFFIX)
+
+
+def writeSelection(path: str, base: str, rows: np.ndarray, total: int) -> None:
+    """
+    Atomically write a selection file, which names jobs of a data file by their position in it.
+
+    The positions are stored either as the gaps between them, in the smallest
+    unsigned type that holds the largest gap, or as one bit per job of the data
+    file, whichever is smaller, and the whole file is compressed with zlib. The
+    directory of the selection file is made if it doesn't exist yet.
+
+    :param path: the full path of the selection file, ending in SELECTION_SUFFIX
+    :type path: str
+    :param base: the full path of the data file the positions point into
+    :type base: str
+    :param rows: the sorted positions of the selected jobs
+    :type rows: np.ndarray
+    :param total: the number of jobs the data file held when they were selected
+    :type total: int
+
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    gaps: np.ndarray = np.diff(rows, prepend=0)
+    largest: int = int(gaps.max()) if len(gaps) > 0 else 0
+    dtype: np.dtype = np.min_scalar_type(largest)
+    header: dict = {
+        "base": os.path.relpath(base, os.path.dirname(os.path.abspath(path))),
+        "count": len(rows),
+        "total": total,
+    }
+    if len(rows) * dtype.itemsize <= (total + 7) // 8:
+        header["encoding"] = "gaps"
+        header["dtype"] = dtype.str
+        body: bytes = gaps.astype(dtype).tobytes()
+    else:
+        header["encoding"] = "bitmap"
+        bits: np.ndarray = np.zeros(total, dtype=np.bool_)
+        bits[rows] = True
+        body = np.packbits(bits).tobytes()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "wb") as writer:
+        writer.write(zlib.compress(ujson.dumps(header).encode("utf8") + b"\n" + body))
+    os.replace(path + ".tmp", path)
+
+
+def readSelection(path: str) -> Tuple[str, np.ndarray, int]:
+    """
+    Read a selection file.
+
+    :param path: the full path of the selection file
+    :type path: str
+    :return: the full path of the data file, the sorted positions of the selected jobs in it, and the number of jobs it held when they were selected
+    :rtype: Tuple[str, np.ndarray, int]
+    :raises FileNotFoundError: if the file doesn't exist
+
+    :Example:
+
+    >>> import blocks
+    >>> base, rows, total = blocks.readSelection("data/salmonAll/clearWaves/equal3.sel.z")
+    >>> base
+    'data/salmonAll.jl.gz'
+
+    """
+    with open(path, "rb") as reader:
+        content: bytes = zlib.decompress(reader.read())
+    split: int = content.index(b"\n")
+    header: dict = ujson.loads(content[0:split])
+    base: str = os.path.normpath(os.path.join(os.path.dirname(path), header["base"]))
+    if header["encoding"] == "gaps":
+        gaps: np.ndarray = np.frombuffer(content, header["dtype"], offset=split + 1)
+        rows: np.ndarray = np.cumsum(gaps, dtype=np.int64)
+    else:
+        bits: np.ndarray = np.unpackbits(
+            np.frombuffer(content, np.uint8, offset=split + 1), count=header["total"]
+        )
+        rows = np.flatnonzero(bits)
+    return (base, rows, header["total"])
+
+
+def selectionTotal(path: str) -> int:
+    try:
+        return readSelection(path)[2]
+    except FileNotFoundError:
+        return -1
+
+
+def jobCount(data: str) -> int:
+    index: Optional[dict] = readBlockIndex(data)
+    if index is not None:
+        return index["count"]
+    with gzip.open(data) as reader:
+        return sum(1 for _ in reader)
+
+
+def selectAll(data: str) -> str:
+    """
+    Select every job of a data file, to start a chain of disk filters that write selection files.
+
+    The selection is kept beside the data file, and rewritten when the data file
+    has grown since it was made.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the full path of the selection file
+    :rtype: str
+
+    :Example:
+
+    >>> import blocks
+    >>> import filters
+    >>> jobs = blocks.selectAll("data/salmonAll.jl.gz")
+    >>> filters.clearWave("disk", jobs, 3)
+    (
+        'data/salmonAll/clearWaves/equal3.sel.z',
+        'data/salmonAll/clearWaves/notequal3.sel.z'
+    )
+
+    """
+    path: str = data[0:-6] + SELECTION_SUFFIX
+    total: int = jobCount(data)
+    if selectionTotal(path) != total:
+        writeSelection(path, data, np.arange(total), total)
+    return path
+
+
+def combineSelections(first: str, second: str, path: str, operation: str = "&") -> str:
+    """
+    Combine two selections of the same data file without reading any jobs.
+
+    :param first: the full path of the first selection file
+    :type first: str
+    :param second: the full path of the second selection file
+    :type second: str
+    :param path: the full path of the selection file to write
+    :type path: str
+    :param operation: "&" for the jobs in both, "|" for the jobs in either, or "-" for the jobs in the first but not the second
+    :type operation: str
+    :return: the full path of the selection file written
+    :rtype: str
+    :raises ValueError: if the selections are of different data files, or the operation is unknown
+
+    """
+    base, rows, total = readSelection(first)
+    otherBase, otherRows, otherTotal = readSelection(second)
+    if os.path.abspath(base) != os.path.abspath(otherBase):
+        raise ValueError("Selections of different data files can't be combined")
+    if operation == "&":
+        rows = np.intersect1d(rows, otherRows, assume_unique=True)
+    elif operation == "|":
+        rows = np.union1d(rows, otherRows)
+    elif operation == "-":
+        rows = np.setdiff1d(rows, otherRows, assume_unique=True)
+    else:
+        raise ValueError("Unknown selection operation: " + operation)
+    writeSelection(path, base, rows, max(total, otherTotal))
+    return path
+
+
+class SelectedReader:
+    """
+    Read the jobs a selection file chose from its data file.
+
+    Only the blocks holding a selected job are read and decompressed, on the
+    thread pool of a BlockReader. A data file without a matching block index is
+    scanned with gzip.open instead.
+
+    """
+
+    __slots__ = ["data", "rows", "workers", "reader"]
+
+    def __init__(self, data: str, rows: np.ndarray, workers: Optional[int] = None):
+        self.data: str = data
+        self.rows: np.ndarray = rows
+        self.workers: Optional[int] = workers
+        self.reader: Optional[Union[BlockReader, GzipFile]] = None
+
+    def __enter__(self) -> "SelectedReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[bytes]:
+        if len(self.rows) == 0:
+            return
+        index: Optional[dict] = readBlockIndex(self.data)
+        if index is None:
+            self.reader = gzip.open(self.data)
+            wanted: Iterator[int] = iter(self.rows.tolist())
+            nextRow: Optional[int] = next(wanted)
+            for position, line in enumerate(self.reader):
+                if position == nextRow:
+                    yield line
+                    nextRow = next(wanted, None)
+                    if nextRow is None:
+                        break
+            self.close()
+            return
+        firstIndex: np.ndarray = np.asarray(index["first_index"], dtype=np.int64)
+        chosen: np.ndarray = np.unique(
+            np.searchsorted(firstIndex, self.rows, "right") - 1
+        )
+        starts: np.ndarray = np.searchsorted(self.rows, firstIndex[chosen])
+        self.reader = BlockReader(
+            self.data, index, workers=self.workers, chosen=chosen.tolist()
+        )
+        for i, (block, lines) in enumerate(self.reader.readBlocks()):
+            stop: int = int(starts[i + 1]) if i + 1 < len(starts) else len(self.rows)
+            for row in (self.rows[starts[i] : stop] - firstIndex[block]).tolist():
+                yield lines[row]
+
+    def close(self) -> None:
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
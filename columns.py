@@ -0,0 +1,592 @@
+import gzip
+import os
+import ujson
+import numpy as np
+from typing import Dict, List, Iterable, Union, Optional, cast
+
+SCHEMA_VERSION = 4
+PLAYERS = 4
+WAVES = 3
+WEAPON_SLOTS = 3
+CHUNK_ROWS = 8192
+
+playerStats = ("golden_egg_delivered", "power_egg_collected", "rescue", "death")
+waveStats = (
+    "golden_egg_quota",
+    "golden_egg_appearances",
+    "golden_egg_delivered",
+    "power_egg_collected",
+)
+
+
+class JobColumns:
+    """
+    A data set decoded once into typed NumPy arrays, one row per job.
+
+    Per-player columns have one column per player, with the player first and the
+    teammates after, and -1 where a job had fewer than four players. Per-wave
+    columns, named "wave_" and the stat, have one column per wave, and -1 where
+    a job had fewer than three waves.
+    Keyed columns, such as weapons, hold integer codes into ``codes``, with the
+    localized names of each key in ``names``.
+
+    """
+
+    __slots__ = ["arrays", "codes", "names"]
+
+    def __init__(
+        self,
+        arrays: Dict[str, np.ndarray],
+        codes: Dict[str, List[str]],
+        names: Dict[str, Dict[str, Dict[str, str]]],
+    ):
+        self.arrays: Dict[str, np.ndarray] = arrays
+        self.codes: Dict[str, List[str]] = codes
+        self.names: Dict[str, Dict[str, Dict[str, str]]] = names
+
+    def __len__(self) -> int:
+        return len(self.arrays["id"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.arrays[column]
+
+    def take(self, indices) -> "JobColumns":
+        """
+        Select a subset of the rows.
+
+        :param indices: the row indices or boolean mask to keep
+        :type indices: np.ndarray
+        :return: the selected rows, sharing the codes of this data set
+        :rtype: JobColumns
+
+        """
+        return JobColumns(
+            {column: array[indices] for column, array in self.arrays.items()},
+            self.codes,
+            self.names,
+        )
+
+    def code(self, vocabulary: str, value: str, locale: str) -> int:
+        """
+        Find the integer code of a key or localized name.
+
+        :param vocabulary: the name of the code list, such as "weapons"
+        :type vocabulary: str
+        :param value: the key or the name in the given locale
+        :type value: str
+        :param locale: the locale to match names against
+        :type locale: str
+        :return: the code, or -1 if no job in the data set has that value
+        :rtype: int
+
+        """
+        keys: List[str] = self.codes[vocabulary]
+        if value in keys:
+            return keys.index(value)
+        for i in range(0, len(keys)):
+            if self.names[vocabulary].get(keys[i], {}).get(locale) == value:
+                return i
+        return -1
+
+    def matches(self, values: np.ndarray, vocabulary: str, key: str) -> np.ndarray:
+        """
+        Find the rows where any slot of a coded column holds a key.
+
+        :param values: a coded column of these columns, or a slice of one
+        :type values: np.ndarray
+        :param vocabulary: the name of the code list the column uses
+        :type vocabulary: str
+        :param key: the key to look for, compared to keys only
+        :type key: str
+        :return: one boolean per row
+        :rtype: np.ndarray
+
+        :Example:
+
+        >>> import columns
+        >>> jobs = columns.loadColumnsFromFile("data/salmonAll.jl.gz")
+        >>> jobs.matches(jobs["weapons"][:, 0], "weapons", "splatscope").sum()
+        512
+
+        """
+        if key not in self.codes[vocabulary]:
+            return np.zeros(len(values), dtype=np.bool_)
+        hits: np.ndarray = values == self.codes[vocabulary].index(key)
+        return hits.reshape(len(values), -1).any(axis=1)
+
+
+vocabularies = (
+    "weapons",
+    "water_levels",
+    "events",
+    "players",
+    "stages",
+    "fail_reasons",
+    "specials",
+)
+
+
+class ColumnBuilder:
+    __slots__ = ["rows", "codes", "lookup", "names", "columns", "chunks"]
+
+    def __init__(
+        self,
+        codes: Optional[Dict[str, List[str]]] = None,
+        names: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None,
+        columns: Optional[Iterable[str]] = None,
+    ):
+        self.rows: Dict[str, list] = {
+            "id": [],
+            "shift_start_at": [],
+            "start_at": [],
+            "danger_rate": [],
+            "clear_waves": [],
+            "stage": [],
+            "fail_reason": [],
+            "quota": [],
+            "golden_egg_delivered": [],
+            "power_egg_collected": [],
+            "rescue": [],
+            "death": [],
+            "special": [],
+            "weapons": [],
+            "water_level": [],
+            "known_occurrence": [],
+            "splatnet_id": [],
+        }
+        for stat in waveStats:
+            self.rows["wave_" + stat] = []
+        self.codes: Dict[str, List[str]] = {}
+        self.names: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self.lookup: Dict[str, Dict[str, int]] = {}
+        self.columns: Optional[List[str]] = None if columns is None else list(columns)
+        self.chunks: List[Dict[str, np.ndarray]] = []
+        for vocabulary in vocabularies:
+            self.codes[vocabulary] = list((codes or {}).get(vocabulary, []))
+            self.names[vocabulary] = dict((names or {}).get(vocabulary, {}))
+            self.lookup[vocabulary] = {
+                key: i for i, key in enumerate(self.codes[vocabulary])
+            }
+
+    def encode(self, vocabulary: str, entity: Optional[dict]) -> int:
+        if entity is None or entity == "None":
+            return -1
+        key: str = entity["key"]
+        if key not in self.lookup[vocabulary]:
+            self.lookup[vocabulary][key] = len(self.codes[vocabulary])
+            self.codes[vocabulary].append(key)
+            self.names[vocabulary][key] = entity["name"]
+        return self.lookup[vocabulary][key]
+
+    def encodeKey(self, vocabulary: str, key: str) -> int:
+        if key not in self.lookup[vocabulary]:
+            self.lookup[vocabulary][key] = len(self.codes[vocabulary])
+            self.codes[vocabulary].append(key)
+        return self.lookup[vocabulary][key]
+
+    def append(self, job: dict) -> None:
+        players: List[dict] = [job["my_data"]]
+        if job["teammates"] is not None:
+            players += job["teammates"]
+        self.rows["id"].append(job["id"])
+        self.rows["shift_start_at"].append(job["shift_start_at"]["time"])
+        self.rows["start_at"].append(
+            job["start_at"]["time"] if job.get("start_at") is not None else np.nan
+        )
+        self.rows["danger_rate"].append(float(job["danger_rate"]))
+        self.rows["clear_waves"].append(job["clear_waves"])
+        self.rows["stage"].append(self.encode("stages", job["stage"]))
+        self.rows["fail_reason"].append(self.encode("fail_reasons", job["fail_reason"]))
+        quota: List[int] = list(job["quota"] or [])
+        self.rows["quota"].append((quota + [-1] * 3)[0:3])
+        for stat in playerStats:
+            self.rows[stat].append(
+                [player[stat] for player in players] + [-1] * (PLAYERS - len(players))
+            )
+        self.rows["special"].append(
+            [self.encode("specials", player["special"]) for player in players]
+            + [-1] * (PLAYERS - len(players))
+        )
+        weapons: List[List[int]] = []
+        for player in players:
+            slots: List[int] = [
+                self.encode("weapons", weapon) for weapon in (player["weapons"] or [])
+            ]
+            weapons.append((slots + [-1] * WEAPON_SLOTS)[0:WEAPON_SLOTS])
+        weapons += [[-1] * WEAPON_SLOTS] * (PLAYERS - len(players))
+        self.rows["weapons"].append(weapons)
+        waves: List[dict] = (job["waves"] or [])[0:WAVES]
+        self.rows["water_level"].append(
+            [self.encode("water_levels", wave["water_level"]) for wave in waves]
+            + [-1] * (WAVES - len(waves))
+        )
+        self.rows["known_occurrence"].append(
+            [self.encode("events", wave["known_occurrence"]) for wave in waves]
+            + [-1] * (WAVES - len(waves))
+        )
+        for stat in waveStats:
+            self.rows["wave_" + stat].append(
+                [wave[stat] for wave in waves] + [-1] * (WAVES - len(waves))
+            )
+        self.rows["splatnet_id"].append(
+            [self.encodeKey("players", player["splatnet_id"]) for player in players]
+            + [-1] * (PLAYERS - len(players))
+        )
+        if len(self.rows["id"]) >= CHUNK_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        arrays: Dict[str, np.ndarray] = {
+            "id": np.array(self.rows["id"], dtype=np.int64),
+            "shift_start_at": np.array(self.rows["shift_start_at"], dtype=np.int64),
+            "start_at": np.array(self.rows["start_at"], dtype=np.float64),
+            "danger_rate": np.array(self.rows["danger_rate"], dtype=np.float64),
+            "clear_waves": np.array(self.rows["clear_waves"], dtype=np.int8),
+            "stage": np.array(self.rows["stage"], dtype=np.int16),
+            "fail_reason": np.array(self.rows["fail_reason"], dtype=np.int8),
+            "quota": np.array(self.rows["quota"], dtype=np.int16).reshape(-1, 3),
+            "golden_egg_delivered": np.array(
+                self.rows["golden_egg_delivered"], dtype=np.int32
+            ).reshape(-1, PLAYERS),
+            "power_egg_collected": np.array(
+                self.rows["power_egg_collected"], dtype=np.int32
+            ).reshape(-1, PLAYERS),
+            "rescue": np.array(self.rows["rescue"], dtype=np.int16).reshape(
+                -1, PLAYERS
+            ),
+            "death": np.array(self.rows["death"], dtype=np.int16).reshape(-1, PLAYERS),
+            "special": np.array(self.rows["special"], dtype=np.int16).reshape(
+                -1, PLAYERS
+            ),
+            "weapons": np.array(self.rows["weapons"], dtype=np.int16).reshape(
+                -1, PLAYERS, WEAPON_SLOTS
+            ),
+            "water_level": np.array(self.rows["water_level"], dtype=np.int8).reshape(
+                -1, WAVES
+            ),
+            "known_occurrence": np.array(
+                self.rows["known_occurrence"], dtype=np.int8
+            ).reshape(-1, WAVES),
+            "splatnet_id": np.array(self.rows["splatnet_id"], dtype=np.int32).reshape(
+                -1, PLAYERS
+            ),
+        }
+        for stat in waveStats:
+            arrays["wave_" + stat] = np.array(
+                self.rows["wave_" + stat], dtype=np.int32
+            ).reshape(-1, WAVES)
+        self.chunks.append(
+            {
+                column: array
+                for column, array in arrays.items()
+                if self.columns is None or column in self.columns
+            }
+        )
+        for row in self.rows.values():
+            row.clear()
+
+    def finish(self) -> JobColumns:
+        """
+        Turn the appended jobs into columns.
+
+        Jobs are converted to arrays every CHUNK_ROWS jobs as they are appended, so
+        the chunks only have to be joined here.
+
+        :return: the columns, or only those given to the builder
+        :rtype: JobColumns
+
+        """
+        self.flush()
+        return JobColumns(
+            {
+                column: np.concatenate([chunk[column] for chunk in self.chunks])
+                for column in self.chunks[0]
+            },
+            self.codes,
+            self.names,
+        )
+
+
+def buildColumns(lines: Iterable[Union[bytes, str]]) -> JobColumns:
+    """
+    Decode an iterable of JSON job lines into columns.
+
+    :param lines: the JSON encoded jobs, one per item
+    :type lines: Iterable[Union[bytes, str]]
+    :return: the decoded columns
+    :rtype: JobColumns
+
+    """
+    builder = ColumnBuilder()
+    for line in lines:
+        builder.append(ujson.loads(line))
+    return builder.finish()
+
+
+def loadColumnsFromFile(data: str) -> JobColumns:
+    """
+    Decode a data file into columns in a single pass.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the decoded columns
+    :rtype: JobColumns
+    :raises gzip.BadGzipFile: if the file exists but isn't a gzip file
+    :raises FileNotFoundError: if the file doesn't exist
+
+    :Example:
+
+    >>> import columns
+    >>> import core
+    >>> jobs = columns.loadColumnsFromFile("data/salmonAll.jl.gz")
+    >>> core.statSummary("columns", jobs, ["quota 0"])["quota 0"]["min_val"]
+    3.0
+
+    """
+    with gzip.open(data) as reader:
+        return buildColumns(reader)
+
+
+def getColumn(data: JobColumns, stat: str) -> np.ndarray:
+    """
+    Find the column holding a stat, given as a space separated path like core.statSummary uses.
+
+    :param data: the columns to read from
+    :type data: JobColumns
+    :param stat: the stat, such as "quota 0" or "my_data golden_egg_delivered"
+    :type stat: str
+    :return: the values of the stat, one per job
+    :rtype: np.ndarray
+    :raises KeyError: if the stat isn't stored in the columns
+
+    """
+    statArr: List[Union[str, int]] = list(
+        map(lambda ele: int(ele) if ele.isdigit() else ele, stat.split())
+    )
+    if len(statArr) == 1 and statArr[0] in ("id", "danger_rate", "clear_waves"):
+        return data[cast(str, statArr[0])]
+    if statArr == ["shift_start_at", "time"]:
+        return data["shift_start_at"]
+    if statArr == ["start_at", "time"]:
+        return data["start_at"]
+    if len(statArr) == 2 and statArr[0] == "quota" and isinstance(statArr[1], int):
+        return data["quota"][:, statArr[1]]
+    if len(statArr) == 2 and statArr[0] == "my_data" and statArr[1] in playerStats:
+        return data[cast(str, statArr[1])][:, 0]
+    if (
+        len(statArr) == 3
+        and statArr[0] == "teammates"
+        and isinstance(statArr[1], int)
+        and statArr[1] < PLAYERS - 1
+        and statArr[2] in playerStats
+    ):
+        return data[cast(str, statArr[2])][:, statArr[1] + 1]
+    if (
+        len(statArr) == 3
+        and statArr[0] == "team"
+        and isinstance(statArr[1], int)
+        and statArr[1] < PLAYERS
+        and statArr[2] in playerStats
+    ):
+        return data[cast(str, statArr[2])][:, statArr[1]]
+    if (
+        len(statArr) == 3
+        and statArr[0] == "waves"
+        and isinstance(statArr[1], int)
+        and statArr[1] < WAVES
+        and statArr[2] in waveStats
+    ):
+        return data["wave_" + cast(str, statArr[2])][:, statArr[1]]
+    raise KeyError(stat)
+
+
+def getColumns(data: JobColumns, stat: str) -> np.ndarray:
+    """
+    Find the columns holding a stat of every player or every wave, or every quota.
+
+    :param data: the columns to read from
+    :type data: JobColumns
+    :param stat: the stat, such as "team death", "teammates death", "waves golden_egg_delivered" or "quota"
+    :type stat: str
+    :return: the values of the stat, one row per job and one column per player, wave or quota
+    :rtype: np.ndarray
+    :raises KeyError: if the stat isn't stored in the columns
+
+    """
+    statArr: List[str] = stat.split()
+    if statArr == ["quota"]:
+        return data["quota"]
+    if len(statArr) == 2 and statArr[0] == "team" and statArr[1] in playerStats:
+        return data[statArr[1]]
+    if len(statArr) == 2 and statArr[0] == "teammates" and statArr[1] in playerStats:
+        return data[statArr[1]][:, 1:]
+    if len(statArr) == 2 and statArr[0] == "waves" and statArr[1] in waveStats:
+        return data["wave_" + statArr[1]]
+    raise KeyError(stat)
+
+
+def cachePath(data: str) -> str:
+    """
+    Find the column cache directory for a data file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the path of the cache directory
+    :rtype: str
+
+    """
+    return data[0:-6] + "Columns/"
+
+
+def readManifest(directory: str) -> Optional[dict]:
+    try:
+        with open(directory + "manifest.json", "r") as reader:
+            manifest: dict = ujson.load(reader)
+    except (FileNotFoundError, ValueError):
+        return None
+    if manifest.get("schema_version") != SCHEMA_VERSION:
+        return None
+    return manifest
+
+
+def mapColumns(directory: str, manifest: dict) -> Optional[JobColumns]:
+    arrays: Dict[str, np.ndarray] = {}
+    try:
+        for column in manifest["columns"]:
+            arrays[column] = np.load(directory + column + ".npy", mmap_mode="r")
+    except (FileNotFoundError, ValueError):
+        return None
+    for array in arrays.values():
+        if len(array) != manifest["count"]:
+            return None
+    return JobColumns(arrays, manifest["codes"], manifest["names"])
+
+
+def saveColumns(data: str, columns: JobColumns) -> None:
+    """
+    Write columns to the cache directory of a data file.
+
+    Each column is written to a temporary file and moved into place, and the
+    manifest is replaced last, so an interrupted save is detected as stale.
+
+    :param data: the full path of the data file the columns were decoded from
+    :type data: str
+    :param columns: the columns to save
+    :type columns: JobColumns
+
+    """
+    directory: str = cachePath(data)
+    try:
+        os.mkdir(directory)
+    except FileExistsError:
+        pass
+    for column, array in columns.arrays.items():
+        with open(directory + column + ".tmp", "wb") as writer:
+            np.save(writer, array)
+        os.replace(directory + column + ".tmp", directory + column + ".npy")
+    source: os.stat_result = os.stat(data)
+    with open(directory + "manifest.tmp", "w") as writer:
+        ujson.dump(
+            {
+                "schema_version": SCHEMA_VERSION,
+                "source_size": source.st_size,
+                "source_mtime": source.st_mtime_ns,
+                "last_id": int(columns["id"][-1]) if len(columns) > 0 else 0,
+                "count": len(columns),
+                "columns": list(columns.arrays),
+                "codes": columns.codes,
+                "names": columns.names,
+            },
+            writer,
+        )
+    os.replace(directory + "manifest.tmp", directory + "manifest.json")
+
+
+def extendColumns(
+    data: str, cached: JobColumns, manifest: dict
+) -> Optional[JobColumns]:
+    """
+    Decode only the jobs appended to a data file since its columns were cached.
+
+    core.init appends new jobs as new gzip members, so the old file size is the
+    offset of the first new member.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param cached: the columns already in the cache
+    :type cached: JobColumns
+    :param manifest: the manifest the cached columns were written with
+    :type manifest: dict
+    :return: the old and new columns together, or None if the appended data can't be read that way
+    :rtype: Optional[JobColumns]
+
+    """
+    builder = ColumnBuilder(cached.codes, cached.names)
+    try:
+        with open(data, "rb") as raw:
+            raw.seek(manifest["source_size"])
+            with gzip.GzipFile(fileobj=raw) as reader:
+                for line in reader:
+                    builder.append(ujson.loads(line))
+    except (OSError, EOFError, ValueError, KeyError):
+        return None
+    added: JobColumns = builder.finish()
+    if len(added) == 0 or added["id"][0] <= manifest["last_id"]:
+        return None
+    return JobColumns(
+        {
+            column: np.concatenate((cached[column], added[column]))
+            for column in added.arrays
+        },
+        added.codes,
+        added.names,
+    )
+
+
+def loadColumns(data: str) -> JobColumns:
+    """
+    Load the columns of a data file from its cache, memory mapped.
+
+    The cache is rebuilt if it is missing, was written by another schema version,
+    or no longer matches the data file, and is extended if core.init only
+    appended jobs to the data file since it was written.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the columns, memory mapped read only
+    :rtype: JobColumns
+    :raises gzip.BadGzipFile: if the file exists but isn't a gzip file
+    :raises FileNotFoundError: if the file doesn't exist
+
+    :Example:
+
+    >>> import columns
+    >>> import core
+    >>> jobs = columns.loadColumns(core.init("All", "data/"))
+    >>> len(jobs)
+    1418432
+
+    """
+    directory: str = cachePath(data)
+    source: os.stat_result = os.stat(data)
+    manifest: Optional[dict] = readManifest(directory)
+    cached: Optional[JobColumns] = None
+    if manifest is not None:
+        cached = mapColumns(directory, manifest)
+    if cached is not None:
+        manifest = cast(dict, manifest)
+        if (
+            manifest["source_size"] == source.st_size
+            and manifest["source_mtime"] == source.st_mtime_ns
+        ):
+            return cached
+        if manifest["source_size"] < source.st_size:
+            extended: Optional[JobColumns] = extendColumns(data, cached, manifest)
+            if extended is not None:
+                saveColumns(data, extended)
+                return cast(
+                    JobColumns,
+                    mapColumns(directory, cast(dict, readManifest(directory))),
+                )
+    saveColumns(data, loadColumnsFromFile(data))
+    return cast(JobColumns, mapColumns(directory, cast(dict, readManifest(directory))))
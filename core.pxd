@@ -3,21 +3,21 @@ import cython
 @cython.locals(reader=object)
 cpdef bint hasJobs(str location, object data)
 
-@cython.locals(result=list, reader=object, job=object)
+@cython.locals(result=list, reader=object, job=object, fields=dict)
 cpdef list listAllUsers(str location, object data)
 
-@cython.locals(result=dict, reader=object, line=bytes, job=object, i=cython.int)
+@cython.locals(result=dict, reader=object, line=bytes, job=object, i=cython.int, fields=dict)
 cpdef dict findWeaponsAndStageByRotation(str location, object data, int rotation)
 
-@cython.locals(foundIds=list, reader=object, line=bytes, job=object, teammate=object)
+@cython.locals(foundIds=list, reader=object, line=bytes, job=object, teammate=object, fields=dict)
 cpdef list findPlayerIdByName(str location, object data, str player)
 
 cpdef str getValMultiDimensional(object data, list statArr)
 
-@cython.locals(reader=object, statArr=list, sumVal=cython.double, maxVal=cython.double, minVal=cython.double, vals=list, count=cython.double, line=bytes, job=object, val=cython.double)
-cpdef tuple statSummary(str location, object data, str stat)
+@cython.locals(columnResults=dict, column=object, reader=object, accumulators=dict, compiled=dict, expression=object, resultDict=dict, stat=object, line=object, job=object, value=cython.double, fields=dict)
+cpdef dict statSummary(str location, object data, list stats)
 
-@cython.locals(sumVal=cython.double, count=cython.double, line=bytes, job=object)
+@cython.locals(sumVal=cython.double, count=cython.double, line=bytes, job=object, fields=dict)
 cpdef double waveClearPercentageWithWeapon(str data, str weapon)
 
 @cython.locals(sumVal=cython.int, w=object)
@@ -29,9 +29,12 @@ cpdef list getPlayersAttribute(object data, str attr)
 @cython.locals(attrs=str, attrsList=list, i=cython.int)
 cpdef str getWavesAttribute(object data, str attr)
 
-@cython.locals(result=str, stats=list, reader=object, clearCount=cython.double, waveTwoCount=cython.double, waveOneCount=cython.double, sumVal=cython.double[6], maxVal=cython.double[6], minVal=cython.double[6], vals=list, count=cython.int, line=bytes, job=object, i=cython.int, val=cython.double)
+@cython.locals(result=str, accumulators=dict, reader=object, overview=object, line=object, count=cython.double, label=str, stat=str)
 cpdef str getOverview(str location, object data)
 
+@cython.locals(result=str, count=cython.int, clearWaves=object, label=str, stat=str, column=object)
+cpdef str getColumnsOverview(object data)
+
 cpdef void printGeneral(object data)
 cpdef void printWaves(object data)
 
@@ -46,17 +49,48 @@ cpdef void printPlayers(object data)
 @cython.locals(results=list, names=dict, appearances=dict, boss=object, my_data=dict, teammate=object, teammate_data=dict)
 cdef list getBosses(object data)
 
-@cython.locals(count=cython.int, reader=object, line=bytes)
+@cython.locals(blockIndex=dict, block=cython.int, line=bytes)
 cpdef object getSingleJob(str data, int index=*)
 
+@cython.locals(blockIndex=dict, block=cython.int, line=bytes, job=dict)
+cpdef object getJobById(str data, long jobId)
+
 @cython.locals(names=list, namesStr=str, name=str, bosses=list, listBosses=list, boss=cython.int)
 cpdef void printBosses(object data)
 
-@cython.locals(reader=object, results=list, line=bytes, job=object)
-cpdef list getArrayOfStat(str location, object data, str stat)
+@cython.locals(expression=object, reader=object, results=list, line=bytes, job=object, fields=dict)
+cpdef list getArrayOfStat(str location, object data, object stat)
+
+@cython.locals(headers=dict, fileName=str, url=str, manifest=dict, params=dict, blockIndex=dict, first=cython.bint, page=list)
+cpdef str init(str mode, str data_path, str api_key=*, str base_url=*, int shards=*)
+
+cpdef str dataManifestPath(str data)
+
+cpdef object readDataManifest(str data)
+
+@cython.locals(writer=object)
+cpdef void writeDataManifest(str data, dict manifest)
+
+@cython.locals(page=bytes, writer=object, offset=cython.long, size=cython.long)
+cpdef dict appendJobs(str data, list jobs, dict manifest, dict blockIndex=*)
+
+@cython.locals(count=cython.int, lastId=cython.int, raw=object, reader=object, line=bytes)
+cpdef tuple scanJobs(str data, long offset)
+
+@cython.locals(count=cython.int, lastId=cython.int, reader=object, writer=object, line=bytes)
+cpdef dict rebuildDataManifest(str data)
+
+@cython.locals(size=cython.long, manifest=object, count=cython.int, lastId=cython.int)
+cpdef dict resumePoint(str data)
+
+@cython.locals(blockIndex=dict)
+cpdef dict loadBlockIndex(str data)
+
+@cython.locals(manifest=dict, blockIndex=dict, reader=object, writer=object)
+cpdef dict blockDataFile(str data, int blockJobs=*)
 
-@cython.locals(headers=dict, fileName=str, url=str, recentId=cython.int, reader=object, writer=object, line=object, prevLastId=cython.int, params=dict, temp=list, lastId=cython.int, job=dict, result=object)
-cpdef str init(str mode, str data_path, str api_key=*)
+@cython.locals(blockCount=cython.int, start=cython.int, manifest=dict, lines=list, offset=cython.long, writer=object)
+cpdef dict compactBlocks(str data, dict blockIndex, int blockJobs=*)
 
-@cython.locals(jobs=list, reader=object, line=bytes)
-cpdef list loadJobsFromFile(str data)
\ No newline at end of file
+@cython.locals(jobs=object, builder=object, reader=object, line=bytes)
+cpdef object loadJobsFromFile(str data, bint dictionary=*, bint header=*)
\ No newline at end of file
@@ -1,13 +1,48 @@
 import os.path
 import ujson
 import numpy as np
-import requests
 import sys
 from typing import Tuple, List, Union, Dict, cast, Optional, Callable, Any
 import gzip
 from gzip import GzipFile
 import shutil
-from objects import Job, Stage_WaterLevel_KnownOccurrence
+from objects import Job, Stage_WaterLevel_KnownOccurrence, decodeJob, projectFields
+from columns import ColumnBuilder, JobColumns, getColumn
+from fetcher import fetchPages, latestId, statInkUrl
+from blocks import (
+    BLOCK_JOBS,
+    BlockReader,
+    addBlock,
+    blockLength,
+    findBlock,
+    findBlockById,
+    isSelection,
+    newBlockIndex,
+    openJobs,
+    readBlock,
+    readBlockIndex,
+    readLines,
+    readSelection,
+    writeBlockIndex,
+    writeBlocks,
+)
+from jobstore import (
+    JobBuffer,
+    compressJob,
+    decompressJob,
+    headerColumns,
+    loadDictionary,
+)
+from sketches import StatAccumulator
+from expressions import Expression, parseStat
+from materialized import (
+    MaterializedAggregate,
+    overviewAggregate,
+    overviewStats,
+    refreshAggregate,
+)
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 import zlib
 
 locale = "en_US"
@@ -20,7 +55,7 @@ grizzcoWeapons = (
 )
 
 
-def hasJobs(location, data: Union[str, List[bytes]]) -> bool:
+def hasJobs(location, data: Union[str, List[bytes], JobColumns]) -> bool:
     """
     Check if a given data file has data.
 
@@ -46,13 +81,16 @@ def hasJobs(location, data: Union[str, List[bytes]]) -> bool:
     """
     try:
         if location == "disk":
+            if isSelection(cast(str, data)):
+                return len(readSelection(cast(str, data))[1]) > 0
             with gzip.open(cast(str, data)) as reader:
-                ujson.loads(reader.read())
-                return True
+                return len(reader.readline()) > 0
+        elif location == "columns":
+            return len(cast(JobColumns, data)) > 0
         else:
-            ujson.loads(zlib.decompress(cast(bytes, data[0])))
+            ujson.loads(decompressJob(cast(List[bytes], data), cast(bytes, data[0])))
             return True
-    except EOFError:
+    except (EOFError, IndexError):
         return False
 
 
@@ -64,15 +102,16 @@ def listAllUsers(location, data) -> List[str]:
 
     """
     result: List[str] = []
+    fields: dict = projectFields(["my_data splatnet_id"])
     if location == "disk":
-        reader = gzip.open(data)
+        reader = openJobs(data)
     else:
         reader = data
     for line in reader:
         if location == "disk":
-            job = Job(**ujson.loads(line))
+            job = decodeJob(ujson.loads(line), fields, locale)
         else:
-            job = Job(**ujson.loads(zlib.decompress(line)))
+            job = decodeJob(ujson.loads(decompressJob(data, line)), fields, locale)
         if job.my_data.splatnet_id not in result:
             result.append(job.my_data.splatnet_id)
     if location == "disk":
@@ -114,15 +153,18 @@ def findRotationByWeaponsAndStage(
 
     """
     foundRotations: List[int] = []
+    fields: dict = projectFields(
+        ["stage", "my_data weapons", "teammates weapons", "shift_start_at time"]
+    )
     if location == "disk":
-        reader: Union[GzipFile, List[bytes]] = gzip.open(cast(str, data))
+        reader: Union[BlockReader, GzipFile, List[bytes]] = openJobs(cast(str, data))
     else:
         reader = cast(List[bytes], data)
     for line in reader:
         if location == "disk":
-            job = Job(**ujson.loads(line))
+            job = decodeJob(ujson.loads(line), fields, locale)
         else:
-            job = Job(**ujson.loads(zlib.decompress(line)))
+            job = decodeJob(ujson.loads(decompressJob(data, line)), fields, locale)
         found = kargs.get("stage") is None or (
             job.stage is not None
             and kargs.get("stage")
@@ -315,15 +357,18 @@ def findWeaponsAndStageByRotation(
 
     """
     result: Dict[str, Union[str, List[str]]] = {}
+    fields: dict = projectFields(
+        ["shift_start_at time", "stage", "my_data weapons", "teammates weapons"]
+    )
     if location == "disk":
-        reader = gzip.open(data)
+        reader = openJobs(data)
     else:
         reader = data
     for line in reader:
         if location == "disk":
-            job = Job(**ujson.loads(line))
+            job = decodeJob(ujson.loads(line), fields, locale)
         else:
-            job = Job(**ujson.loads(zlib.decompress(line)))
+            job = decodeJob(ujson.loads(decompressJob(data, line)), fields, locale)
         if job.shift_start_at.time == rotation:
             if isinstance(job.stage, Stage_WaterLevel_KnownOccurrence):
                 result["stage"] = getattr(job.stage.name, locale)
@@ -365,15 +410,23 @@ def findPlayerIdByName(location, data, player) -> List[str]:
 
     """
     foundIds: List[str] = []
+    fields: dict = projectFields(
+        [
+            "my_data name",
+            "my_data splatnet_id",
+            "teammates name",
+            "teammates splatnet_id",
+        ]
+    )
     if location == "disk":
-        reader = gzip.open(data)
+        reader = openJobs(data)
     else:
         reader = data
     for line in reader:
         if location == "disk":
-            job = Job(**ujson.loads(line))
+            job = decodeJob(ujson.loads(line), fields, locale)
         else:
-            job = Job(**ujson.loads(zlib.decompress(line)))
+            job = decodeJob(ujson.loads(decompressJob(data, line)), fields, locale)
         if job.my_data.name == player and job.my_data.splatnet_id not in foundIds:
             foundIds.append(job.my_data.splatnet_id)
         if job.teammates is not None:
@@ -412,72 +465,61 @@ def getValMultiDimensional(data, statArr: List[Union[str, int]]) -> str:
     return getattr(data, statArr[0])
 
 
-def statSummary(location, data: Union[str, List[bytes]], stats) -> dict:
+def statSummary(location, data: Union[str, List[bytes], JobColumns], stats) -> dict:
     """
     Find the average, min, median, and max of a stat given a data file
 
+    Each stat is a stat expression, such as "quota 0" or
+    "waves 0 golden_egg_delivered / quota 0", and jobs without a value for it
+    are left out of its summary.
+
     :param data: str: The full file path of the data file
     :param stat: str: The stat
     :return: The resulting average, min, median, and max
     :rtype: Tuple[float, float, float, float]
 
     """
+    if location == "columns":
+        columnResults: Dict[str, Dict[str, float]] = {}
+        for stat in stats:
+            column: np.ndarray = parseStat(stat).column(cast(JobColumns, data))
+            column = column[~np.isnan(column)]
+            columnResults[stat] = {
+                "min_val": float(column.min()),
+                "max_val": float(column.max()),
+                "count": float(len(column)),
+                "median": np.median(column),
+                "standard_deviation": np.std(column),
+                "mean": float(column.mean()),
+                "sum": float(column.sum()),
+            }
+        return columnResults
     if location == "disk":
-        reader: Union[GzipFile, List[bytes]] = gzip.open(cast(str, data))
+        reader: Union[BlockReader, GzipFile, List[bytes]] = openJobs(cast(str, data))
     else:
         reader = cast(List[bytes], data)
-    statDict: Dict[str, Dict[str, Union[float, List[float]]]] = {}
-    resultDict: Dict[str, Dict[str, float]] = {}
+    accumulators: Dict[str, StatAccumulator] = {}
+    compiled: Dict[str, Expression] = {}
     for stat in stats:
-        statDict[stat] = {
-            "sum_val": 0.0,
-            "max_val": 0.0,
-            "min_val": sys.float_info.max,
-            "vals": [],
-            "count": 0.0,
-        }
-        resultDict[stat] = {
-            "min_val": sys.float_info.max,
-            "max_val": 0.0,
-            "count": 0.0,
-            "median": 0.0,
-            "standard_deviation": 0.0,
-            "mean": 0.0,
-            "sum": 0.0,
-        }
+        accumulators[stat] = StatAccumulator()
+        compiled[stat] = parseStat(stat)
+    fields: dict = projectFields(
+        [path for expression in compiled.values() for path in expression.paths]
+    )
     for line in reader:
         if location == "disk":
-            job = Job(**ujson.loads(line))
+            job = decodeJob(ujson.loads(line), fields, locale)
         else:
-            job = Job(**ujson.loads(zlib.decompress(line)))
-        for stat in statDict:
-            val = float(
-                getValMultiDimensional(
-                    job,
-                    list(
-                        map(
-                            lambda ele: int(ele) if ele.isdigit() else ele, stat.split()
-                        )
-                    ),
-                )
-            )
-            cast(Dict[str, float], statDict[stat])["sum_val"] += val
-            cast(Dict[str, float], statDict[stat])["count"] += 1.0
-            statDict[stat]["max_val"] = max(statDict[stat]["max_val"], val)
-            statDict[stat]["min_val"] = min(statDict[stat]["min_val"], val)
-            cast(List[float], statDict[stat]["vals"]).append(val)
+            job = decodeJob(ujson.loads(decompressJob(data, line)), fields, locale)
+        for stat in accumulators:
+            value: float = compiled[stat](job)
+            if value == value:
+                accumulators[stat].add(value)
     if location == "disk":
         cast(GzipFile, reader).close()
+    resultDict: Dict[str, Dict[str, float]] = {}
     for stat in stats:
-        resultDict[stat]["min_val"] = cast(float, statDict[stat]["min_val"])
-        resultDict[stat]["max_val"] = cast(float, statDict[stat]["max_val"])
-        resultDict[stat]["mean"] = cast(float, statDict[stat]["sum_val"]) / cast(
-            float, statDict[stat]["count"]
-        )
-        resultDict[stat]["standard_deviation"] = np.std(statDict[stat]["vals"])
-        resultDict[stat]["median"] = np.median(statDict[stat]["vals"])
-        resultDict[stat]["sum"] = cast(float, statDict[stat]["sum_val"])
-        resultDict[stat]["count"] = cast(float, statDict[stat]["count"])
+        resultDict[stat] = accumulators[stat].summary()
     return resultDict
 
 
@@ -490,19 +532,31 @@ def waveClearPercentageWithWeapon(location, data, weapon):
     :type weapon: str
     :return:
     :rtype: float
+    :raises ZeroDivisionError: if the player never used the weapon
 
     """
+    if location == "columns":
+        code: int = data.code("weapons", weapon, locale)
+        weapons: np.ndarray = (data["weapons"][:, 0, :] == code) & (code >= 0)
+        clearWaves: np.ndarray = data["clear_waves"]
+        cleared: np.ndarray = (
+            (weapons[:, 0] & (clearWaves > 0))
+            | (weapons[:, 1] & (clearWaves > 1))
+            | (weapons[:, 2] & (clearWaves > 2))
+        )
+        return float(cleared.sum()) / float(weapons.any(axis=1).sum())
     if location == "disk":
-        reader = gzip.open(data)
+        reader = openJobs(data)
     else:
         reader = data
     sumVal: float = 0.0
+    fields: dict = projectFields(["my_data weapons", "clear_waves"])
     count: float = 0.0
     for line in reader:
         if location == "disk":
-            job = Job(**ujson.loads(line))
+            job = decodeJob(ujson.loads(line), fields, locale)
         else:
-            job = Job(**ujson.loads(zlib.decompress(line)))
+            job = decodeJob(ujson.loads(decompressJob(data, line)), fields, locale)
         sumVal += int(
             (
                 weapon
@@ -510,7 +564,7 @@ def waveClearPercentageWithWeapon(location, data, weapon):
                     job.my_data.weapons[0].key,
                     getattr(job.my_data.weapons[0].name, locale),
                 )
-                and job["clear_waves"] > 0
+                and job.clear_waves > 0
             )
             or (
                 len(job.my_data.weapons) > 1
@@ -634,80 +688,94 @@ def getWavesAttribute(data: Job, attr) -> str:
 
 def getOverview(location, data) -> str:
     """
+    Summarise a data set. A data set without jobs only reports its job count.
 
     :param data:
     :type data: str
 
     """
     result = ""
+    if location == "columns":
+        return getColumnsOverview(data)
     if location == "disk":
         result = data + "\n"
-        reader = gzip.open(data)
+    accumulators: Dict[str, StatAccumulator] = {}
+    if location == "disk" and not isSelection(data):
+        accumulators = refreshAggregate(data, overviewAggregate).groups.get("all", {})
     else:
-        reader = data
-    stats = [
-        "clear_waves",
-        "my_data golden_egg_delivered",
-        "my_data power_egg_collected",
-        "my_data rescue",
-        "my_data death",
-        "danger_rate",
-    ]
-    clearCount: float = 0.0
-    waveTwoCount: float = 0.0
-    waveOneCount: float = 0.0
-    sumVal: List[float] = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-    maxVal: List[float] = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-    minVal: List[float] = [
-        sys.float_info.max,
-        sys.float_info.max,
-        sys.float_info.max,
-        sys.float_info.max,
-        sys.float_info.max,
-        sys.float_info.max,
-    ]
-    vals: List[List[float]] = [[], [], [], [], [], []]
-    count: int = 0
-    for line in reader:
         if location == "disk":
-            job = Job(**ujson.loads(line))
+            reader = openJobs(data)
         else:
-            job = Job(**ujson.loads(zlib.decompress(line)))
-        count += 1
-        clearCount += float(job.clear_waves == 3)
-        waveTwoCount += float(job.clear_waves >= 2)
-        waveOneCount += float(job.clear_waves >= 1)
-        for i in range(0, len(stats)):
-            val = float(
-                getValMultiDimensional(
-                    job,
-                    cast(List[Union[str, int]], stats[i].split()),
-                )
-            )
-            sumVal[i] += val
-            maxVal[i] = max(maxVal[i], val)
-            minVal[i] = min(minVal[i], val)
-            vals[i].append(val)
-    result += "Jobs: " + str(count) + "\n"
-    result += "Average Waves: " + str(sumVal[0] / count) + "\n"
-    result += "Clear %: " + str(clearCount / count) + "\n"
-    result += "Wave 2 %: " + str(waveTwoCount / count) + "\n"
-    result += "Wave 1 %: " + str(waveOneCount / count) + "\n"
-    result += "Golden: {} ({}, {}, {}\n".format(
-        sumVal[1] / count, minVal[1], np.median(vals[1]), maxVal[1]
-    )
-    result += "Power Eggs: {} ({}, {}, {})\n".format(
-        sumVal[2] / count, minVal[2], np.median(vals[2]), maxVal[2]
-    )
-    result += "Rescued: {} ({}, {}, {})\n".format(
-        sumVal[3] / count, minVal[3], np.median(vals[3]), maxVal[3]
-    )
-    result += "Deaths: {} ({}, {}, {})\n".format(
-        sumVal[4] / count, minVal[4], np.median(vals[4]), maxVal[4]
-    )
-    result += "Hazard Level: {} ({}, {}, {})\n".format(
-        sumVal[5] / count, minVal[5], np.median(vals[5]), maxVal[5]
+            reader = data
+        overview: MaterializedAggregate = MaterializedAggregate(overviewAggregate)
+        for line in reader:
+            if location == "disk":
+                overview.fold(ujson.loads(line))
+            else:
+                overview.fold(ujson.loads(decompressJob(data, line)))
+        accumulators = overview.groups.get("all", {})
+    if not accumulators:
+        return result + "Jobs: 0\n"
+    count: float = accumulators["cleared"].moments.count
+    result += "Jobs: " + str(int(count)) + "\n"
+    result += (
+        "Average Waves: "
+        + str(accumulators["clear_waves"].moments.total / count)
+        + "\n"
     )
+    result += "Clear %: " + str(accumulators["cleared"].moments.total / count) + "\n"
+    result += "Wave 2 %: " + str(accumulators["wave_two"].moments.total / count) + "\n"
+    result += "Wave 1 %: " + str(accumulators["wave_one"].moments.total / count) + "\n"
+    for label, stat in zip(
+        (
+            "Golden: {} ({}, {}, {}\n",
+            "Power Eggs: {} ({}, {}, {})\n",
+            "Rescued: {} ({}, {}, {})\n",
+            "Deaths: {} ({}, {}, {})\n",
+            "Hazard Level: {} ({}, {}, {})\n",
+        ),
+        overviewStats[1:],
+    ):
+        result += label.format(
+            accumulators[stat].moments.total / count,
+            accumulators[stat].moments.minimum,
+            accumulators[stat].median(),
+            accumulators[stat].moments.maximum,
+        )
+    return result
+
+
+def getColumnsOverview(data: JobColumns) -> str:
+    """
+    Summarise a columnar data set the same way getOverview summarises a data file.
+
+    :param data: the columns to summarise
+    :type data: JobColumns
+    :return: the overview
+    :rtype: str
+
+    """
+    result = ""
+    count: int = len(data)
+    clearWaves: np.ndarray = data["clear_waves"]
+    result += "Jobs: " + str(count) + "\n"
+    if count == 0:
+        return result
+    result += "Average Waves: " + str(float(clearWaves.sum()) / count) + "\n"
+    result += "Clear %: " + str(float((clearWaves == 3).sum()) / count) + "\n"
+    result += "Wave 2 %: " + str(float((clearWaves >= 2).sum()) / count) + "\n"
+    result += "Wave 1 %: " + str(float((clearWaves >= 1).sum()) / count) + "\n"
+    for label, stat in (
+        ("Golden: {} ({}, {}, {}\n", "my_data golden_egg_delivered"),
+        ("Power Eggs: {} ({}, {}, {})\n", "my_data power_egg_collected"),
+        ("Rescued: {} ({}, {}, {})\n", "my_data rescue"),
+        ("Deaths: {} ({}, {}, {})\n", "my_data death"),
+        ("Hazard Level: {} ({}, {}, {})\n", "danger_rate"),
+    ):
+        column: np.ndarray = getColumn(data, stat).astype(np.float64)
+        result += label.format(
+            column.sum() / count, column.min(), np.median(column), column.max()
+        )
     return result
 
 
@@ -941,6 +1009,9 @@ def getBosses(data: Job) -> List[Union[Dict[str, str], Dict[str, int]]]:
 
 def getSingleJob(data, index=0) -> Optional[Job]:
     """
+    Find a job in a data file by its position, decompressing only the block it is in.
+
+    A file without a current block index is read in order up to the job.
 
     :param data: the full name of the data file
     :type data: str
@@ -952,12 +1023,61 @@ def getSingleJob(data, index=0) -> Optional[Job]:
     :raises FileNotFoundError: if the file doesn't exist
 
     """
-    count = 0
-    with gzip.open(data) as reader:
-        for line in reader:
-            if count == index:
+    if index < 0:
+        return None
+    blockIndex: Optional[dict] = readBlockIndex(data)
+    if blockIndex is None:
+        with gzip.open(data) as reader:
+            for line in islice(reader, index, index + 1):
                 return Job(**ujson.loads(line))
-            count += 1
+        return None
+    if index >= blockIndex["count"]:
+        return None
+    block: int = findBlock(blockIndex, index)
+    line: bytes = readBlock(data, blockIndex, block)[
+        index - blockIndex["first_index"][block]
+    ]
+    return Job(**ujson.loads(line))
+
+
+def getJobById(data: str, jobId: int) -> Optional[Job]:
+    """
+    Find a job in a data file by its stat.ink ID, decompressing only the block it is in.
+
+    A file without a current block index is read in order instead. Reading
+    never rewrites the file; only init converts it to blocks.
+
+    :param data: the full name of the data file
+    :type data: str
+    :param jobId: the stat.ink ID of the job
+    :type jobId: int
+    :return: either the found job or None if the data file doesn't have that ID
+    :rtype: Optional[Job]
+    :raises gzip.BadGzipFile: if the file exists but isn't a gzip file
+    :raises FileNotFoundError: if the file doesn't exist
+
+    :Example:
+
+    >>> import core
+    >>> core.getJobById("data/salmonAll.jl.gz", 1418432).id
+    1418432
+
+    """
+    blockIndex: Optional[dict] = readBlockIndex(data)
+    if blockIndex is None:
+        with gzip.open(data) as reader:
+            for line in reader:
+                job: dict = ujson.loads(line)
+                if job["id"] == jobId:
+                    return Job(**job)
+        return None
+    block: int = findBlockById(blockIndex, jobId)
+    if block < 0:
+        return None
+    for line in readBlock(data, blockIndex, block):
+        job = ujson.loads(line)
+        if job["id"] == jobId:
+            return Job(**job)
     return None
 
 
@@ -1013,15 +1133,17 @@ def printBosses(data: Job) -> None:
             )
 
 
-def getArrayOfStat(location, data: Union[str, List[bytes]], stat) -> List[float]:
+def getArrayOfStat(
+    location, data: Union[str, List[bytes], JobColumns], stat
+) -> List[float]:
     """
     Collect all the values of a single stat for a given list of jobs.
 
     :param data: the full path to the data file
     :type data: str
-    :param stat: the stat to retrieve
-    :type stat: str
-    :return: the stat for each job in the data
+    :param stat: the stat expression to evaluate, such as "sum(team golden_egg_delivered)"
+    :type stat: Union[str, Expression]
+    :return: the stat for each job in the data, NaN where a job doesn't have it
     :rtype: List[float]
 
     :Example:
@@ -1031,38 +1153,27 @@ def getArrayOfStat(location, data: Union[str, List[bytes]], stat) -> List[float]
     3.0
 
     """
+    expression: Expression = parseStat(stat)
+    if location == "columns":
+        return expression.column(cast(JobColumns, data)).tolist()
     if location == "disk":
-        reader: Union[GzipFile, List[bytes]] = gzip.open(cast(str, data))
+        reader: Union[BlockReader, GzipFile, List[bytes]] = openJobs(cast(str, data))
     else:
         reader = cast(List[bytes], data)
     results: List[float] = []
+    fields: dict = projectFields(expression.paths)
     for line in reader:
         if location == "disk":
-            job = Job(**ujson.loads(line))
+            job = decodeJob(ujson.loads(line), fields, locale)
         else:
-            job = Job(**ujson.loads(zlib.decompress(line)))
-        results.append(
-            float(
-                getValMultiDimensional(
-                    job,
-                    cast(
-                        List[Union[str, int]],
-                        list(
-                            map(
-                                lambda ele: int(ele) if ele.isdigit() else ele,
-                                stat.split(),
-                            )
-                        ),
-                    ),
-                )
-            )
-        )
+            job = decodeJob(ujson.loads(decompressJob(data, line)), fields, locale)
+        results.append(expression(job))
     if location == "disk":
         cast(GzipFile, reader).close()
     return results
 
 
-def init(mode, data_path, api_key="") -> str:
+def init(mode, data_path, api_key="", base_url=statInkUrl, shards=1) -> str:
     """
     Fetch the data sets from stat.ink
 
@@ -1072,6 +1183,10 @@ def init(mode, data_path, api_key="") -> str:
     :type data_path: str
     :param api_key: the stat.ink API key for the user to fetch
     :type api_key: str
+    :param base_url: the root URL of the stat.ink API
+    :type base_url: str
+    :param shards: if there is no data file yet, the number of ID ranges to fetch in parallel
+    :type shards: int
     :return: the resulting data file path
     :rtype: str
 
@@ -1096,88 +1211,494 @@ def init(mode, data_path, api_key="") -> str:
     headers: Dict[str, str] = {}
     if mode == "All":
         fileName: str = data_path + "salmonAll.jl.gz"
-        url: str = "http://stat.ink/api/v2/salmon"
+        url: str = base_url + "salmon"
     elif mode == "User":
         fileName = data_path + "salmon.jl.gz"
-        url = "http://stat.ink/api/v2/user-salmon"
+        url = base_url + "user-salmon"
         headers = {"Authorization": "Bearer {}".format(api_key)}
+    if shards > 1 and not os.path.exists(fileName):
+        backfill(fileName, url, headers, shards)
     if os.path.exists(fileName):
-        recentId = 0
-        try:
-            with gzip.open(fileName) as reader:
+        manifest: Dict[str, int] = resumePoint(fileName)
+    else:
+        manifest = {"last_id": 0, "count": 0, "size": 0}
+    params: Dict[str, str] = {"order": "asc"}
+    if manifest["count"] > 0:
+        params["newer_than"] = str(manifest["last_id"])
+    blockIndex: Optional[dict] = (
+        readBlockIndex(fileName) if os.path.exists(fileName) else newBlockIndex()
+    )
+    first: bool = True
+    try:
+        for page in fetchPages(url, params, headers):
+            if first:
                 try:
-                    os.remove(fileName[0:-6] + "Temp.jl.gz")
+                    shutil.rmtree(fileName[0:-6])
                 except FileNotFoundError:
                     pass
-                with gzip.open(
-                    fileName[0:-6] + "Temp.jl.gz", "at", encoding="utf8"
-                ) as writer:
+                first = False
+            manifest = appendJobs(fileName, page, manifest, blockIndex)
+            print(manifest["last_id"])
+    finally:
+        if blockIndex is not None and os.path.exists(fileName):
+            writeBlockIndex(fileName, blockIndex)
+    if os.path.exists(fileName):
+        compactBlocks(fileName, loadBlockIndex(fileName))
+    return fileName
+
+
+def backfill(
+    fileName: str, url: str, headers: Dict[str, str], shards: int, workers: int = 4
+) -> None:
+    """
+    Fetch a whole stat.ink listing by splitting the ID space into ranges and fetching several at once.
+
+    Each range is fetched into its own segment file under <name>Segments/, with
+    its own manifest as a checkpoint, so an interrupted backfill only fetches the
+    unfinished ranges again. Once every range is done, the segments are joined
+    in ID order into the data file, written in blocks.
+
+    :param fileName: the full path of the data file to create
+    :type fileName: str
+    :param url: the full URL of the listing
+    :type url: str
+    :param headers: extra headers to send, such as the authorization header
+    :type headers: Dict[str, str]
+    :param shards: the number of ID ranges
+    :type shards: int
+    :param workers: the number of ranges to fetch at once
+    :type workers: int
+
+    """
+    segmentPath: str = fileName[0:-6] + "Segments/"
+    try:
+        os.mkdir(segmentPath)
+    except FileExistsError:
+        pass
+    try:
+        with open(segmentPath + "plan.json", "r") as reader:
+            bounds: List[int] = ujson.load(reader)
+    except (FileNotFoundError, ValueError):
+        newest: int = latestId(url, headers)
+        bounds = sorted(
+            set([newest * i // shards for i in range(0, shards)] + [newest])
+        )
+        with open(segmentPath + "plan.json", "w") as writer:
+            ujson.dump(bounds, writer)
+    segments: List[str] = [
+        segmentPath + "{}-{}.jl.gz".format(bounds[i], bounds[i + 1])
+        for i in range(0, len(bounds) - 1)
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(
+            pool.map(
+                lambda i: fetchRange(
+                    segments[i], url, headers, bounds[i], bounds[i + 1]
+                ),
+                range(0, len(segments)),
+            )
+        )
+    manifest: Dict[str, int] = {"last_id": 0, "count": 0, "size": 0}
+    blockIndex: dict = newBlockIndex()
+    readers: List[GzipFile] = []
+    for segment in segments:
+        checkpoint: Dict[str, int] = cast(Dict[str, int], readDataManifest(segment))
+        if checkpoint["count"] > 0:
+            readers.append(gzip.open(segment))
+            manifest["last_id"] = checkpoint["last_id"]
+            manifest["count"] += checkpoint["count"]
+    with open(fileName[0:-6] + "Temp.jl.gz", "wb") as writer:
+        writeBlocks(writer, chain(*readers), blockIndex)
+        writer.flush()
+        os.fsync(writer.fileno())
+        manifest["size"] = writer.tell()
+    for reader in readers:
+        reader.close()
+    os.replace(fileName[0:-6] + "Temp.jl.gz", fileName)
+    writeDataManifest(fileName, manifest)
+    writeBlockIndex(fileName, blockIndex)
+    shutil.rmtree(segmentPath)
+
+
+def fetchRange(
+    segment: str, url: str, headers: Dict[str, str], newerThan: int, upTo: int
+) -> str:
+    """
+    Fetch the jobs with IDs after newerThan, up to and including upTo, into a segment file.
+
+    A segment whose manifest is marked done is left alone, and an unfinished one
+    resumes after its last job.
+
+    :param segment: the full path of the segment file
+    :type segment: str
+    :param url: the full URL of the listing
+    :type url: str
+    :param headers: extra headers to send, such as the authorization header
+    :type headers: Dict[str, str]
+    :param newerThan: the ID the range starts after
+    :type newerThan: int
+    :param upTo: the last ID in the range
+    :type upTo: int
+    :return: the full path of the segment file
+    :rtype: str
+
+    """
+    if os.path.exists(segment):
+        manifest: Dict[str, int] = resumePoint(segment)
+        if manifest.get("done"):
+            return segment
+    else:
+        manifest = {"last_id": 0, "count": 0, "size": 0}
+    params: Dict[str, str] = {
+        "order": "asc",
+        "newer_than": str(max(newerThan, manifest["last_id"])),
+        "older_than": str(upTo + 1),
+    }
+    for page in fetchPages(url, params, headers):
+        manifest = appendJobs(segment, page, manifest)
+    if not os.path.exists(segment):
+        open(segment, "wb").close()
+    manifest["done"] = 1
+    writeDataManifest(segment, manifest)
+    return segment
+
+
+def dataManifestPath(data: str) -> str:
+    """
+    Find the sidecar manifest of a data file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the full path of the manifest
+    :rtype: str
+
+    """
+    return data[0:-6] + "Manifest.json"
+
+
+def readDataManifest(data: str) -> Optional[Dict[str, int]]:
+    """
+    Read the last job ID, job count and byte length recorded for a data file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the manifest, or None if it is missing or unreadable
+    :rtype: Optional[Dict[str, int]]
+
+    """
+    try:
+        with open(dataManifestPath(data), "r") as reader:
+            manifest: Dict[str, int] = ujson.load(reader)
+    except (FileNotFoundError, ValueError):
+        return None
+    if not all(key in manifest for key in ("last_id", "count", "size")):
+        return None
+    return manifest
+
+
+def writeDataManifest(data: str, manifest: Dict[str, int]) -> None:
+    """
+    Atomically replace the manifest of a data file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param manifest: the last job ID, job count and byte length of the data file
+    :type manifest: Dict[str, int]
+
+    """
+    with open(dataManifestPath(data) + ".tmp", "w") as writer:
+        ujson.dump(manifest, writer)
+        writer.flush()
+        os.fsync(writer.fileno())
+    os.replace(dataManifestPath(data) + ".tmp", dataManifestPath(data))
+
+
+def appendJobs(
+    data: str,
+    jobs: List[dict],
+    manifest: Dict[str, int],
+    blockIndex: Optional[dict] = None,
+) -> Dict[str, int]:
+    """
+    Append a page of jobs to a data file as its own gzip member, then record it in the manifest.
+
+    The manifest is only replaced once the page is synced, so its byte length
+    always ends on a complete gzip member.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param jobs: the page of jobs
+    :type jobs: List[dict]
+    :param manifest: the manifest before the page was appended
+    :type manifest: Dict[str, int]
+    :param blockIndex: the block index of the data file, which gets the page added as a block, left for the caller to write
+    :type blockIndex: Optional[dict]
+    :return: the manifest after the page was appended
+    :rtype: Dict[str, int]
+
+    """
+    page: bytes = gzip.compress(
+        "".join(ujson.dumps(job) + "\n" for job in jobs).encode("utf8")
+    )
+    with open(data, "ab") as writer:
+        offset: int = writer.tell()
+        writer.write(page)
+        writer.flush()
+        os.fsync(writer.fileno())
+        size: int = writer.tell()
+    if blockIndex is not None:
+        addBlock(blockIndex, offset, len(jobs), jobs[0]["id"])
+        blockIndex["size"] = size
+    manifest = {
+        "last_id": jobs[-1]["id"],
+        "count": manifest["count"] + len(jobs),
+        "size": size,
+    }
+    writeDataManifest(data, manifest)
+    return manifest
+
+
+def scanJobs(data: str, offset: int) -> Tuple[int, int]:
+    """
+    Count the jobs in a data file from a gzip member boundary onwards.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param offset: the byte offset of a gzip member in the file
+    :type offset: int
+    :return: the number of jobs and the ID of the last one (0 if there are none)
+    :rtype: Tuple[int, int]
+    :raises gzip.BadGzipFile: if the file isn't a gzip file from that offset
+    :raises EOFError: if the last gzip member is incomplete
+
+    """
+    count: int = 0
+    lastId: int = 0
+    with open(data, "rb") as raw:
+        raw.seek(offset)
+        with gzip.GzipFile(fileobj=raw) as reader:
+            for line in reader:
+                lastId = ujson.loads(line)["id"]
+                count += 1
+    return (count, lastId)
+
+
+def rebuildDataManifest(data: str) -> Dict[str, int]:
+    """
+    Recreate the manifest of a data file by reading the whole file.
+
+    If the file ends in an incomplete write, it is rewritten with only the
+    complete jobs.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the manifest
+    :rtype: Dict[str, int]
+
+    """
+    try:
+        count, lastId = scanJobs(data, 0)
+    except (OSError, EOFError, ValueError, zlib.error):
+        count = 0
+        lastId = 0
+        with gzip.open(data) as reader:
+            with gzip.open(data[0:-6] + "Temp.jl.gz", "wb") as writer:
+                try:
                     for line in reader:
-                        job = ujson.loads(line)
-                        writer.write(ujson.dumps(job))
-                        writer.write("\n")
-                        recentId = job["id"]
-            os.remove(fileName[0:-6] + "Temp.jl.gz")
-        except (zlib.error):
-            os.replace(fileName[0:-6] + "Temp.jl.gz", fileName)
-        prevLastId: int = 0
-        params: Dict[str, str] = {"order": "asc", "newer_than": str(recentId)}
-        temp: List[Job] = requests.get(url, headers=headers, params=params).json()
-        if len(temp) > 0:
-            try:
-                shutil.rmtree(fileName[0:-6])
-            except FileNotFoundError:
-                pass
-            lastId: int = cast(List[Dict[str, int]], temp)[-1]["id"]
-            print(lastId)
-            with gzip.open(fileName, "at", encoding="utf8") as writer:
-                while lastId != prevLastId:
-                    for job in temp:
-                        ujson.dump(job, writer)
-                        writer.write("\n")
-                    writer.flush()
-                    os.fsync(writer.fileno())
-                    params["newer_than"] = str(lastId)
-                    result = requests.get(
-                        url,
-                        headers=headers,
-                        params=params,
-                    )
-                    print(result.url)
-                    print(result)
-                    temp = result.json()
-                    prevLastId = lastId
-                    if len(temp) > 0:
-                        lastId = cast(List[Dict[str, int]], temp)[-1]["id"]
-                    print(lastId)
+                        if not line.endswith(b"\n"):
+                            break
+                        lastId = ujson.loads(line)["id"]
+                        writer.write(line)
+                        count += 1
+                except (EOFError, ValueError, zlib.error):
+                    pass
+        os.replace(data[0:-6] + "Temp.jl.gz", data)
+    return {"last_id": lastId, "count": count, "size": os.path.getsize(data)}
+
+
+def resumePoint(data: str) -> Dict[str, int]:
+    """
+    Find where to resume fetching a data file from.
+
+    The manifest answers in constant time when it matches the file. If the file
+    grew past the manifest, only the tail is read, and a tail left incomplete by
+    an interrupted write is cut off. Without a usable manifest, it is rebuilt from
+    the whole file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the last job ID, job count and byte length of the data file
+    :rtype: Dict[str, int]
+
+    """
+    size: int = os.path.getsize(data)
+    manifest: Optional[Dict[str, int]] = readDataManifest(data)
+    if manifest is not None and manifest["size"] == size:
+        return manifest
+    if manifest is not None and manifest["size"] < size:
+        try:
+            count, lastId = scanJobs(data, manifest["size"])
+            manifest = {
+                "last_id": lastId if count > 0 else manifest["last_id"],
+                "count": manifest["count"] + count,
+                "size": size,
+            }
+        except (OSError, EOFError, ValueError, zlib.error):
+            os.truncate(data, manifest["size"])
     else:
-        prevLastId = 0
-        params = {"order": "asc"}
-        temp = requests.get(url, headers=headers, params=params).json()
-        lastId = cast(List[Dict[str, int]], temp)[-1]["id"]
-        print(lastId)
-        with gzip.open(fileName, "at", encoding="utf8") as writer:
-            while lastId != prevLastId:
-                for job in temp:
-                    ujson.dump(job, writer)
-                    writer.write("\n")
-                writer.flush()
-                os.fsync(writer.fileno())
-                params["newer_than"] = str(lastId)
-                result = requests.get(url, headers=headers, params=params)
-                print(result.url)
-                print(result)
-                temp = result.json()
-                prevLastId = lastId
-                if len(temp) > 0:
-                    lastId = cast(List[Dict[str, int]], temp)[-1]["id"]
-                print(lastId)
-    return fileName
+        manifest = rebuildDataManifest(data)
+    writeDataManifest(data, manifest)
+    return manifest
+
+
+def loadBlockIndex(data: str) -> dict:
+    """
+    Read the block index of a data file, rewriting the file in blocks if the index is missing or stale.
+
+    This rewrites the file and removes its manifest, so it's only for init;
+    reads use readBlockIndex and fall back to reading the file in order.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the block index
+    :rtype: dict
+    :raises gzip.BadGzipFile: if the file exists but isn't a gzip file
+    :raises FileNotFoundError: if the file doesn't exist
+
+    """
+    blockIndex: Optional[dict] = readBlockIndex(data)
+    if blockIndex is None:
+        blockIndex = blockDataFile(data)
+    return blockIndex
+
+
+def blockDataFile(data: str, blockJobs: int = BLOCK_JOBS) -> dict:
+    """
+    Rewrite a data file as gzip blocks of blockJobs jobs each, with a block index beside it.
+
+    The manifest is removed before the new file replaces the old one, so an
+    interrupted rewrite is caught by resumePoint instead of trusted.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param blockJobs: the number of jobs in each block
+    :type blockJobs: int
+    :return: the block index
+    :rtype: dict
+    :raises gzip.BadGzipFile: if the file exists but isn't a gzip file
+    :raises FileNotFoundError: if the file doesn't exist
+
+    :Example:
+
+    >>> import core
+    >>> core.blockDataFile("data/salmonAll.jl.gz")["count"]
+    1418432
 
+    """
+    manifest: Dict[str, int] = resumePoint(data)
+    blockIndex: dict = newBlockIndex()
+    with gzip.open(data) as reader:
+        with open(data[0:-6] + "Temp.jl.gz", "wb") as writer:
+            writeBlocks(writer, reader, blockIndex, blockJobs)
+            writer.flush()
+            os.fsync(writer.fileno())
+    os.remove(dataManifestPath(data))
+    os.replace(data[0:-6] + "Temp.jl.gz", data)
+    writeDataManifest(
+        data,
+        {
+            "last_id": manifest["last_id"],
+            "count": manifest["count"],
+            "size": blockIndex["size"],
+        },
+    )
+    writeBlockIndex(data, blockIndex)
+    return blockIndex
+
+
+def compactBlocks(data: str, blockIndex: dict, blockJobs: int = BLOCK_JOBS) -> dict:
+    """
+    Merge the short blocks at the end of a data file into full blocks.
+
+    Each page core.init appends becomes its own short block. Once those add up
+    to a full block, they are rewritten in place, with the manifest removed until
+    the rewrite is synced.
 
-def loadJobsFromFile(data) -> List[bytes]:
-    jobs: List[bytes] = []
+    :param data: the full path of the data file
+    :type data: str
+    :param blockIndex: the block index of the data file
+    :type blockIndex: dict
+    :param blockJobs: the number of jobs in each block
+    :type blockJobs: int
+    :return: the block index after merging
+    :rtype: dict
+
+    """
+    blockCount: int = len(blockIndex["offsets"])
+    start: int = blockCount
+    while start > 0 and blockLength(blockIndex, start - 1) < blockJobs:
+        start -= 1
+    if (
+        blockCount - start < 2
+        or blockIndex["count"] - blockIndex["first_index"][start] < blockJobs
+    ):
+        return blockIndex
+    manifest: Dict[str, int] = resumePoint(data)
+    lines: List[bytes] = list(
+        readLines(data, blockIndex, blockIndex["first_index"][start])
+    )
+    offset: int = blockIndex["offsets"][start]
+    blockIndex = {
+        "offsets": blockIndex["offsets"][0:start],
+        "first_index": blockIndex["first_index"][0:start],
+        "first_id": blockIndex["first_id"][0:start],
+        "count": blockIndex["first_index"][start],
+        "size": offset,
+    }
+    os.remove(dataManifestPath(data))
+    with open(data, "r+b") as writer:
+        writer.seek(offset)
+        writeBlocks(writer, lines, blockIndex, blockJobs)
+        writer.truncate()
+        writer.flush()
+        os.fsync(writer.fileno())
+    manifest["size"] = blockIndex["size"]
+    writeDataManifest(data, manifest)
+    writeBlockIndex(data, blockIndex)
+    return blockIndex
+
+
+def loadJobsFromFile(data, dictionary: bool = False, header: bool = False) -> JobBuffer:
+    """
+    Load a data file into one buffer in memory, with each job compressed on its own.
+
+    :param data: the full name of the data file
+    :type data: str
+    :param dictionary: whether to compress against a preset dictionary trained from the data, which is stored next to the data file
+    :type dictionary: bool
+    :param header: whether to also keep the fields most filters test, decoded into the header of the buffer, which parses every job as it's loaded
+    :type header: bool
+    :return: the compressed jobs, to be read with decompressJob
+    :rtype: JobBuffer
+    :raises gzip.BadGzipFile: if the file exists but isn't a gzip file
+    :raises FileNotFoundError: if the file doesn't exist
+
+    :Example:
+
+    >>> import core
+    >>> data = core.loadJobsFromFile("data/salmonAll.jl.gz", dictionary=True)
+    >>> core.getOverview("mem", data)
+
+    """
+    jobs: JobBuffer = JobBuffer(zdict=loadDictionary(data) if dictionary else None)
+    builder: Optional[ColumnBuilder] = (
+        ColumnBuilder(columns=headerColumns) if header else None
+    )
     with gzip.open(data, "r") as reader:
         for line in reader:
-            jobs.append(zlib.compress(line))
+            jobs.append(compressJob(line, jobs.zdict))
+            if builder is not None:
+                builder.append(ujson.loads(line))
+    if builder is not None:
+        jobs.header = builder.finish()
     return jobs
@@ -0,0 +1,433 @@
+import math
+import operator
+import re
+import numpy as np
+from columns import JobColumns, getColumn, getColumns
+from typing import Callable, Dict, List, Tuple, Union
+
+tokenPattern = re.compile(r"\s*(?:(\d+\.\d*|\.\d+|\d+)|([A-Za-z_][A-Za-z0-9_]*)|(\S))")
+unpaddedRoots = ("id", "danger_rate", "clear_waves", "shift_start_at")
+operators: Dict[str, Callable] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+}
+
+
+def present(values: list) -> List[float]:
+    return [value for value in values if value == value]
+
+
+def listMean(values: list) -> float:
+    found: List[float] = present(values)
+    return math.fsum(found) / len(found) if len(found) > 0 else math.nan
+
+
+def listMin(values: list) -> float:
+    found: List[float] = present(values)
+    return min(found) if len(found) > 0 else math.nan
+
+
+def listMax(values: list) -> float:
+    found: List[float] = present(values)
+    return max(found) if len(found) > 0 else math.nan
+
+
+def columnMean(values: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nansum(values, axis=1) / (~np.isnan(values)).sum(axis=1)
+
+
+functions: Dict[str, Tuple[Callable, Callable]] = {
+    "sum": (
+        lambda values: math.fsum(present(values)),
+        lambda values: np.nansum(values, axis=1),
+    ),
+    "mean": (listMean, columnMean),
+    "min": (listMin, lambda values: np.fmin.reduce(values, axis=1)),
+    "max": (listMax, lambda values: np.fmax.reduce(values, axis=1)),
+    "count": (
+        lambda values: float(len(present(values))),
+        lambda values: (~np.isnan(values)).sum(axis=1).astype(np.float64),
+    ),
+}
+
+
+def divide(numerator: float, denominator: float) -> float:
+    if denominator == 0:
+        return math.nan
+    return numerator / denominator
+
+
+def divideColumns(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator == 0, np.nan, numerator / denominator)
+
+
+def child(value, step: Union[str, int]):
+    if isinstance(step, int):
+        return value[step] if step < len(value) else None
+    if isinstance(value, dict):
+        return value.get(step)
+    return getattr(value, step, None)
+
+
+def walk(value, steps: Tuple[Union[str, int], ...], start: int):
+    """
+    Follow a path from one of its steps on.
+
+    A name step on a list is followed on every element, so the result is a list
+    of values, such as one per wave for "waves golden_egg_delivered".
+
+    :param value: the Job object or parsed JSON to start at
+    :type value: Union[Job, dict, list]
+    :param steps: the attribute names and list indices of the path
+    :type steps: Tuple[Union[str, int], ...]
+    :param start: the index of the first step to follow
+    :type start: int
+    :return: the value as a float, a list of them, or NaN if the path leads to nothing
+    :rtype: Union[float, List[float]]
+
+    """
+    for i in range(start, len(steps)):
+        if value is None:
+            return math.nan
+        if isinstance(value, list) and not isinstance(steps[i], int):
+            return [walk(item, steps, i) for item in value]
+        value = child(value, steps[i])
+    if value is None:
+        return math.nan
+    if isinstance(value, list):
+        return [math.nan if item is None else float(item) for item in value]
+    return float(value)
+
+
+def follow(job, getters: list, steps: Tuple[Union[str, int], ...]):
+    if isinstance(job, dict):
+        return walk(job, steps, 0)
+    value = job
+    try:
+        for getter in getters:
+            value = value[getter] if getter.__class__ is int else getter(value)
+    except (AttributeError, IndexError, TypeError):
+        return walk(job, steps, 0)
+    if value is None or isinstance(value, list):
+        return walk(job, steps, 0)
+    return float(value)
+
+
+def pathFunction(steps: Tuple[Union[str, int], ...]) -> Callable:
+    """
+    Turn a path into a function of a job.
+
+    On Job objects, each run of attribute names is looked up with one
+    operator.attrgetter. Jobs parsed from JSON, and paths that meet a missing
+    value or a list without an index, are followed one step at a time by walk.
+
+    :param steps: the attribute names and list indices of the path
+    :type steps: Tuple[Union[str, int], ...]
+    :return: the function
+    :rtype: Callable
+
+    """
+    if steps[0] == "team":
+        return lambda job, steps=steps: walk(
+            [child(job, "my_data")] + (child(job, "teammates") or []), steps, 1
+        )
+    getters: list = []
+    names: List[str] = []
+    for step in steps:
+        if isinstance(step, int):
+            if len(names) > 0:
+                getters.append(operator.attrgetter(".".join(names)))
+                names = []
+            getters.append(step)
+        else:
+            names.append(step)
+    if len(names) > 0:
+        getters.append(operator.attrgetter(".".join(names)))
+    return lambda job, getters=getters, steps=steps: follow(job, getters, steps)
+
+
+def pathColumn(steps: Tuple[Union[str, int], ...]) -> Callable:
+    def column(data: JobColumns, steps=steps) -> np.ndarray:
+        stat: str = " ".join(str(step) for step in steps)
+        try:
+            values: np.ndarray = getColumn(data, stat)
+        except KeyError:
+            values = getColumns(data, stat)
+        values = values.astype(np.float64)
+        if steps[0] not in unpaddedRoots:
+            values[values < 0] = np.nan
+        return values
+
+    return column
+
+
+def manyValues(text: str) -> ValueError:
+    return ValueError(
+        text
+        + " has a value for each player, wave or quota, so it needs sum, mean, min, max or count"
+    )
+
+
+def scalar(value, text: str) -> float:
+    if isinstance(value, list):
+        raise manyValues(text)
+    return value
+
+
+def listOf(value) -> list:
+    return value if isinstance(value, list) else [value]
+
+
+def columnsOf(values: np.ndarray) -> np.ndarray:
+    return values if values.ndim > 1 else values.reshape(-1, 1)
+
+
+class Expression:
+    """
+    A stat written as arithmetic over attribute paths, parsed once.
+
+    A path is the space separated attribute names and list indices used
+    everywhere else, such as "my_data golden_egg_delivered" or "quota 0". A path
+    starting with "team" goes through the player and the teammates, so
+    "team 0 death" is the player's deaths. A path through a list without an
+    index, such as "waves golden_egg_delivered" or "team rescue", has a value
+    for every element, which sum, mean, min, max or count turn into one
+    value, leaving out players and waves a job doesn't have. Paths and numbers
+    combine with +, -, *, / and parentheses. A path a job doesn't have, and a
+    division by 0, give NaN.
+
+    Calling an expression with a Job object or a job parsed from its JSON line
+    follows each path with a precomputed chain of steps. ``column`` evaluates
+    it over a JobColumns with NumPy operations instead, and raises KeyError if
+    a path isn't stored in the columns.
+
+    :Example:
+
+    >>> import expressions
+    >>> import columns
+    >>> jobs = columns.loadColumnsFromFile("data/salmonAll.jl.gz")
+    >>> share = expressions.Expression("waves 0 golden_egg_delivered / quota 0")
+    >>> ratios = share.column(jobs)
+    >>> team = expressions.Expression("sum(team golden_egg_delivered) - my_data golden_egg_delivered")
+
+    """
+
+    __slots__ = ["text", "paths", "evaluate", "evaluateColumns"]
+
+    def __init__(self, text: str):
+        self.text: str = text
+        self.paths: List[str] = []
+        tokens: List[Tuple[str, str]] = tokenize(text)
+        position, tree = parseSum(tokens, 0)
+        if position < len(tokens):
+            raise ValueError(
+                "unexpected " + repr(tokens[position][1]) + " in " + repr(text)
+            )
+        evaluate, evaluateColumns = self.compile(tree)
+        if tree[0] == "path":
+            evaluate = lambda job, evaluate=evaluate, text=text: scalar(
+                evaluate(job), text
+            )
+        self.evaluate: Callable = evaluate
+        self.evaluateColumns: Callable = evaluateColumns
+
+    def __call__(self, job) -> float:
+        return self.evaluate(job)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def column(self, data: JobColumns) -> np.ndarray:
+        """
+        Evaluate the expression for every job of a columnar data set.
+
+        :param data: the columns
+        :type data: JobColumns
+        :return: one float per job
+        :rtype: np.ndarray
+        :raises KeyError: if a path isn't stored in the columns
+        :raises ValueError: if the expression has a value for each player or wave
+
+        """
+        values: np.ndarray = self.evaluateColumns(data)
+        if values.ndim > 1:
+            raise manyValues(self.text)
+        return values
+
+    def compile(self, tree: tuple) -> Tuple[Callable, Callable]:
+        """
+        Turn a parsed expression into a function of a job and a function of columns.
+
+        :param tree: the parsed expression
+        :type tree: tuple
+        :return: both functions
+        :rtype: Tuple[Callable, Callable]
+
+        """
+        kind: str = tree[0]
+        if kind == "number":
+            return (
+                lambda job, value=tree[1]: value,
+                lambda data, value=tree[1]: np.full(len(data), value),
+            )
+        if kind == "path":
+            steps: Tuple[Union[str, int], ...] = tree[1]
+            names: List[str] = [str(step) for step in steps]
+            if steps[0] == "team":
+                self.paths += [
+                    " ".join(["my_data"] + names[1:]),
+                    " ".join(["teammates"] + names[1:]),
+                ]
+            else:
+                self.paths.append(" ".join(names))
+            return pathFunction(steps), pathColumn(steps)
+        if kind == "call":
+            evaluate, evaluateColumns = self.compile(tree[2])
+            onList, onColumns = functions[tree[1]]
+            return (
+                lambda job, onList=onList, evaluate=evaluate: onList(
+                    listOf(evaluate(job))
+                ),
+                lambda data, onColumns=onColumns, evaluate=evaluateColumns: onColumns(
+                    columnsOf(evaluate(data))
+                ),
+            )
+        if kind == "negate":
+            evaluate, evaluateColumns = self.compile(tree[1])
+            return (
+                lambda job, evaluate=evaluate, text=self.text: -scalar(
+                    evaluate(job), text
+                ),
+                lambda data, evaluate=evaluateColumns: -evaluate(data),
+            )
+        left, leftColumns = self.compile(tree[2])
+        right, rightColumns = self.compile(tree[3])
+        onFloats: Callable = divide if tree[1] == "/" else operators[tree[1]]
+        onArrays: Callable = divideColumns if tree[1] == "/" else operators[tree[1]]
+        return (
+            lambda job, onFloats=onFloats, left=left, right=right, text=self.text: onFloats(
+                scalar(left(job), text), scalar(right(job), text)
+            ),
+            lambda data, onArrays=onArrays, left=leftColumns, right=rightColumns: onArrays(
+                left(data), right(data)
+            ),
+        )
+
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    """
+    Split an expression into numbers, names and symbols.
+
+    :param text: the expression
+    :type text: str
+    :return: the kind, "number", "name" or "symbol", and text of each token
+    :rtype: List[Tuple[str, str]]
+    :raises ValueError: if the expression is empty
+
+    """
+    tokens: List[Tuple[str, str]] = []
+    for number, name, symbol in tokenPattern.findall(text):
+        if number:
+            tokens.append(("number", number))
+        elif name:
+            tokens.append(("name", name))
+        else:
+            tokens.append(("symbol", symbol))
+    if len(tokens) == 0:
+        raise ValueError("empty stat expression")
+    return tokens
+
+
+def parseSum(tokens: List[Tuple[str, str]], position: int) -> Tuple[int, tuple]:
+    position, tree = parseProduct(tokens, position)
+    while position < len(tokens) and tokens[position][1] in ("+", "-"):
+        symbol: str = tokens[position][1]
+        position, right = parseProduct(tokens, position + 1)
+        tree = ("operator", symbol, tree, right)
+    return position, tree
+
+
+def parseProduct(tokens: List[Tuple[str, str]], position: int) -> Tuple[int, tuple]:
+    position, tree = parseFactor(tokens, position)
+    while position < len(tokens) and tokens[position][1] in ("*", "/"):
+        symbol: str = tokens[position][1]
+        position, right = parseFactor(tokens, position + 1)
+        tree = ("operator", symbol, tree, right)
+    return position, tree
+
+
+def parseFactor(tokens: List[Tuple[str, str]], position: int) -> Tuple[int, tuple]:
+    """
+    Parse a number, a path, a function call, a negation or an expression in parentheses.
+
+    A number directly after a name is a list index of the path, so "quota 0 + 1"
+    is the first quota plus 1.
+
+    :param tokens: the tokens of the expression
+    :type tokens: List[Tuple[str, str]]
+    :param position: the index of the first token of the factor
+    :type position: int
+    :return: the index of the token after the factor, and the factor
+    :rtype: Tuple[int, tuple]
+    :raises ValueError: if the tokens at position aren't a factor
+
+    """
+    if position >= len(tokens):
+        raise ValueError("stat expression ends too early")
+    kind, text = tokens[position]
+    if kind == "number":
+        return position + 1, ("number", float(text))
+    if text == "-":
+        position, tree = parseFactor(tokens, position + 1)
+        return position, ("negate", tree)
+    if text == "(":
+        position, tree = parseSum(tokens, position + 1)
+        return expect(tokens, position, ")"), tree
+    if kind != "name":
+        raise ValueError("unexpected " + repr(text) + " in stat expression")
+    if position + 1 < len(tokens) and tokens[position + 1][1] == "(":
+        if text not in functions:
+            raise ValueError("unknown function " + repr(text) + " in stat expression")
+        position, tree = parseSum(tokens, position + 2)
+        return expect(tokens, position, ")"), ("call", text, tree)
+    steps: List[Union[str, int]] = [text]
+    position += 1
+    while position < len(tokens) and tokens[position][0] in ("name", "number"):
+        if tokens[position][0] == "number" and not tokens[position][1].isdigit():
+            raise ValueError(
+                "list index " + repr(tokens[position][1]) + " in stat expression"
+            )
+        step: str = tokens[position][1]
+        steps.append(int(step) if step.isdigit() else step)
+        position += 1
+    return position, ("path", tuple(steps))
+
+
+def expect(tokens: List[Tuple[str, str]], position: int, symbol: str) -> int:
+    if position >= len(tokens) or tokens[position][1] != symbol:
+        raise ValueError("expected " + repr(symbol) + " in stat expression")
+    return position + 1
+
+
+expressionCache: Dict[str, Expression] = {}
+
+
+def parseStat(stat: Union[str, Expression]) -> Expression:
+    """
+    Parse a stat expression, reusing the expression if the same text was parsed before.
+
+    :param stat: the stat expression, or an already parsed one
+    :type stat: Union[str, Expression]
+    :return: the parsed expression
+    :rtype: Expression
+    :raises ValueError: if the expression can't be parsed
+
+    """
+    if isinstance(stat, Expression):
+        return stat
+    if stat not in expressionCache:
+        expressionCache[stat] = Expression(stat)
+    return expressionCache[stat]
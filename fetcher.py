@@ -0,0 +1,150 @@
+import queue
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Iterator
+
+statInkUrl = "http://stat.ink/api/v2/"
+
+
+def newSession(headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Create a keep-alive session for the stat.ink API.
+
+    :param headers: extra headers to send with every request, such as the authorization header
+    :type headers: Optional[Dict[str, str]]
+    :return: the session
+    :rtype: requests.Session
+
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    session.headers.update({"Accept-Encoding": "gzip", "Connection": "keep-alive"})
+    if headers is not None:
+        session.headers.update(headers)
+    return session
+
+
+class PageFetcher:
+    """
+    Walk the pages of a stat.ink listing on a producer thread.
+
+    The next page is requested as soon as the previous one has arrived, and up to
+    ``prefetch`` pages wait in a bounded queue for the consumer, which iterates
+    over the fetcher.
+
+    """
+
+    __slots__ = ["session", "url", "params", "pages", "stop", "error", "thread"]
+
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str,
+        params: Dict[str, str],
+        prefetch: int = 2,
+    ):
+        self.session: requests.Session = session
+        self.url: str = url
+        self.params: Dict[str, str] = dict(params)
+        self.pages: queue.Queue = queue.Queue(maxsize=prefetch)
+        self.stop: threading.Event = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.thread: threading.Thread = threading.Thread(target=self.run, daemon=True)
+
+    def put(self, page: Optional[List[dict]]) -> bool:
+        while not self.stop.is_set():
+            try:
+                self.pages.put(page, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run(self) -> None:
+        try:
+            while not self.stop.is_set():
+                result = self.session.get(self.url, params=self.params)
+                result.raise_for_status()
+                page: List[dict] = result.json()
+                if len(page) == 0:
+                    break
+                self.params["newer_than"] = str(page[-1]["id"])
+                if not self.put(page):
+                    return
+        except BaseException as error:
+            self.error = error
+        self.put(None)
+
+    def __iter__(self) -> Iterator[List[dict]]:
+        self.thread.start()
+        try:
+            while True:
+                page: Optional[List[dict]] = self.pages.get()
+                if page is None:
+                    break
+                yield page
+        finally:
+            self.stop.set()
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+def fetchPages(
+    url: str,
+    params: Dict[str, str],
+    headers: Optional[Dict[str, str]] = None,
+    prefetch: int = 2,
+) -> PageFetcher:
+    """
+    Fetch the pages of a stat.ink listing in ascending ID order, prefetching while the caller handles each page.
+
+    :param url: the full URL of the listing
+    :type url: str
+    :param params: the query parameters of the first page
+    :type params: Dict[str, str]
+    :param headers: extra headers to send, such as the authorization header
+    :type headers: Optional[Dict[str, str]]
+    :param prefetch: the most pages to hold before the caller takes them
+    :type prefetch: int
+    :return: an iterable of the non-empty pages
+    :rtype: PageFetcher
+    :raises requests.HTTPError: if a page can't be fetched
+
+    :Example:
+
+    >>> import fetcher
+    >>> for page in fetcher.fetchPages(
+    ...     "http://stat.ink/api/v2/salmon", {"order": "asc", "newer_than": "1418400"}
+    ... ):
+    ...     print(page[-1]["id"])
+    ...
+    1418450
+    1418471
+
+    """
+    return PageFetcher(newSession(headers), url, params, prefetch)
+
+
+def latestId(url: str, headers: Optional[Dict[str, str]] = None) -> int:
+    """
+    Find the ID of the newest job in a stat.ink listing.
+
+    :param url: the full URL of the listing
+    :type url: str
+    :param headers: extra headers to send, such as the authorization header
+    :type headers: Optional[Dict[str, str]]
+    :return: the newest ID, or 0 if the listing is empty
+    :rtype: int
+    :raises requests.HTTPError: if the listing can't be fetched
+
+    """
+    with newSession(headers) as session:
+        result = session.get(url, params={"order": "desc"})
+        result.raise_for_status()
+        page: List[dict] = result.json()
+    if len(page) == 0:
+        return 0
+    return page[0]["id"]
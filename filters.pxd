@@ -1,32 +1,63 @@
 import cython
 
-@cython.locals(reader=object, writerA=object, writerB=object, line=bytes, job=object, jobsWith=list, jobsWithout=list)
-cpdef object filterJobs(str location, object data, object filterFunction, str outpath)
+cpdef tuple splitJobs(object data, object mask)
 
-@cython.locals(reader=object, writerA=object, writerB=object, line=bytes, job=object, found=cython.bint, funct=object, jobsWith=list, jobsWithout=list)
-cpdef object filterJobsOr(str location, object data, list filterFunctions, str outpath)
+cpdef object columnMask(object columns, list headerFunctions, object combine)
 
-@cython.locals(reader=object, writerA=object, writerB=object, line=bytes, job=object, found=cython.bint, funct=object, jobsWith=list, jobsWithout=list)
-cpdef object filterJobsAnd(str location, object data, list filterFunctions, str outpath)
+@cython.locals(mask=object)
+cpdef object columnsMask(object columns, object headerFunctions, object combine, str outpath)
 
-@cython.locals(outPath=str, filterFunctions=list, player=str)
+@cython.locals(paths=tuple, base=str, rows=object, total=cython.int, mask=object, reader=object, i=cython.int, line=bytes, job=object)
+cpdef tuple filterSelection(str data, object filterFunction, str outpath, dict fields=*)
+
+@cython.locals(suffix=str, paths=tuple, base=str, rows=object, total=cython.int, index=object, mask=object, matched=object, reader=object, writerA=object, writerB=object, position=cython.int, line=bytes)
+cpdef tuple filterPostings(str data, list postingFunctions, object combine, str outpath)
+
+@cython.locals(reader=object, writerA=object, writerB=object, line=bytes, job=object, matches=list, header=object, mask=object)
+cpdef object filterJobs(str location, object data, object filterFunction, str outpath, dict fields=*, object headerFunction=*, object postingFunction=*)
+
+@cython.locals(reader=object, writerA=object, writerB=object, line=bytes, job=object, found=cython.bint, funct=object, matches=list, header=object, mask=object)
+cpdef object filterJobsOr(str location, object data, list filterFunctions, str outpath, dict fields=*, list headerFunctions=*, list postingFunctions=*)
+
+@cython.locals(reader=object, writerA=object, writerB=object, line=bytes, job=object, found=cython.bint, funct=object, matches=list, header=object, mask=object)
+cpdef object filterJobsAnd(str location, object data, list filterFunctions, str outpath, dict fields=*, list headerFunctions=*, list postingFunctions=*)
+
+@cython.locals(special=object, reason=object)
+cpdef set partitionKeys(dict job, str field)
+
+@cython.locals(times=object, values=object, names=list, column=str, vocabulary=str, player=object, jobs=cython.int, codes=object, positions=object, pairs=object)
+cpdef tuple columnKeys(object columns, str field)
+
+@cython.locals(names=list, groups=object, rows=object, starts=list)
+cpdef dict columnPartition(object columns, str field)
+
+@cython.locals(groups=dict, position=cython.int, line=object, key=str)
+cpdef tuple scanPartition(object lines, str field, object compressed=*)
+
+@cython.locals(rows=object, base=str, total=cython.int, groups=dict, index=object, key=str, positions=object, reader=object, count=cython.int, paths=dict)
+cpdef dict partitionFile(str data, str field)
+
+@cython.locals(groups=object, indices=object)
+cpdef dict partitionJobs(str location, object data, str field)
+
+@cython.locals(outPath=str, filterFunctions=list, headerFunctions=list, postingFunctions=list, player=str)
 cpdef object hasPlayers(str location, object data, list players, str mode=*)
 
-@cython.locals(outPath=str, filterFunctions=list, weapon=str)
+@cython.locals(outPath=str, filterFunctions=list, headerFunctions=list, postingFunctions=list, weapon=str)
 cpdef object hasWeapons(str location, object data, list weapons, str mode=*)
 
-@cython.locals(outPath=str, filterFunctions=list, weapon=str)
+@cython.locals(outPath=str, filterFunctions=list, headerFunctions=list, postingFunctions=list, weapon=str)
 cpdef object usesWeapons(str location, object data, list weapons, str mode=*)
 
-@cython.locals(outPath=str, filterFunctions=list, stage=str)
+@cython.locals(outPath=str, filterFunctions=list, headerFunctions=list, postingFunctions=list, stage=str)
 cpdef object onStages(str location, object data, list stages, str mode=*)
 
 cpdef object withSpecial(str location, object data, str special)
 
-@cython.locals(filterFunctions=list, outPath=str, reason=str)
+@cython.locals(filterFunctions=list, headerFunctions=list, outPath=str, reason=str)
 cpdef object failReasons(str location, object data, list reasons, str mode=*)
 
-@cython.locals(filterFunctions=list, outPath=str, rotation=cython.int)
+@cython.locals(filterFunctions=list, headerFunctions=list, postingFunctions=list, outPath=str, rotation=cython.int)
 cpdef object duringRotationInts(str location, object data, list rotations, str mode=*)
 
 @cython.locals(outPath=str)
@@ -35,11 +66,19 @@ cpdef object clearWave(str location, object data, int wave, str comparison=*)
 @cython.locals(outPath=str)
 cpdef object dangerRate(str location, object data, double rate, str comparison=*)
 
-@cython.locals(filterFunctions=list, outPath=str, tide=str)
+cpdef bint statInRange(object value, double low, double high, bint includeHigh=*)
+
+@cython.locals(statArr=list, fields=dict, postingFunction=object)
+cpdef object statBetween(str location, object data, str stat, double low, double high)
+
+@cython.locals(fields=dict)
+cpdef object duringTimeWindow(str location, object data, long start, long end)
+
+@cython.locals(filterFunctions=list, headerFunctions=list, postingFunctions=list, outPath=str, tide=str)
 cpdef object hasTides(str location, object data, list tides, str mode=*)
 
-@cython.locals(filterFunctions=list, outPath=str, event=str)
+@cython.locals(filterFunctions=list, headerFunctions=list, postingFunctions=list, outPath=str, event=str)
 cpdef object hasEvents(str location, object data, list events, str mode=*)
 
-@cython.locals(weaponList=list, grizzWeapon=tuple, new=dict, weaponDict=dict, i=dict, filterFunctions=list, outPath=str, wtype=str)
+@cython.locals(weaponList=list, grizzWeapon=tuple, new=dict, weaponDict=dict, i=dict, filterFunctions=list, headerFunctions=list, outPath=str, wtype=str)
 cpdef object hasWeaponTypes(str location, object data, list types, str mode=*)
\ No newline at end of file
@@ -1,165 +1,595 @@
-from core import hasJobs, locale, grizzcoWeapons
-from objects import Job
+from core import hasJobs, locale, grizzcoWeapons, getValMultiDimensional
+from columns import JobColumns
+from blocks import (
+    SELECTION_SUFFIX,
+    BlockWriter,
+    SelectedReader,
+    isSelection,
+    openJobs,
+    readSelection,
+    selectionTotal,
+    writeSelection,
+)
+from jobstore import JobBuffer, Selection, decompressJob
+from objects import LazyJob, decodeJob, projectFields
+from postings import PostingIndex, indexFields, jobKeys, loadPostings, rangeFields
+from predicates import Between, Compare, HasKey
+from functools import reduce
 import os.path
-from typing import Tuple, List, Callable, Dict, Union, cast
-import gzip
-import json
+from typing import Tuple, List, Callable, Dict, Iterable, Optional, Set, Union, cast
 import ujson
-import zlib
 import requests
+import numpy as np
+
+
+def splitJobs(
+    data: Union[JobBuffer, Selection], mask: np.ndarray
+) -> Union[Tuple[JobBuffer, JobBuffer], Tuple[Selection, Selection]]:
+    if isinstance(data, Selection):
+        return data.split(mask)
+    return (data.take(mask), data.take(~mask))
+
+
+def columnMask(
+    columns: JobColumns, headerFunctions: List[Callable], combine: Callable
+) -> Optional[np.ndarray]:
+    """
+    Evaluate the filters on the columns of a data set.
+
+    :param columns: the columns of the data set
+    :type columns: JobColumns
+    :param headerFunctions: the filters, as functions or Predicates of the columns
+    :type headerFunctions: List[Callable]
+    :param combine: how to join the masks, such as np.logical_or.reduce
+    :type combine: Callable
+    :return: whether each job passes, or None if a filter needs a column that isn't there
+    :rtype: Optional[np.ndarray]
+
+    """
+    try:
+        return combine([funct(columns) for funct in headerFunctions])
+    except KeyError:
+        return None
+
+
+def columnsMask(
+    columns: JobColumns,
+    headerFunctions: Optional[List[Callable]],
+    combine: Callable,
+    outpath: str,
+) -> np.ndarray:
+    """
+    Evaluate the filters on a columnar data set, which has no jobs to decode instead.
+
+    :param columns: the columns of the data set
+    :type columns: JobColumns
+    :param headerFunctions: the filters, as functions or Predicates of the columns, or None if the filter has none
+    :type headerFunctions: Optional[List[Callable]]
+    :param combine: how to join the masks, such as np.logical_or.reduce
+    :type combine: Callable
+    :param outpath: the name of the filter, for the error
+    :type outpath: str
+    :return: whether each job passes
+    :rtype: np.ndarray
+    :raises KeyError: if the filter can't be evaluated on columns or needs a column that isn't there
+
+    """
+    mask: Optional[np.ndarray] = None
+    if headerFunctions is not None and None not in headerFunctions:
+        mask = columnMask(columns, headerFunctions, combine)
+    if mask is None:
+        raise KeyError("the columns don't hold what " + outpath + " filters on")
+    return mask
+
+
+def filterSelection(
+    data: str, filterFunction: Callable, outpath, fields: dict = None
+) -> Tuple[str, str]:
+    """
+    Split a selection file into the selections of the jobs that pass a filter and the jobs that don't.
+
+    Only the selected jobs are read from the data file. The results are kept as
+    selection files, and are only made again when the data file has grown.
+
+    :param data: the full path of the selection file
+    :type data: str
+    :param filterFunction: whether a job passes the filter
+    :type filterFunction: Callable
+    :param outpath: the path of the results under the directory of the selection
+    :type outpath: str
+    :param fields: the fields the filter reads, or None to decode whole jobs
+    :type fields: dict
+    :return: the full paths of the paired selection files
+    :rtype: Tuple[str, str]
+
+    """
+    paths: Tuple[str, str] = (
+        data[:-6] + "/" + outpath + SELECTION_SUFFIX,
+        data[:-6] + "/not" + outpath + SELECTION_SUFFIX,
+    )
+    base, rows, total = readSelection(data)
+    if selectionTotal(paths[0]) == total and selectionTotal(paths[1]) == total:
+        return paths
+    mask: np.ndarray = np.zeros(len(rows), dtype=np.bool_)
+    with SelectedReader(base, rows) as reader:
+        for i, line in enumerate(reader):
+            if fields is None:
+                job = LazyJob(**ujson.loads(line))
+            else:
+                job = decodeJob(ujson.loads(line), fields, locale)
+            mask[i] = filterFunction(job)
+    writeSelection(paths[0], base, rows[mask], total)
+    writeSelection(paths[1], base, rows[~mask], total)
+    return paths
+
+
+def filterPostings(
+    data: str, postingFunctions: List[Callable], combine: Callable, outpath
+) -> Tuple[str, str]:
+    """
+    Split a data or selection file by the inverted index of its data file, without parsing any job.
+
+    A selection file is split into two more selection files without reading any
+    jobs. A data file is copied line for line into the two usual gzip files.
+
+    :param data: the full path of the data or selection file
+    :type data: str
+    :param postingFunctions: each finds the positions of the jobs that pass one filter in a PostingIndex
+    :type postingFunctions: List[Callable]
+    :param combine: how to merge the positions of two filters, np.union1d or np.intersect1d
+    :type combine: Callable
+    :param outpath: the path of the results under the directory of the input
+    :type outpath: str
+    :return: the full paths of the paired results
+    :rtype: Tuple[str, str]
+
+    """
+    suffix: str = SELECTION_SUFFIX if isSelection(data) else ".jl.gz"
+    paths: Tuple[str, str] = (
+        data[:-6] + "/" + outpath + suffix,
+        data[:-6] + "/not" + outpath + suffix,
+    )
+    if isSelection(data):
+        base, rows, total = readSelection(data)
+        if selectionTotal(paths[0]) == total and selectionTotal(paths[1]) == total:
+            return paths
+        index: PostingIndex = loadPostings(base)
+        mask: np.ndarray = np.isin(
+            rows, reduce(combine, [funct(index) for funct in postingFunctions])
+        )
+        writeSelection(paths[0], base, rows[mask], total)
+        writeSelection(paths[1], base, rows[~mask], total)
+        return paths
+    if os.path.exists(paths[0]) and os.path.exists(paths[1]):
+        return paths
+    index = loadPostings(data)
+    matched: np.ndarray = np.zeros(index.count, dtype=np.bool_)
+    matched[reduce(combine, [funct(index) for funct in postingFunctions])] = True
+    with openJobs(data) as reader:
+        with BlockWriter(paths[0], append=True) as writerA:
+            with BlockWriter(paths[1], append=True) as writerB:
+                for position, line in enumerate(reader):
+                    if matched[position]:
+                        writerA.write(line)
+                    else:
+                        writerB.write(line)
+    return paths
 
 
 def filterJobs(
-    location, data: Union[str, List[bytes]], filterFunction: Callable, outpath
+    location,
+    data: Union[str, List[bytes]],
+    filterFunction: Callable,
+    outpath,
+    fields: dict = None,
+    headerFunction: Callable = None,
+    postingFunction: Callable = None,
 ) -> Union[Tuple[str, str], Tuple[List[bytes], List[bytes]]]:
     if location == "disk":
+        if postingFunction is not None:
+            return filterPostings(
+                cast(str, data), [postingFunction], np.union1d, outpath
+            )
+        if isSelection(cast(str, data)):
+            return filterSelection(cast(str, data), filterFunction, outpath, fields)
         if not (
             os.path.exists(cast(str, data[:-6]) + "/" + outpath + ".jl.gz")
             and os.path.exists(cast(str, data[:-6]) + "/not" + outpath + ".jl.gz")
         ):
-            with gzip.open(cast(str, data)) as reader:
+            with openJobs(cast(str, data)) as reader:
                 if hasJobs("disk", data):
-                    with gzip.open(
-                        cast(str, data[:-6]) + "/" + outpath + ".jl.gz",
-                        "at",
-                        encoding="utf8",
+                    with BlockWriter(
+                        cast(str, data[:-6]) + "/" + outpath + ".jl.gz", append=True
                     ) as writerA:
-                        with gzip.open(
+                        with BlockWriter(
                             cast(str, data[:-6]) + "/not" + outpath + ".jl.gz",
-                            "at",
-                            encoding="utf8",
+                            append=True,
                         ) as writerB:
                             for line in reader:
-                                job = Job(**ujson.loads(line))
+                                if fields is None:
+                                    job = LazyJob(**ujson.loads(line))
+                                else:
+                                    job = decodeJob(ujson.loads(line), fields, locale)
                                 if filterFunction(job):
-                                    json.dump(
-                                        job, writerA, default=lambda x: x.__dict__
-                                    )
-                                    writerA.write("\n")
+                                    writerA.write(line)
                                 else:
-                                    json.dump(
-                                        job, writerB, default=lambda x: x.__dict__
-                                    )
-                                    writerB.write("\n")
+                                    writerB.write(line)
         return (
             cast(str, data[:-6]) + "/" + outpath + ".jl.gz",
             cast(str, data[:-6]) + "/not" + outpath + ".jl.gz",
         )
-    jobsWith: List[bytes] = []
-    jobsWithout: List[bytes] = []
-    for jobLine in cast(List[bytes], data):
-        job = Job(**ujson.loads(zlib.decompress(jobLine)))
-        if filterFunction(job):
-            jobsWith.append(jobLine)
+    if location == "columns":
+        mask = columnsMask(data, [headerFunction], np.logical_and.reduce, outpath)
+        return (data.take(mask), data.take(~mask))
+    if not isinstance(data, (JobBuffer, Selection)):
+        data = JobBuffer(data)
+    header = data.header if headerFunction is not None else None
+    if header is not None:
+        mask = columnMask(header, [headerFunction], np.logical_and.reduce)
+        if mask is not None:
+            return splitJobs(data, mask)
+    matches: List[bool] = []
+    for jobLine in data:
+        if fields is None:
+            job = LazyJob(**ujson.loads(decompressJob(data, jobLine)))
         else:
-            jobsWithout.append(jobLine)
-    return (jobsWith, jobsWithout)
+            job = decodeJob(ujson.loads(decompressJob(data, jobLine)), fields, locale)
+        matches.append(filterFunction(job))
+    return splitJobs(data, np.array(matches, dtype=np.bool_))
 
 
 def filterJobsOr(
-    location, data: Union[str, List[bytes]], filterFunctions: List[Callable], outpath
+    location,
+    data: Union[str, List[bytes]],
+    filterFunctions: List[Callable],
+    outpath,
+    fields: dict = None,
+    headerFunctions: List[Callable] = None,
+    postingFunctions: List[Callable] = None,
 ) -> Union[Tuple[str, str], Tuple[List[bytes], List[bytes]]]:
     if location == "disk":
+        if postingFunctions is not None:
+            return filterPostings(
+                cast(str, data), postingFunctions, np.union1d, outpath
+            )
+        if isSelection(cast(str, data)):
+            return filterSelection(
+                cast(str, data),
+                lambda job, functs=filterFunctions: any(funct(job) for funct in functs),
+                outpath,
+                fields,
+            )
         if not (
             os.path.exists(cast(str, data[:-6]) + "/" + outpath + ".jl.gz")
             and os.path.exists(cast(str, data[:-6]) + "/not" + outpath + ".jl.gz")
         ):
-            with gzip.open(cast(str, data)) as reader:
+            with openJobs(cast(str, data)) as reader:
                 if hasJobs("disk", data):
-                    with gzip.open(
-                        cast(str, data[:-6]) + "/" + outpath + ".jl.gz",
-                        "at",
-                        encoding="utf8",
+                    with BlockWriter(
+                        cast(str, data[:-6]) + "/" + outpath + ".jl.gz", append=True
                     ) as writerA:
-                        with gzip.open(
+                        with BlockWriter(
                             cast(str, data[:-6]) + "/not" + outpath + ".jl.gz",
-                            "at",
-                            encoding="utf8",
+                            append=True,
                         ) as writerB:
                             for line in reader:
-                                job = Job(**ujson.loads(line))
+                                if fields is None:
+                                    job = LazyJob(**ujson.loads(line))
+                                else:
+                                    job = decodeJob(ujson.loads(line), fields, locale)
                                 found = False
                                 for funct in filterFunctions:
                                     found = found or funct(job)
                                 if found:
-                                    json.dump(
-                                        job, writerA, default=lambda x: x.__dict__
-                                    )
-                                    writerA.write("\n")
+                                    writerA.write(line)
                                 else:
-                                    json.dump(
-                                        job, writerB, default=lambda x: x.__dict__
-                                    )
-                                    writerB.write("\n")
+                                    writerB.write(line)
         return (
             cast(str, data[:-6]) + "/" + outpath + ".jl.gz",
             cast(str, data[:-6]) + "/not" + outpath + ".jl.gz",
         )
-    jobsWith: List[bytes] = []
-    jobsWithout: List[bytes] = []
-    for jobLine in cast(List[bytes], data):
-        job = Job(**ujson.loads(zlib.decompress(jobLine)))
+    if location == "columns":
+        mask = columnsMask(data, headerFunctions, np.logical_or.reduce, outpath)
+        return (data.take(mask), data.take(~mask))
+    if not isinstance(data, (JobBuffer, Selection)):
+        data = JobBuffer(data)
+    header = data.header if headerFunctions is not None else None
+    if header is not None:
+        mask = columnMask(header, headerFunctions, np.logical_or.reduce)
+        if mask is not None:
+            return splitJobs(data, mask)
+    matches: List[bool] = []
+    for jobLine in data:
+        if fields is None:
+            job = LazyJob(**ujson.loads(decompressJob(data, jobLine)))
+        else:
+            job = decodeJob(ujson.loads(decompressJob(data, jobLine)), fields, locale)
         found = False
         for funct in filterFunctions:
             found = found or funct(job)
-        if found:
-            jobsWith.append(jobLine)
-        else:
-            jobsWithout.append(jobLine)
-    return (jobsWith, jobsWithout)
+        matches.append(found)
+    return splitJobs(data, np.array(matches, dtype=np.bool_))
 
 
 def filterJobsAnd(
-    location, data: Union[str, List[bytes]], filterFunctions: List[Callable], outpath
+    location,
+    data: Union[str, List[bytes]],
+    filterFunctions: List[Callable],
+    outpath,
+    fields: dict = None,
+    headerFunctions: List[Callable] = None,
+    postingFunctions: List[Callable] = None,
 ) -> Union[Tuple[str, str], Tuple[List[bytes], List[bytes]]]:
     if location == "disk":
+        if postingFunctions is not None:
+            return filterPostings(
+                cast(str, data), postingFunctions, np.intersect1d, outpath
+            )
+        if isSelection(cast(str, data)):
+            return filterSelection(
+                cast(str, data),
+                lambda job, functs=filterFunctions: all(funct(job) for funct in functs),
+                outpath,
+                fields,
+            )
         if not (
             os.path.exists(cast(str, data[:-6]) + "/" + outpath + ".jl.gz")
             and os.path.exists(cast(str, data[:-6]) + "/not" + outpath + ".jl.gz")
         ):
-            with gzip.open(cast(str, data)) as reader:
+            with openJobs(cast(str, data)) as reader:
                 if hasJobs("disk", data):
-                    with gzip.open(
-                        cast(str, data[:-6]) + "/" + outpath + ".jl.gz",
-                        "at",
-                        encoding="utf8",
+                    with BlockWriter(
+                        cast(str, data[:-6]) + "/" + outpath + ".jl.gz", append=True
                     ) as writerA:
-                        with gzip.open(
+                        with BlockWriter(
                             cast(str, data[:-6]) + "/not" + outpath + ".jl.gz",
-                            "at",
-                            encoding="utf8",
+                            append=True,
                         ) as writerB:
                             for line in reader:
-                                job = Job(**ujson.loads(line))
+                                if fields is None:
+                                    job = LazyJob(**ujson.loads(line))
+                                else:
+                                    job = decodeJob(ujson.loads(line), fields, locale)
                                 found = True
                                 for funct in filterFunctions:
                                     found = found and funct(job)
                                 if found:
-                                    json.dump(
-                                        job, writerA, default=lambda x: x.__dict__
-                                    )
-                                    writerA.write("\n")
+                                    writerA.write(line)
                                 else:
-                                    json.dump(
-                                        job, writerB, default=lambda x: x.__dict__
-                                    )
-                                    writerB.write("\n")
+                                    writerB.write(line)
         return (
             cast(str, data[:-6]) + "/" + outpath + ".jl.gz",
             cast(str, data[:-6]) + "/not" + outpath + ".jl.gz",
         )
-    jobsWith: List[bytes] = []
-    jobsWithout: List[bytes] = []
-    for jobLine in cast(List[bytes], data):
-        job = Job(**ujson.loads(zlib.decompress(jobLine)))
+    if location == "columns":
+        mask = columnsMask(data, headerFunctions, np.logical_and.reduce, outpath)
+        return (data.take(mask), data.take(~mask))
+    if not isinstance(data, (JobBuffer, Selection)):
+        data = JobBuffer(data)
+    header = data.header if headerFunctions is not None else None
+    if header is not None:
+        mask = columnMask(header, headerFunctions, np.logical_and.reduce)
+        if mask is not None:
+            return splitJobs(data, mask)
+    matches: List[bool] = []
+    for jobLine in data:
+        if fields is None:
+            job = LazyJob(**ujson.loads(decompressJob(data, jobLine)))
+        else:
+            job = decodeJob(ujson.loads(decompressJob(data, jobLine)), fields, locale)
         found = True
         for funct in filterFunctions:
             found = found and funct(job)
-        if found:
-            jobsWith.append(jobLine)
+        matches.append(found)
+    return splitJobs(data, np.array(matches, dtype=np.bool_))
+
+
+partitionFields = indexFields + ("specials", "fail_reasons")
+partitionColumns: Dict[str, Tuple[str, str, Optional[int]]] = {
+    "players": ("splatnet_id", "players", None),
+    "weapons": ("weapons", "weapons", None),
+    "my_weapons": ("weapons", "weapons", 0),
+    "stages": ("stage", "stages", None),
+    "events": ("known_occurrence", "events", None),
+    "tides": ("water_level", "water_levels", None),
+    "specials": ("special", "specials", 0),
+    "fail_reasons": ("fail_reason", "fail_reasons", None),
+}
+
+
+def partitionKeys(job: dict, field: str) -> Set[str]:
+    """
+    Find the keys a job is partitioned under.
+
+    :param job: one job, as parsed from its JSON line
+    :type job: dict
+    :param field: one of the partitionFields
+    :type field: str
+    :return: the keys, with rotations as the shift start time in seconds
+    :rtype: Set[str]
+
+    """
+    if field == "specials":
+        special = job["my_data"].get("special")
+        return {special["key"]} if special is not None else set()
+    if field == "fail_reasons":
+        reason = job.get("fail_reason")
+        return {reason["key"]} if reason is not None and reason != "None" else set()
+    return jobKeys(job)[field]
+
+
+def columnKeys(
+    columns: JobColumns, field: str
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Pair every row of a data set with each key it holds for a field, once per key.
+
+    :param columns: the columns of the data set
+    :type columns: JobColumns
+    :param field: one of the partitionFields
+    :type field: str
+    :return: the keys, and the index into them and the row of each pair, ordered by key then row
+    :rtype: Tuple[List[str], np.ndarray, np.ndarray]
+    :raises KeyError: if the column of the field isn't stored in the columns
+
+    """
+    if field == "rotations":
+        times, values = np.unique(columns["shift_start_at"], return_inverse=True)
+        names: List[str] = [str(time) for time in times.tolist()]
+    else:
+        column, vocabulary, player = partitionColumns[field]
+        values = columns[column]
+        if player is not None:
+            values = values[:, player]
+        names = columns.codes[vocabulary]
+    jobs: int = len(values)
+    if jobs == 0:
+        return (names, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32))
+    codes: np.ndarray = np.asarray(values, dtype=np.int64).reshape(jobs, -1)
+    positions: np.ndarray = np.repeat(np.arange(jobs, dtype=np.int64), codes.shape[1])
+    codes = codes.ravel()
+    pairs: np.ndarray = np.unique(codes[codes >= 0] * jobs + positions[codes >= 0])
+    return (names, pairs // jobs, (pairs % jobs).astype(np.int32))
+
+
+def columnPartition(columns: JobColumns, field: str) -> Dict[str, np.ndarray]:
+    """
+    Group the rows of a data set by their keys for a field, with one sort of every key they hold.
+
+    :param columns: the columns of the data set
+    :type columns: JobColumns
+    :param field: one of the partitionFields
+    :type field: str
+    :return: the sorted rows holding each key
+    :rtype: Dict[str, np.ndarray]
+    :raises KeyError: if the column of the field isn't stored in the columns
+
+    """
+    names, groups, rows = columnKeys(columns, field)
+    starts: List[int] = np.flatnonzero(np.diff(groups, prepend=-1)).tolist()
+    return {
+        names[int(groups[start])]: rows[start:stop]
+        for start, stop in zip(starts, starts[1:] + [len(rows)])
+    }
+
+
+def scanPartition(
+    lines: Iterable, field: str, compressed: Union[JobBuffer, Selection] = None
+) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Group jobs by their keys for a field, reading each job once.
+
+    :param lines: the JSON lines of the jobs
+    :type lines: Iterable
+    :param field: one of the partitionFields
+    :type field: str
+    :param compressed: the data set the lines are compressed for, or None if they're plain
+    :type compressed: Union[JobBuffer, Selection]
+    :return: the sorted positions of the jobs holding each key, and the number of jobs read
+    :rtype: Tuple[Dict[str, np.ndarray], int]
+
+    """
+    groups: Dict[str, List[int]] = {}
+    position: int = 0
+    for line in lines:
+        if compressed is not None:
+            line = decompressJob(compressed, line)
+        for key in partitionKeys(ujson.loads(line), field):
+            groups.setdefault(key, []).append(position)
+        position += 1
+    return (
+        {key: np.array(rows, dtype=np.int32) for key, rows in groups.items()},
+        position,
+    )
+
+
+def partitionFile(data: str, field: str) -> Dict[str, str]:
+    rows: Optional[np.ndarray] = None
+    base: str = data
+    total: int = 0
+    if isSelection(data):
+        base, rows, total = readSelection(data)
+    groups: Dict[str, np.ndarray] = {}
+    if field in indexFields:
+        index: PostingIndex = loadPostings(base)
+        if rows is None:
+            total = index.count
+        for key, positions in index.postings[field].items():
+            if rows is not None:
+                positions = np.intersect1d(positions, rows, assume_unique=True)
+            if len(positions) > 0:
+                groups[key] = positions
+    else:
+        with openJobs(data) as reader:
+            groups, count = scanPartition(reader, field)
+        if rows is None:
+            total = count
         else:
-            jobsWithout.append(jobLine)
-    return (jobsWith, jobsWithout)
+            groups = {key: rows[positions] for key, positions in groups.items()}
+    paths: Dict[str, str] = {}
+    for key, positions in groups.items():
+        paths[key] = data[:-6] + "/" + field + "/" + key + SELECTION_SUFFIX
+        writeSelection(paths[key], base, positions, total)
+    return paths
+
+
+def partitionJobs(
+    location, data: Union[str, List[bytes], JobColumns], field: str
+) -> Dict[str, Union[str, Selection, JobColumns]]:
+    """
+    Split a data set by the keys its jobs hold for a field, reading it once.
+
+    A job is in the part of every key it holds, so a job is under each of its
+    four players' weapons and under the event of each of its waves. In memory the
+    parts are Selections of the data set, so the jobs without a key are the
+    complement of its part, ``~part`` for a whole data set or
+    ``part.complement(data)`` for a Selection. On disk the parts are selection
+    files under the directory of the data file, found from its posting index
+    where the field has one.
+
+    :param location: "disk", "mem" or "columns"
+    :type location: str
+    :param data: the data set, or the full path of the data or selection file
+    :type data: Union[str, List[bytes], JobColumns]
+    :param field: one of the partitionFields, such as "stages", "weapons" or "rotations"
+    :type field: str
+    :return: the part of each key, with rotations keyed by the shift start time in seconds
+    :rtype: Dict[str, Union[str, Selection, JobColumns]]
+
+    :Example:
+
+    >>> import core
+    >>> import filters
+    >>> jobs = core.loadJobsFromFile("data/salmonAll.jl.gz", header=True)
+    >>> stages = filters.partitionJobs("mem", jobs, "stages")
+    >>> sorted(stages)
+    ['dam', 'donburako', 'polaris', 'shaketoba', 'tokishirazu']
+
+    """
+    if location == "disk":
+        return cast(
+            Dict[str, Union[str, Selection, JobColumns]],
+            partitionFile(cast(str, data), field),
+        )
+    if location == "columns":
+        return {
+            key: cast(JobColumns, data).take(rows)
+            for key, rows in columnPartition(cast(JobColumns, data), field).items()
+        }
+    if not isinstance(data, Selection):
+        if not isinstance(data, JobBuffer):
+            data = JobBuffer(data)
+        data = Selection(data)
+    groups: Optional[Dict[str, np.ndarray]] = None
+    if data.base.header is not None:
+        try:
+            groups = columnPartition(data.header, field)
+        except KeyError:
+            groups = None
+    if groups is None:
+        groups = scanPartition(data, field, data)[0]
+    indices: np.ndarray = data.indices
+    return {key: Selection(data.base, indices[rows]) for key, rows in groups.items()}
 
 
 def hasPlayers(
@@ -200,8 +630,11 @@ def hasPlayers(
             os.mkdir(cast(str, data[:-6]) + "/notplayerIds/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["my_data splatnet_id", "teammates splatnet_id"])
     outPath = "playerIds/"
     filterFunctions: List[Callable] = []
+    headerFunctions: List[Callable] = []
+    postingFunctions: List[Callable] = []
     for player in players:
         filterFunctions.append(
             lambda var, player=player: var.my_data.splatnet_id == player
@@ -220,12 +653,40 @@ def hasPlayers(
                 )
             ),
         )
+        headerFunctions.append(HasKey("splatnet_id", "players", [player]))
+        postingFunctions.append(
+            lambda index, player=player: index.lookup("players", player)
+        )
         outPath += player + mode
     if mode == "and":
-        return filterJobsAnd(location, data, filterFunctions, outPath)
+        return filterJobsAnd(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
     if mode == "or":
-        return filterJobsOr(location, data, filterFunctions, outPath)
-    return filterJobs(location, data, filterFunctions[0], outPath)
+        return filterJobsOr(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
+    return filterJobs(
+        location,
+        data,
+        filterFunctions[0],
+        outPath,
+        fields,
+        headerFunctions[0],
+        postingFunctions[0],
+    )
 
 
 def hasWeapons(
@@ -266,8 +727,11 @@ def hasWeapons(
             os.mkdir(cast(str, data[:-6]) + "/notweapons/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["my_data weapons key", "teammates weapons key"])
     outPath = "weapons/"
     filterFunctions = []
+    headerFunctions: List[Callable] = []
+    postingFunctions: List[Callable] = []
     for weapon in weapons:
         filterFunctions.append(
             lambda var, weapon=weapon: (
@@ -332,12 +796,40 @@ def hasWeapons(
                 )
             )
         )
+        headerFunctions.append(HasKey("weapons", "weapons", [weapon]))
+        postingFunctions.append(
+            lambda index, weapon=weapon: index.lookup("weapons", weapon)
+        )
         outPath += weapon + mode
     if mode == "and":
-        return filterJobsAnd(location, data, filterFunctions, outPath)
+        return filterJobsAnd(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
     if mode == "or":
-        return filterJobsOr(location, data, filterFunctions, outPath)
-    return filterJobs(location, data, filterFunctions[0], outPath)
+        return filterJobsOr(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
+    return filterJobs(
+        location,
+        data,
+        filterFunctions[0],
+        outPath,
+        fields,
+        headerFunctions[0],
+        postingFunctions[0],
+    )
 
 
 def usesWeapons(
@@ -378,8 +870,11 @@ def usesWeapons(
             os.mkdir(cast(str, data[:-6]) + "/notusesWeapons/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["my_data weapons key"])
     outPath = "usesWeapons/"
     filterFunctions = []
+    headerFunctions: List[Callable] = []
+    postingFunctions: List[Callable] = []
     for weapon in weapons:
         filterFunctions.append(
             lambda var, weapon=weapon: (
@@ -394,12 +889,40 @@ def usesWeapons(
                 )
             )
         )
+        headerFunctions.append(HasKey("weapons", "weapons", [weapon], player=0))
+        postingFunctions.append(
+            lambda index, weapon=weapon: index.lookup("my_weapons", weapon)
+        )
         outPath += weapon + mode
     if mode == "and":
-        return filterJobsAnd(location, data, filterFunctions, outPath)
+        return filterJobsAnd(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
     if mode == "or":
-        return filterJobsOr(location, data, filterFunctions, outPath)
-    return filterJobs(location, data, filterFunctions[0], outPath)
+        return filterJobsOr(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
+    return filterJobs(
+        location,
+        data,
+        filterFunctions[0],
+        outPath,
+        fields,
+        headerFunctions[0],
+        postingFunctions[0],
+    )
 
 
 def onStages(
@@ -440,16 +963,39 @@ def onStages(
             os.mkdir(cast(str, data[:-6]) + "/notstages/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["stage key"])
     outPath = "stages/"
     filterFunctions = []
+    headerFunctions: List[Callable] = []
+    postingFunctions: List[Callable] = []
     for stage in stages:
         filterFunctions.append(
             lambda var, stage=stage: var.stage is not None and stage in (var.stage.key,)
         )
+        headerFunctions.append(HasKey("stage", "stages", [stage]))
+        postingFunctions.append(
+            lambda index, stage=stage: index.lookup("stages", stage)
+        )
         outPath += stage + (mode if mode is not None else "")
     if mode == "or":
-        return filterJobsOr(location, data, filterFunctions, outPath)
-    return filterJobs(location, data, filterFunctions[0], outPath)
+        return filterJobsOr(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
+    return filterJobs(
+        location,
+        data,
+        filterFunctions[0],
+        outPath,
+        fields,
+        headerFunctions[0],
+        postingFunctions[0],
+    )
 
 
 def withSpecial(
@@ -490,11 +1036,14 @@ def withSpecial(
             os.mkdir(cast(str, data[:-6]) + "/notspecial/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["my_data special key"])
     return filterJobs(
         location,
         data,
         lambda var, special=special: special in (var.my_data.special.key,),
         "special/" + special,
+        fields,
+        HasKey("special", "specials", [special], player=0),
     )
 
 
@@ -536,14 +1085,24 @@ def failReasons(
             os.mkdir(cast(str, data[:-6]) + "/notfailReasons/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["fail_reason"])
     filterFunctions: List[Callable] = []
+    headerFunctions: List[Callable] = []
     outPath = "failReasons/"
     for reason in reasons:
-        filterFunctions.append(lambda var, reason=reason: var.fail_reason == reason)
+        filterFunctions.append(
+            lambda var, reason=reason: var.fail_reason is not None
+            and var.fail_reason.key == reason
+        )
+        headerFunctions.append(HasKey("fail_reason", "fail_reasons", [reason]))
         outPath += reason + (mode if mode is not None else "")
     if mode == "or":
-        return filterJobsOr(location, data, filterFunctions, outPath)
-    return filterJobs(location, data, filterFunctions[0], outPath)
+        return filterJobsOr(
+            location, data, filterFunctions, outPath, fields, headerFunctions
+        )
+    return filterJobs(
+        location, data, filterFunctions[0], outPath, fields, headerFunctions[0]
+    )
 
 
 def duringRotationInts(
@@ -582,16 +1141,39 @@ def duringRotationInts(
             os.mkdir(cast(str, data[:-6]) + "/notrotations/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["shift_start_at time"])
     filterFunctions: List[Callable] = []
+    headerFunctions: List[Callable] = []
+    postingFunctions: List[Callable] = []
     outPath = "rotations/"
     for rotation in rotations:
         filterFunctions.append(
             lambda var, rotation=rotation: var.shift_start_at.time == rotation
         )
+        headerFunctions.append(Compare("shift_start_at time", "=", rotation))
+        postingFunctions.append(
+            lambda index, rotation=rotation: index.lookup("rotations", rotation)
+        )
         outPath += str(rotation) + (mode if mode is not None else "")
     if mode == "or":
-        return filterJobsOr(location, data, filterFunctions, outPath)
-    return filterJobs(location, data, filterFunctions[0], outPath)
+        return filterJobsOr(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
+    return filterJobs(
+        location,
+        data,
+        filterFunctions[0],
+        outPath,
+        fields,
+        headerFunctions[0],
+        postingFunctions[0],
+    )
 
 
 def clearWave(
@@ -628,44 +1210,68 @@ def clearWave(
             os.mkdir(cast(str, data[:-6]) + "/clearWaves/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["clear_waves"])
     outPath = "clearWaves/"
     if comparison == ">":
         outPath += "greaterThan" + str(wave)
-        try:
-            os.mkdir(cast(str, data[:-6]) + "/clearWaves/greaterThan/")
-        except FileExistsError:
-            pass
-        try:
-            os.mkdir(cast(str, data[:-6]) + "/clearWaves/notgreaterThan/")
-        except FileExistsError:
-            pass
+        if location == "disk":
+            try:
+                os.mkdir(cast(str, data[:-6]) + "/clearWaves/greaterThan/")
+            except FileExistsError:
+                pass
+            try:
+                os.mkdir(cast(str, data[:-6]) + "/clearWaves/notgreaterThan/")
+            except FileExistsError:
+                pass
         return filterJobs(
-            location, data, lambda job, wave=wave: job.clear_waves > wave, outPath
+            location,
+            data,
+            lambda job, wave=wave: job.clear_waves > wave,
+            outPath,
+            fields,
+            Compare("clear_waves", ">", wave),
+            lambda index, wave=wave: index.between("clear_waves", wave, None, False),
         )
     if comparison == "<":
         outPath += "lessThan" + str(wave)
+        if location == "disk":
+            try:
+                os.mkdir(cast(str, data[:-6]) + "/clearWaves/lessThan/")
+            except FileExistsError:
+                pass
+            try:
+                os.mkdir(cast(str, data[:-6]) + "/clearWaves/notlessThan/")
+            except FileExistsError:
+                pass
+        return filterJobs(
+            location,
+            data,
+            lambda job, wave=wave: job.clear_waves < wave,
+            outPath,
+            fields,
+            Compare("clear_waves", "<", wave),
+            lambda index, wave=wave: index.between(
+                "clear_waves", None, wave, True, False
+            ),
+        )
+    outPath += "equal" + str(wave)
+    if location == "disk":
         try:
-            os.mkdir(cast(str, data[:-6]) + "/clearWaves/lessThan/")
+            os.mkdir(cast(str, data[:-6]) + "/clearWaves/equal/")
         except FileExistsError:
             pass
         try:
-            os.mkdir(cast(str, data[:-6]) + "/clearWaves/notlessThan/")
+            os.mkdir(cast(str, data[:-6]) + "/clearWaves/notequal/")
         except FileExistsError:
             pass
-        return filterJobs(
-            location, data, lambda job, wave=wave: job.clear_waves < wave, outPath
-        )
-    outPath += "equal" + str(wave)
-    try:
-        os.mkdir(cast(str, data[:-6]) + "/clearWaves/equal/")
-    except FileExistsError:
-        pass
-    try:
-        os.mkdir(cast(str, data[:-6]) + "/clearWaves/notequal/")
-    except FileExistsError:
-        pass
     return filterJobs(
-        location, data, lambda job, wave=wave: job.clear_waves == wave, outPath
+        location,
+        data,
+        lambda job, wave=wave: job.clear_waves == wave,
+        outPath,
+        fields,
+        Compare("clear_waves", "=", wave),
+        lambda index, wave=wave: index.between("clear_waves", wave, wave),
     )
 
 
@@ -703,6 +1309,7 @@ def dangerRate(
             os.mkdir(cast(str, data[:-6]) + "/dangerRate/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["danger_rate"])
     outPath = "dangerRate/"
     if comparison == ">":
         if location == "disk":
@@ -720,6 +1327,9 @@ def dangerRate(
             data,
             lambda job, rate=rate: float(job.danger_rate) > rate,
             outPath,
+            fields,
+            Compare("danger_rate", ">", rate),
+            lambda index, rate=rate: index.between("danger_rate", rate, None, False),
         )
     if comparison == "<":
         if location == "disk":
@@ -737,6 +1347,11 @@ def dangerRate(
             data,
             lambda job, rate=rate: float(job.danger_rate) < rate,
             outPath,
+            fields,
+            Compare("danger_rate", "<", rate),
+            lambda index, rate=rate: index.between(
+                "danger_rate", None, rate, True, False
+            ),
         )
     if location == "disk":
         outPath += "equal" + str(rate)
@@ -749,7 +1364,141 @@ def dangerRate(
         except FileExistsError:
             pass
     return filterJobs(
-        location, data, lambda job, rate=rate: float(job.danger_rate) == rate, outPath
+        location,
+        data,
+        lambda job, rate=rate: float(job.danger_rate) == rate,
+        outPath,
+        fields,
+        Compare("danger_rate", "=", rate),
+        lambda index, rate=rate: index.between("danger_rate", rate, rate),
+    )
+
+
+def statInRange(value, low: float, high: float, includeHigh: bool = True) -> bool:
+    if value is None or value == "":
+        return False
+    if includeHigh:
+        return low <= float(value) <= high
+    return low <= float(value) < high
+
+
+def statBetween(
+    location, data: Union[str, List[bytes]], stat: str, low: float, high: float
+) -> Union[Tuple[str, str], Tuple[List[bytes], List[bytes]]]:
+    """
+    Filter the data file to only jobs where a stat was between two values, inclusive.
+
+    :param data: the full name of the data file
+    :type data: str
+    :param stat: the stat, as a space separated path such as "danger_rate" or "quota 0"
+    :type stat: str
+    :param low: the lowest value to keep
+    :type low: float
+    :param high: the highest value to keep
+    :type high: float
+    :return: the full names of the paired filtered files
+    :rtype: Tuple[str, str]
+    :raises gzip.BadGzipFile: if the file exists but isn't a gzip file
+    :raises FileNotFoundError: if the file doesn't exist
+
+    :Example:
+
+    >>> import filters
+    >>> filters.statBetween("disk", "data/salmonAll.jl.gz", "danger_rate", 100, 200)
+    (
+        'data/salmonAll/between/danger_rate100to200.jl.gz',
+        'data/salmonAll/notbetween/danger_rate100to200.jl.gz'
+    )
+
+    """
+    if location == "disk":
+        try:
+            os.mkdir(cast(str, data[:-6]) + "/")
+        except FileExistsError:
+            pass
+        try:
+            os.mkdir(cast(str, data[:-6]) + "/between/")
+        except FileExistsError:
+            pass
+        try:
+            os.mkdir(cast(str, data[:-6]) + "/notbetween/")
+        except FileExistsError:
+            pass
+    statArr: List[Union[str, int]] = list(
+        map(lambda ele: int(ele) if ele.isdigit() else ele, stat.split())
+    )
+    fields: dict = projectFields([stat])
+    postingFunction: Callable = None
+    if stat in rangeFields:
+        postingFunction = lambda index, stat=stat, low=low, high=high: index.between(
+            stat, low, high
+        )
+    return filterJobs(
+        location,
+        data,
+        lambda job, statArr=statArr, low=low, high=high: statInRange(
+            getValMultiDimensional(job, statArr), low, high
+        ),
+        "between/" + stat.replace(" ", "_") + str(low) + "to" + str(high),
+        fields,
+        Between(stat, low, high),
+        postingFunction,
+    )
+
+
+def duringTimeWindow(
+    location, data: Union[str, List[bytes]], start: int, end: int
+) -> Union[Tuple[str, str], Tuple[List[bytes], List[bytes]]]:
+    """
+    Filter the data file to only jobs that started in a window of time, such as a season.
+
+    :param data: the full name of the data file
+    :type data: str
+    :param start: the first second of the window, as a Unix timestamp
+    :type start: int
+    :param end: the second after the window ends, as a Unix timestamp
+    :type end: int
+    :return: the full names of the paired filtered files
+    :rtype: Tuple[str, str]
+    :raises gzip.BadGzipFile: if the file exists but isn't a gzip file
+    :raises FileNotFoundError: if the file doesn't exist
+
+    :Example:
+
+    >>> import filters
+    >>> filters.duringTimeWindow("disk", "data/salmonAll.jl.gz", 1606780800, 1614556800)
+    (
+        'data/salmonAll/timeWindows/1606780800to1614556800.jl.gz',
+        'data/salmonAll/nottimeWindows/1606780800to1614556800.jl.gz'
+    )
+
+    """
+    if location == "disk":
+        try:
+            os.mkdir(cast(str, data[:-6]) + "/")
+        except FileExistsError:
+            pass
+        try:
+            os.mkdir(cast(str, data[:-6]) + "/timeWindows/")
+        except FileExistsError:
+            pass
+        try:
+            os.mkdir(cast(str, data[:-6]) + "/nottimeWindows/")
+        except FileExistsError:
+            pass
+    fields: dict = projectFields(["start_at time"])
+    return filterJobs(
+        location,
+        data,
+        lambda job, start=start, end=end: statInRange(
+            job.start_at.time if job.start_at is not None else None, start, end, False
+        ),
+        "timeWindows/" + str(start) + "to" + str(end),
+        fields,
+        Between("start_at time", start, end, False),
+        lambda index, start=start, end=end: index.between(
+            "start_at time", start, end, True, False
+        ),
     )
 
 
@@ -789,22 +1538,51 @@ def hasTides(
             os.mkdir(cast(str, data[:-6]) + "/nottides/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["waves water_level key"])
     filterFunctions: List[Callable] = []
+    headerFunctions: List[Callable] = []
+    postingFunctions: List[Callable] = []
     outPath = "tides/"
     for tide in tides:
+        headerFunctions.append(HasKey("water_level", "water_levels", [tide]))
         filterFunctions.append(
             lambda var, tide=tide: (
-                var.waves[0].water_level == tide
-                or (len(var.waves) > 1 and var.waves[1].water_level == tide)
-                or (len(var.waves) > 2 and var.waves[2].water_level == tide)
+                var.waves[0].water_level.key == tide
+                or (len(var.waves) > 1 and var.waves[1].water_level.key == tide)
+                or (len(var.waves) > 2 and var.waves[2].water_level.key == tide)
             )
         )
+        postingFunctions.append(lambda index, tide=tide: index.lookup("tides", tide))
         outPath += tide + (mode if mode is not None else "")
     if mode == "and":
-        return filterJobsAnd(location, data, filterFunctions, outPath)
+        return filterJobsAnd(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
     if mode == "or":
-        return filterJobsOr(location, data, filterFunctions, outPath)
-    return filterJobs(location, data, filterFunctions[0], outPath)
+        return filterJobsOr(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
+    return filterJobs(
+        location,
+        data,
+        filterFunctions[0],
+        outPath,
+        fields,
+        headerFunctions[0],
+        postingFunctions[0],
+    )
 
 
 def hasEvents(
@@ -843,9 +1621,13 @@ def hasEvents(
             os.mkdir(cast(str, data[:-6]) + "/notevents/")
         except FileExistsError:
             pass
+    fields: dict = projectFields(["waves known_occurrence key"])
     filterFunctions: List[Callable] = []
+    headerFunctions: List[Callable] = []
+    postingFunctions: List[Callable] = []
     outPath = "events/"
     for event in events:
+        headerFunctions.append(HasKey("known_occurrence", "events", [event]))
         filterFunctions.append(
             lambda var, event=event: (
                 (
@@ -864,12 +1646,39 @@ def hasEvents(
                 )
             )
         )
+        postingFunctions.append(
+            lambda index, event=event: index.lookup("events", event)
+        )
         outPath += event + (mode if mode is not None else "")
     if mode == "and":
-        return filterJobsAnd(location, data, filterFunctions, outPath)
+        return filterJobsAnd(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
     if mode == "or":
-        return filterJobsOr(location, data, filterFunctions, outPath)
-    return filterJobs(location, data, filterFunctions[0], outPath)
+        return filterJobsOr(
+            location,
+            data,
+            filterFunctions,
+            outPath,
+            fields,
+            headerFunctions,
+            postingFunctions,
+        )
+    return filterJobs(
+        location,
+        data,
+        filterFunctions[0],
+        outPath,
+        fields,
+        headerFunctions[0],
+        postingFunctions[0],
+    )
 
 
 def hasWeaponTypes(
@@ -905,9 +1714,18 @@ def hasWeaponTypes(
     weaponDict = {}
     for i in weaponList:
         weaponDict[i["key"]] = i
+    fields: dict = projectFields(["my_data weapons key", "teammates weapons key"])
     filterFunctions: List[Callable] = []
+    headerFunctions: List[Callable] = []
     outPath = "weaponTypes/"
     for wtype in types:
+        headerFunctions.append(
+            HasKey(
+                "weapons",
+                "weapons",
+                [key for key in weaponDict if weaponDict[key]["type"]["key"] == wtype],
+            )
+        )
         filterFunctions.append(
             lambda var, wtype=wtype, weaponDict=weaponDict: (
                 weaponDict[var.my_data.weapons[0].key]["type"]["key"] == wtype
@@ -1000,7 +1818,13 @@ def hasWeaponTypes(
         )
         outPath += wtype + (mode if mode is not None else "")
     if mode == "and":
-        return filterJobsAnd(location, data, filterFunctions, outPath)
+        return filterJobsAnd(
+            location, data, filterFunctions, outPath, fields, headerFunctions
+        )
     if mode == "or":
-        return filterJobsOr(location, data, filterFunctions, outPath)
-    return filterJobs(location, data, filterFunctions[0], outPath)
+        return filterJobsOr(
+            location, data, filterFunctions, outPath, fields, headerFunctions
+        )
+    return filterJobs(
+        location, data, filterFunctions[0], outPath, fields, headerFunctions[0]
+    )
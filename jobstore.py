@@ -0,0 +1,438 @@
+import collections
+import gzip
+import os
+import random
+import zlib
+import numpy as np
+from array import array
+from columns import JobColumns
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+dictionarySize = 32768
+sampleSize = 1000
+longestFragment = 4096
+headerColumns = (
+    "id",
+    "shift_start_at",
+    "start_at",
+    "danger_rate",
+    "clear_waves",
+    "quota",
+    "stage",
+    "fail_reason",
+    "special",
+    "weapons",
+    "splatnet_id",
+    "water_level",
+    "known_occurrence",
+    "golden_egg_delivered",
+    "power_egg_collected",
+    "rescue",
+    "death",
+)
+
+
+class JobBuffer:
+    """
+    The compressed JSON lines of a data set held in memory.
+
+    Every line sits back to back in one bytearray, and ``offsets`` holds where
+    each line starts, followed by where the last one ends. Indexing with an int
+    and iterating return copies of the lines as bytes, so they stay valid while
+    the buffer grows. Indexing with a slice, a list of indices or a NumPy index
+    array returns a new JobBuffer.
+
+    When ``zdict`` is set, every line was compressed as raw deflate against that
+    preset dictionary, and has to be decompressed with it through decompressJob.
+
+    When ``header`` is set, it holds the headerColumns of every line, row for
+    row, so filters on those fields can skip decompressing the lines. Appending
+    a line drops the header.
+
+    """
+
+    __slots__ = ["buffer", "offsets", "zdict", "header"]
+
+    def __init__(self, jobs: Iterable[bytes] = (), zdict: Optional[bytes] = None):
+        self.buffer: bytearray = bytearray()
+        self.offsets: array = array("Q", [0])
+        self.zdict: Optional[bytes] = zdict
+        self.header: Optional[JobColumns] = None
+        self.extend(jobs)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __iter__(self) -> Iterator[bytes]:
+        for i in range(len(self.offsets) - 1):
+            yield self.line(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.take(range(start, stop, step))
+            result: JobBuffer = JobBuffer(zdict=self.zdict)
+            if stop > start:
+                base: int = self.offsets[start]
+                result.buffer = self.buffer[base : self.offsets[stop]]
+                result.offsets = array(
+                    "Q", [offset - base for offset in self.offsets[start : stop + 1]]
+                )
+            if self.header is not None:
+                result.header = self.header.take(slice(start, stop))
+            return result
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("JobBuffer index out of range")
+            return self.line(index)
+        return self.take(index)
+
+    def line(self, index: int) -> bytes:
+        # The memoryview is dropped before returning, so the buffer can still grow.
+        return memoryview(self.buffer)[
+            self.offsets[index] : self.offsets[index + 1]
+        ].tobytes()
+
+    def append(self, line: bytes) -> None:
+        self.buffer += line
+        self.offsets.append(len(self.buffer))
+        self.header = None
+
+    def extend(self, lines: Iterable[bytes]) -> None:
+        for line in lines:
+            self.append(line)
+
+    def take(self, indices) -> "JobBuffer":
+        """
+        Copy the chosen lines into a new JobBuffer.
+
+        :param indices: the indices of the lines, or a NumPy boolean mask
+        :type indices: Iterable[int]
+        :return: the chosen lines, in the order given
+        :rtype: JobBuffer
+
+        :Example:
+
+        >>> import core
+        >>> data = core.loadJobsFromFile("data/salmonAll.jl.gz")
+        >>> len(data.take([0, 2, 4]))
+        3
+
+        """
+        if isinstance(indices, np.ndarray) and indices.dtype == np.bool_:
+            indices = np.flatnonzero(indices)
+        indices = np.asarray(indices, dtype=np.int64)
+        result: JobBuffer = JobBuffer(zdict=self.zdict)
+        view: memoryview = memoryview(self.buffer)
+        offsets: array = self.offsets
+        count: int = len(self)
+        for index in indices.tolist():
+            if index < 0:
+                index += count
+            if not 0 <= index < count:
+                raise IndexError("JobBuffer index out of range")
+            result.append(view[offsets[index] : offsets[index + 1]])
+        if self.header is not None:
+            result.header = self.header.take(indices)
+        return result
+
+
+class Selection:
+    """
+    A subset of the jobs of a JobBuffer, held as sorted int32 row numbers into it.
+
+    Filtering a selection only narrows its row numbers, so the lines of the base
+    are never copied. A selection made with ``complement`` holds no rows until
+    they're first needed, when they're worked out from the selection it was
+    taken within. Selections of the same base combine with ``&``, ``|`` and
+    ``-`` without touching the lines.
+
+    It can be used wherever an in-memory data set is read: iterating it yields
+    the compressed lines of the chosen jobs, and decompressJob reads the preset
+    dictionary of the base.
+
+    """
+
+    __slots__ = ["base", "rows", "within", "excluded"]
+
+    def __init__(self, base: JobBuffer, rows: Optional[np.ndarray] = None):
+        self.base: JobBuffer = base
+        self.rows: Optional[np.ndarray] = None
+        if rows is not None:
+            self.rows = np.asarray(rows, dtype=np.int32)
+        self.within: Optional[Selection] = None
+        self.excluded: Optional[Selection] = None
+
+    @property
+    def indices(self) -> np.ndarray:
+        if self.rows is None:
+            if self.excluded is None:
+                self.rows = np.arange(len(self.base), dtype=np.int32)
+            else:
+                self.rows = np.setdiff1d(
+                    self.within.indices, self.excluded.indices, assume_unique=True
+                ).astype(np.int32)
+                self.within = None
+                self.excluded = None
+        return self.rows
+
+    @property
+    def zdict(self) -> Optional[bytes]:
+        return self.base.zdict
+
+    @property
+    def header(self) -> Optional[JobColumns]:
+        if self.base.header is None:
+            return None
+        return self.base.header.take(self.indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self) -> Iterator[bytes]:
+        for index in self.indices.tolist():
+            yield self.base.line(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Selection(self.base, self.indices[index])
+        return self.base[int(self.indices[index])]
+
+    def sameBase(self, other: "Selection") -> None:
+        if self.base is not other.base:
+            raise ValueError("Selections of different data sets can't be combined")
+
+    def __and__(self, other: "Selection") -> "Selection":
+        self.sameBase(other)
+        return Selection(
+            self.base, np.intersect1d(self.indices, other.indices, assume_unique=True)
+        )
+
+    def __or__(self, other: "Selection") -> "Selection":
+        self.sameBase(other)
+        return Selection(self.base, np.union1d(self.indices, other.indices))
+
+    def __sub__(self, other: "Selection") -> "Selection":
+        self.sameBase(other)
+        return Selection(
+            self.base, np.setdiff1d(self.indices, other.indices, assume_unique=True)
+        )
+
+    def __invert__(self) -> "Selection":
+        return self.complement()
+
+    def complement(self, within: Optional["Selection"] = None) -> "Selection":
+        """
+        Select the jobs left out of this selection, without working them out yet.
+
+        :param within: the selection to take the complement within, or None for every job of the base
+        :type within: Optional[Selection]
+        :return: the jobs of within that aren't in this selection
+        :rtype: Selection
+
+        """
+        if within is None:
+            within = Selection(self.base)
+        self.sameBase(within)
+        result: Selection = Selection(self.base)
+        result.within = within
+        result.excluded = self
+        return result
+
+    def split(self, mask: np.ndarray) -> Tuple["Selection", "Selection"]:
+        """
+        Split the selection by one boolean per chosen job.
+
+        :param mask: whether each job of the selection, in order, matched
+        :type mask: np.ndarray
+        :return: the matching jobs, and the rest as a lazy complement
+        :rtype: Tuple[Selection, Selection]
+
+        :Example:
+
+        >>> import core
+        >>> import jobstore
+        >>> jobs = jobstore.Selection(core.loadJobsFromFile("data/salmonAll.jl.gz"))
+        >>> cleared, failed = jobs.split(jobs.header["clear_waves"] == 3)
+        >>> len(cleared) + len(failed) == len(jobs)
+        True
+
+        """
+        selected: Selection = Selection(self.base, self.indices[mask])
+        return (selected, selected.complement(self))
+
+    def toBuffer(self) -> JobBuffer:
+        """
+        Copy the chosen lines into a new JobBuffer.
+
+        :return: the chosen lines, in row order
+        :rtype: JobBuffer
+
+        """
+        return self.base.take(self.indices)
+
+
+def fragments(line: bytes) -> List[bytes]:
+    """
+    Split a JSON line into the object keys and the nested objects it contains.
+
+    :param line: one JSON line
+    :type line: bytes
+    :return: every key, such as b'"name":', and every nested object up to longestFragment bytes
+    :rtype: List[bytes]
+
+    """
+    result: List[bytes] = []
+    starts: List[int] = []
+    inString: bool = False
+    escaped: bool = False
+    stringStart: int = 0
+    for i, char in enumerate(line):
+        if inString:
+            if escaped:
+                escaped = False
+            elif char == 92:
+                escaped = True
+            elif char == 34:
+                inString = False
+                if line[i + 1 : i + 2] == b":":
+                    result.append(line[stringStart : i + 2])
+        elif char == 34:
+            inString = True
+            stringStart = i
+        elif char == 123:
+            starts.append(i)
+        elif char == 125 and len(starts) > 0:
+            start: int = starts.pop()
+            if len(starts) > 0 and i + 1 - start <= longestFragment:
+                result.append(line[start : i + 1])
+    return result
+
+
+def trainDictionary(sample: List[bytes], size: int = dictionarySize) -> bytes:
+    """
+    Build a zlib preset dictionary from a sample of JSON lines.
+
+    Fragments are scored by how many bytes they would save across the sample,
+    and the best ones are placed last, where deflate can reach them most cheaply.
+
+    :param sample: the JSON lines to learn from
+    :type sample: List[bytes]
+    :param size: the most bytes the dictionary may hold
+    :type size: int
+    :return: the dictionary
+    :rtype: bytes
+
+    :Example:
+
+    >>> import jobstore
+    >>> zdict = jobstore.trainDictionary(lines[0:1000])
+    >>> len(zdict) <= 32768
+    True
+
+    """
+    counts: Dict[bytes, int] = collections.Counter()
+    for line in sample:
+        counts.update(set(fragments(line)))
+    chosen: List[bytes] = []
+    used: int = 0
+    for fragment, count in sorted(
+        counts.items(), key=lambda item: (item[1] - 1) * len(item[0]), reverse=True
+    ):
+        if count < 2 or used + len(fragment) > size:
+            continue
+        if any(fragment in other for other in chosen):
+            continue
+        chosen.append(fragment)
+        used += len(fragment)
+    return b"".join(reversed(chosen))
+
+
+def compressJob(line: bytes, zdict: Optional[bytes] = None) -> bytes:
+    """
+    Compress one JSON line for a JobBuffer.
+
+    :param line: the JSON line
+    :type line: bytes
+    :param zdict: the preset dictionary, or None for a standalone zlib stream
+    :type zdict: Optional[bytes]
+    :return: the compressed line
+    :rtype: bytes
+
+    """
+    if zdict is None:
+        return zlib.compress(line)
+    compressor = zlib.compressobj(
+        9, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, zdict
+    )
+    return compressor.compress(line) + compressor.flush()
+
+
+def decompressJob(data: List[bytes], line: bytes) -> bytes:
+    """
+    Decompress one line of an in-memory data set.
+
+    :param data: the data set the line belongs to
+    :type data: List[bytes]
+    :param line: the compressed line
+    :type line: bytes
+    :return: the JSON line
+    :rtype: bytes
+
+    :Example:
+
+    >>> import core
+    >>> data = core.loadJobsFromFile("data/salmonAll.jl.gz", dictionary=True)
+    >>> ujson.loads(core.decompressJob(data, data[0]))["id"]
+    1
+
+    """
+    zdict: Optional[bytes] = getattr(data, "zdict", None)
+    if zdict is None:
+        return zlib.decompress(line)
+    decompressor = zlib.decompressobj(-15, zdict=zdict)
+    return decompressor.decompress(line) + decompressor.flush()
+
+
+def dictionaryPath(data: str) -> str:
+    return data[0:-6] + "Dictionary.bin"
+
+
+def loadDictionary(data: str) -> bytes:
+    """
+    Read the preset dictionary stored next to a data file, training it first if needed.
+
+    The dictionary is trained on a random sample of sampleSize jobs from the whole
+    file, and kept so that later loads skip the extra pass.
+
+    :param data: the full name of the data file
+    :type data: str
+    :return: the dictionary
+    :rtype: bytes
+    :raises gzip.BadGzipFile: if the data file isn't a gzip file
+    :raises FileNotFoundError: if the data file doesn't exist
+
+    """
+    try:
+        with open(dictionaryPath(data), "rb") as reader:
+            return reader.read()
+    except FileNotFoundError:
+        pass
+    rng: random.Random = random.Random(0)
+    sample: List[bytes] = []
+    with gzip.open(data, "r") as reader:
+        for i, line in enumerate(reader):
+            if i < sampleSize:
+                sample.append(line)
+            else:
+                j: int = rng.randrange(i + 1)
+                if j < sampleSize:
+                    sample[j] = line
+    zdict: bytes = trainDictionary(sample)
+    with open(dictionaryPath(data) + ".tmp", "wb") as writer:
+        writer.write(zdict)
+    os.replace(dictionaryPath(data) + ".tmp", dictionaryPath(data))
+    return zdict
@@ -12,7 +12,7 @@ cdef void printAllJobs(str dataFile)
 @cython.locals(which=str, i=cython.int, chosenList=cython.int)
 cdef void printJobs(list dataFile)
 
-@cython.locals(i=cython.int, first=cython.int, second=cython.int, stat=str, firstStat=list, secondStat=list, t=cython.double, p=cython.double)
+@cython.locals(i=cython.int, first=cython.int, second=cython.int, stat=object, firstStat=list, secondStat=list, t=cython.double, p=cython.double)
 cdef void hypothesisTesting(list dataFile)
 
 @cython.locals(which=str, stat=str, mode=str, i=cython.int, chosenList=cython.int)
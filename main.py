@@ -20,7 +20,9 @@ import sys
 from scipy.stats import ttest_ind
 import numpy as np
 import matplotlib.pyplot as plt
-import gzip
+from blocks import openJobs
+from jobstore import Selection
+from expressions import Expression, parseStat
 
 
 def filterBy(dataList: List[List[bytes]]) -> List[List[bytes]]:
@@ -248,7 +250,7 @@ def printAllJobs(dataList):
     :parem dataList:
     :type dataList: str
     """
-    with gzip.open(dataList) as reader:
+    with openJobs(dataList) as reader:
         for line in reader:
             job = Job(**ujson.loads(line))
             core.printGeneral(job)
@@ -281,20 +283,28 @@ def hypothesisTesting(dataList: List[List[bytes]]):
         print(dataList[i])
     first: int = int(input("Which is the first list you'd like to use (by index): "))
     second: int = int(input("Which is the first list you'd like to use (by index): "))
-    stat: str = input("Which stat would you like to test: ")
-    firstStat: List[float] = core.getArrayOfStat("mem", dataList[first], stat)
-    secondStat: List[float] = core.getArrayOfStat("mem", dataList[second], stat)
+    stat: Expression = parseStat(input("Which stat would you like to test: "))
+    firstStat: List[float] = [
+        value
+        for value in core.getArrayOfStat("mem", dataList[first], stat)
+        if value == value
+    ]
+    secondStat: List[float] = [
+        value
+        for value in core.getArrayOfStat("mem", dataList[second], stat)
+        if value == value
+    ]
     t, p = ttest_ind(firstStat, secondStat, equal_var=False)
     print("a - b = " + str(np.mean(firstStat) - np.mean(secondStat)))
     print("t = " + str(t))
     print("p = " + str(p))
     plt.subplot(121)
     plt.hist(firstStat, density=True)
-    plt.xlabel(stat)
+    plt.xlabel(str(stat))
     plt.ylabel("Probability")
     plt.subplot(122)
     plt.hist(secondStat, density=True)
-    plt.xlabel(stat)
+    plt.xlabel(str(stat))
     plt.ylabel("Probability")
     plt.show()
 
@@ -390,7 +400,9 @@ if __name__ == "__main__":
     print("User")
     scope: str = input("Pick an analysis scope: ")
     dataFile: str = core.init(scope, ujson.load(open("keys.json", "r"))["statink_key"])
-    data: List[List[bytes]] = [core.loadJobsFromFile(dataFile)]
+    data: List[Selection] = [
+        Selection(core.loadJobsFromFile(dataFile, dictionary=True, header=True))
+    ]
     while input("Add a filter [Y/N]: ") == "Y":
         data = filterBy(data)
     processData(data)
@@ -1,4 +1,81 @@
-from typing import List, Dict, Union, Optional
+import os
+import threading
+from typing import List, Dict, Union, Optional, Tuple
+
+registry: Dict[Tuple[str, str], object] = {}
+projectedRegistry: Dict[Tuple[str, str, str], object] = {}
+registryLock = threading.Lock()
+
+
+def resetRegistryLock() -> None:
+    global registryLock
+    registryLock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=resetRegistryLock)
+
+
+def internEntity(cls, data: dict):
+    """
+    Find the shared instance of a keyed entity, such as a stage, weapon, special, boss, tide or event.
+
+    The first job to mention a key builds the instance and every later job
+    shares it, so a stage or weapon is held once however many jobs mention it.
+    Shared instances must not be modified.
+
+    :param cls: the class of the entity
+    :type cls: type
+    :param data: the parsed JSON of the entity
+    :type data: dict
+    :return: the shared instance
+    :rtype: object
+
+    """
+    entity = registry.get((cls.__name__, data["key"]))
+    if entity is None:
+        with registryLock:
+            entity = registry.get((cls.__name__, data["key"]))
+            if entity is None:
+                entity = cls(**data)
+                registry[(cls.__name__, data["key"])] = entity
+    return entity
+
+
+def seedRegistry(entities: Dict[Tuple[str, str], object]) -> None:
+    """
+    Pre-seed the registry, for example in a worker process.
+
+    Entities already in the registry are kept, so seeding never replaces an
+    instance that jobs may already share.
+
+    :param entities: the entities to add, as returned by registrySnapshot
+    :type entities: Dict[Tuple[str, str], object]
+
+    :Example:
+
+    >>> import objects
+    >>> from concurrent.futures import ProcessPoolExecutor
+    >>> pool = ProcessPoolExecutor(
+    ...     initializer=objects.seedRegistry, initargs=(objects.registrySnapshot(),)
+    ... )
+
+    """
+    with registryLock:
+        for key, entity in entities.items():
+            registry.setdefault(key, entity)
+
+
+def registrySnapshot() -> Dict[Tuple[str, str], object]:
+    """
+    Copy the registry so it can be passed to seedRegistry.
+
+    :return: the entities in the registry
+    :rtype: Dict[Tuple[str, str], object]
+
+    """
+    with registryLock:
+        return dict(registry)
 
 
 class Time:
@@ -73,7 +150,7 @@ class Boss_Appearance:
     __slots__ = ["boss", "count"]
 
     def __init__(self, boss: dict, count: int):
-        self.boss: Boss = Boss(**boss)
+        self.boss: Boss = internEntity(Boss, boss)
         self.count: int = count
 
 
@@ -131,13 +208,13 @@ class Wave:
         power_egg_collected: int,
     ):
         if known_occurrence is not None:
-            self.known_occurrence: Stage_WaterLevel_KnownOccurrence = (
-                Stage_WaterLevel_KnownOccurrence(**known_occurrence)
+            self.known_occurrence: Stage_WaterLevel_KnownOccurrence = internEntity(
+                Stage_WaterLevel_KnownOccurrence, known_occurrence
             )
         else:
             known_occurrence = None
-        self.water_level: Stage_WaterLevel_KnownOccurrence = (
-            Stage_WaterLevel_KnownOccurrence(**water_level)
+        self.water_level: Stage_WaterLevel_KnownOccurrence = internEntity(
+            Stage_WaterLevel_KnownOccurrence, water_level
         )
         self.golden_egg_quota: int = golden_egg_quota
         self.golden_egg_appearances: int = golden_egg_appearances
@@ -203,24 +280,24 @@ class My_Data_Teammate:
     ):
         self.splatnet_id: str = splatnet_id
         self.name: str = name
-        self.special: Special_Weapon = Special_Weapon(**special)
+        self.special: Special_Weapon = internEntity(Special_Weapon, special)
         self.rescue: int = rescue
         self.death: int = death
         self.golden_egg_delivered: int = golden_egg_delivered
         self.power_egg_collected: int = power_egg_collected
         if species is not None:
-            self.species: Species_FailReason = Species_FailReason(**species)
+            self.species: Species_FailReason = internEntity(Species_FailReason, species)
         else:
             self.species = None
         if gender is not None:
-            self.gender = Gender(**gender)
+            self.gender = internEntity(Gender, gender)
         else:
             self.gender = None
         self.special_uses: List[int] = special_uses
         self.weapons: List[Special_Weapon] = []
         if weapons is not None:
             for weapon in weapons:
-                self.weapons.append(Special_Weapon(**weapon))
+                self.weapons.append(internEntity(Special_Weapon, weapon))
         else:
             self.weapons = None
         self.boss_kills: List[Boss_Appearance] = []
@@ -394,15 +471,15 @@ class Job:
         self.api_endpoint: str = api_endpoint
         self.user: User = User(**user)
         if stage is not None:
-            self.stage: Optional[
-                Stage_WaterLevel_KnownOccurrence
-            ] = Stage_WaterLevel_KnownOccurrence(**stage)
+            self.stage: Optional[Stage_WaterLevel_KnownOccurrence] = internEntity(
+                Stage_WaterLevel_KnownOccurrence, stage
+            )
         else:
             self.stage = None
         self.is_cleared: bool = is_cleared
         if fail_reason is not None and fail_reason != "None":
-            self.fail_reason: Optional[Species_FailReason] = Species_FailReason(
-                **fail_reason
+            self.fail_reason: Optional[Species_FailReason] = internEntity(
+                Species_FailReason, fail_reason
             )
         else:
             self.fail_reason = None
@@ -410,14 +487,14 @@ class Job:
         self.danger_rate: str = danger_rate
         self.quota: List[int] = quota
         if title is not None:
-            self.title: Optional[Title] = Title(**title)
+            self.title: Optional[Title] = internEntity(Title, title)
         else:
             self.title = None
         if title_exp is not None:
             self.title_exp: int = title_exp
         else:
             self.title_exp = None
-        self.title_after: Title = Title(**title_after)
+        self.title_after: Title = internEntity(Title, title_after)
         self.title_exp_after: int = title_exp_after
         self.boss_appearances: List[Boss_Appearance] = []
         if boss_appearances is not None:
@@ -447,3 +524,276 @@ class Job:
 
     def has_stage(self) -> bool:
         return self.stage is not None
+
+
+def optionalStage(data: Optional[dict]) -> Optional[Stage_WaterLevel_KnownOccurrence]:
+    if data is None:
+        return None
+    return internEntity(Stage_WaterLevel_KnownOccurrence, data)
+
+
+def optionalFailReason(data) -> Optional[Species_FailReason]:
+    if data is None or data == "None":
+        return None
+    return internEntity(Species_FailReason, data)
+
+
+def optionalTitle(data: Optional[dict]) -> Optional[Title]:
+    if data is None:
+        return None
+    return internEntity(Title, data)
+
+
+def optionalTime(data: Optional[dict]) -> Optional[Time]:
+    if data is None:
+        return None
+    return Time(**data)
+
+
+def bossAppearances(data: Optional[List[dict]]) -> List[Boss_Appearance]:
+    if data is None:
+        return []
+    return [Boss_Appearance(**boss) for boss in data]
+
+
+def teammates(data: Optional[List[dict]]) -> Optional[List[My_Data_Teammate]]:
+    if data is None:
+        return None
+    return [My_Data_Teammate(**teammate) for teammate in data]
+
+
+jobBuilders = {
+    "user": lambda data: User(**data),
+    "stage": optionalStage,
+    "fail_reason": optionalFailReason,
+    "title": optionalTitle,
+    "title_after": lambda data: internEntity(Title, data),
+    "boss_appearances": bossAppearances,
+    "waves": lambda data: [Wave(**wave) for wave in data],
+    "my_data": lambda data: My_Data_Teammate(**data),
+    "teammates": teammates,
+    "agent": lambda data: Agent(**data),
+    "shift_start_at": lambda data: Time(**data),
+    "start_at": lambda data: Time(**data),
+    "end_at": optionalTime,
+    "register_at": lambda data: Time(**data),
+}
+
+
+class LazyJob:
+    """
+    A Job that keeps its parsed JSON and only builds each nested object the first time it is read.
+
+    It has the same attributes as Job, so filter functions and stat paths work on either.
+
+    :Example:
+
+    >>> import objects
+    >>> import ujson
+    >>> job = objects.LazyJob(**ujson.loads(line))
+    >>> job.shift_start_at.time
+    1607752800
+
+    """
+
+    __slots__ = ["raw", "built"]
+
+    def __init__(self, **raw):
+        self.raw: dict = raw
+        self.built: dict = {}
+
+    def __getattr__(self, name: str):
+        if name in LazyJob.__slots__:
+            raise AttributeError(name)
+        if name in self.built:
+            return self.built[name]
+        if name not in self.raw:
+            raise AttributeError(name)
+        if name not in jobBuilders:
+            return self.raw[name]
+        value = jobBuilders[name](self.raw[name])
+        self.built[name] = value
+        return value
+
+    def has_stage(self) -> bool:
+        return self.stage is not None
+
+
+nestedFields: Dict[type, Dict[str, Tuple[type, bool]]] = {
+    Boss: {"name": (Name, False)},
+    Boss_Appearance: {"boss": (Boss, False)},
+    Title: {"name": (Name, False), "generic_name": (Name, False)},
+    Special_Weapon: {"name": (Name, False)},
+    Stage_WaterLevel_KnownOccurrence: {"name": (Name, False)},
+    Wave: {
+        "known_occurrence": (Stage_WaterLevel_KnownOccurrence, False),
+        "water_level": (Stage_WaterLevel_KnownOccurrence, False),
+    },
+    Gender: {"name": (Name, False)},
+    Species_FailReason: {"name": (Name, False)},
+    My_Data_Teammate: {
+        "special": (Special_Weapon, False),
+        "species": (Species_FailReason, False),
+        "gender": (Gender, False),
+        "weapons": (Special_Weapon, True),
+        "boss_kills": (Boss_Appearance, True),
+    },
+    Stats: {"as_of": (Time, False), "registered_at": (Time, False)},
+    User: {
+        "join_at": (Time, False),
+        "profile": (Profile, False),
+        "stats": (Stats, False),
+    },
+    Job: {
+        "user": (User, False),
+        "stage": (Stage_WaterLevel_KnownOccurrence, False),
+        "fail_reason": (Species_FailReason, False),
+        "title": (Title, False),
+        "title_after": (Title, False),
+        "boss_appearances": (Boss_Appearance, True),
+        "waves": (Wave, True),
+        "my_data": (My_Data_Teammate, False),
+        "teammates": (My_Data_Teammate, True),
+        "agent": (Agent, False),
+        "shift_start_at": (Time, False),
+        "start_at": (Time, False),
+        "end_at": (Time, False),
+        "register_at": (Time, False),
+    },
+}
+
+
+def projectFields(paths) -> dict:
+    """
+    Turn stat paths into the projection decodeJob takes.
+
+    List indices in a path are dropped, since a projection applies to every
+    element of a list. A path that ends on an object keeps all of that object.
+
+    :param paths: space separated attribute paths, such as "my_data weapons 0 key"
+    :type paths: Iterable[str]
+    :return: a tree of the fields to build, with True for a whole subtree
+    :rtype: dict
+
+    :Example:
+
+    >>> import objects
+    >>> objects.projectFields(["my_data golden_egg_delivered", "quota 0"])
+    {'my_data': {'golden_egg_delivered': True}, 'quota': True}
+
+    """
+    fields: dict = {}
+    for path in paths:
+        names: List[str] = [name for name in path.split() if not name.isdigit()]
+        node: dict = fields
+        for name in names[0:-1]:
+            if node.get(name) is True:
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[names[-1]] = True
+    return fields
+
+
+keyedEntities: Tuple[type, ...] = (
+    Boss,
+    Title,
+    Special_Weapon,
+    Stage_WaterLevel_KnownOccurrence,
+    Gender,
+    Species_FailReason,
+)
+
+
+def internProjected(cls, data: dict, locale: str):
+    """
+    Find the shared projected instance of a keyed entity.
+
+    Since projected names only have one locale, instances are shared by class,
+    key and locale. The entity is built whole, so it serves every projection.
+    Shared instances must not be modified.
+
+    :param cls: the class of the entity
+    :type cls: type
+    :param data: the parsed JSON of the entity
+    :type data: dict
+    :param locale: the locale to keep in names
+    :type locale: str
+    :return: the shared instance
+    :rtype: object
+
+    """
+    entity = projectedRegistry.get((cls.__name__, data["key"], locale))
+    if entity is None:
+        with registryLock:
+            entity = projectedRegistry.get((cls.__name__, data["key"], locale))
+            if entity is None:
+                entity = buildObject(cls, data, True, locale)
+                projectedRegistry[(cls.__name__, data["key"], locale)] = entity
+    return entity
+
+
+def projectObject(cls, data, fields, locale: str):
+    if data is None or (cls is Species_FailReason and data == "None"):
+        return None
+    if cls in keyedEntities:
+        return internProjected(cls, data, locale)
+    return buildObject(cls, data, fields, locale)
+
+
+def buildObject(cls, data, fields, locale: str):
+    obj = cls.__new__(cls)
+    if cls is Name:
+        setattr(obj, locale, data.get(locale))
+        return obj
+    children: Dict[str, Tuple[type, bool]] = nestedFields.get(cls, {})
+    for name in data if fields is True else fields:
+        if name not in data:
+            continue
+        value = data[name]
+        if name in children and value is not None:
+            child, isList = children[name]
+            if isList:
+                value = [
+                    projectObject(child, item, fields is True or fields[name], locale)
+                    for item in value
+                ]
+            else:
+                value = projectObject(
+                    child, value, fields is True or fields[name], locale
+                )
+        elif name == "boss_appearances" and value is None:
+            value = []
+        setattr(obj, name, value)
+    return obj
+
+
+def decodeJob(data: dict, fields: dict, locale: str) -> Job:
+    """
+    Build only the projected parts of a job.
+
+    Attributes outside the projection are left unset, and names only have the
+    given locale. Stages, weapons and other keyed entities are shared between
+    the jobs decoded with the same locale.
+
+    :param data: the parsed JSON of the job
+    :type data: dict
+    :param fields: the projection, as returned by projectFields
+    :type fields: dict
+    :param locale: the locale to keep in names
+    :type locale: str
+    :return: the partly built job
+    :rtype: Job
+
+    :Example:
+
+    >>> import objects
+    >>> import ujson
+    >>> job = objects.decodeJob(
+    ...     ujson.loads(line), objects.projectFields(["stage name"]), "en_US"
+    ... )
+    >>> job.stage.name.en_US
+    'Ruins of Ark Polaris'
+
+    """
+    return projectObject(Job, data, fields, locale)
@@ -0,0 +1,341 @@
+import os
+import numpy as np
+from blocks import readBlockIndex, readJobsAfter
+from typing import Dict, Iterable, List, Optional, Set
+import ujson
+
+indexFields = (
+    "players",
+    "weapons",
+    "my_weapons",
+    "stages",
+    "rotations",
+    "events",
+    "tides",
+)
+rangeFields = (
+    "danger_rate",
+    "clear_waves",
+    "quota 0",
+    "quota 1",
+    "quota 2",
+    "my_data golden_egg_delivered",
+    "shift_start_at time",
+    "start_at time",
+)
+
+
+def jobKeys(job: dict) -> Dict[str, Set[str]]:
+    """
+    Find the keys a job holds for each of the indexFields.
+
+    :param job: one job, as parsed from its JSON line
+    :type job: dict
+    :return: the keys of each field, with rotations as the shift start time in seconds
+    :rtype: Dict[str, Set[str]]
+
+    """
+    keys: Dict[str, Set[str]] = {field: set() for field in indexFields}
+    players: List[dict] = [job["my_data"]] + (job.get("teammates") or [])
+    for player in players:
+        if player.get("splatnet_id") is not None:
+            keys["players"].add(player["splatnet_id"])
+        for weapon in player.get("weapons") or []:
+            if weapon is not None:
+                keys["weapons"].add(weapon["key"])
+    for weapon in job["my_data"].get("weapons") or []:
+        if weapon is not None:
+            keys["my_weapons"].add(weapon["key"])
+    if job.get("stage") is not None:
+        keys["stages"].add(job["stage"]["key"])
+    if job.get("shift_start_at") is not None:
+        keys["rotations"].add(str(job["shift_start_at"]["time"]))
+    for wave in job.get("waves") or []:
+        if wave.get("known_occurrence") is not None:
+            keys["events"].add(wave["known_occurrence"]["key"])
+        if wave.get("water_level") is not None:
+            keys["tides"].add(wave["water_level"]["key"])
+    return keys
+
+
+def jobValue(job: dict, stat: str) -> float:
+    """
+    Find the value of a numeric stat in a job.
+
+    :param job: one job, as parsed from its JSON line
+    :type job: dict
+    :param stat: the stat, as a space separated path such as "quota 0"
+    :type stat: str
+    :return: the value, or NaN if the job doesn't have it
+    :rtype: float
+
+    """
+    value = job
+    for step in stat.split():
+        if value is None:
+            return np.nan
+        if step.isdigit():
+            value = value[int(step)] if int(step) < len(value) else None
+        else:
+            value = value.get(step)
+    if value is None:
+        return np.nan
+    return float(value)
+
+
+class PostingIndex:
+    """
+    An index of a data file: posting lists for keys and sorted columns for ranges.
+
+    For every key of each of the indexFields, ``postings`` holds the sorted
+    positions in the data file of the jobs with that key, so a filter on keys is
+    answered by looking up, intersecting and joining posting lists instead of
+    reading the jobs. ``count``, ``size`` and ``mtime`` are the job count, byte
+    length and modification time in nanoseconds of the data file the index
+    covers, and ``lastId`` is the ID of its last job.
+
+    For each of the rangeFields, ``values`` holds the value of every job in
+    ascending order, with jobs that lack it last as NaN, and ``order`` holds the
+    position of the job each value came from. A range of values is found with
+    two binary searches.
+
+    """
+
+    __slots__ = ["count", "size", "mtime", "lastId", "postings", "values", "order"]
+
+    def __init__(self):
+        self.count: int = 0
+        self.size: int = 0
+        self.mtime: int = 0
+        self.lastId: Optional[int] = None
+        self.postings: Dict[str, Dict[str, np.ndarray]] = {
+            field: {} for field in indexFields
+        }
+        self.values: Dict[str, np.ndarray] = {
+            field: np.zeros(0, dtype=np.float64) for field in rangeFields
+        }
+        self.order: Dict[str, np.ndarray] = {
+            field: np.zeros(0, dtype=np.int32) for field in rangeFields
+        }
+
+    def lookup(self, field: str, key) -> np.ndarray:
+        """
+        Find the jobs with a key.
+
+        :param field: one of the indexFields
+        :type field: str
+        :param key: the key, such as a weapon key or a shift start time
+        :type key: Union[str, int]
+        :return: the sorted positions of the jobs in the data file
+        :rtype: np.ndarray
+
+        :Example:
+
+        >>> import postings
+        >>> index = postings.loadPostings("data/salmonAll.jl.gz")
+        >>> len(index.lookup("stages", "dam"))
+        287563
+
+        """
+        return self.postings[field].get(str(key), np.zeros(0, dtype=np.int32))
+
+    def between(
+        self,
+        field: str,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+        includeLow: bool = True,
+        includeHigh: bool = True,
+    ) -> np.ndarray:
+        """
+        Find the jobs whose value of a stat lies in a range.
+
+        :param field: one of the rangeFields
+        :type field: str
+        :param low: the lower bound, or None for no lower bound
+        :type low: Optional[float]
+        :param high: the upper bound, or None for no upper bound
+        :type high: Optional[float]
+        :param includeLow: whether a value equal to low is in the range
+        :type includeLow: bool
+        :param includeHigh: whether a value equal to high is in the range
+        :type includeHigh: bool
+        :return: the sorted positions of the jobs in the data file
+        :rtype: np.ndarray
+
+        :Example:
+
+        >>> import postings
+        >>> index = postings.loadPostings("data/salmonAll.jl.gz")
+        >>> len(index.between("danger_rate", 200, None))
+        402318
+
+        """
+        values: np.ndarray = self.values[field]
+        start: int = 0
+        stop: int = int(np.searchsorted(values, np.inf, "right"))
+        if low is not None:
+            start = int(np.searchsorted(values, low, "left" if includeLow else "right"))
+        if high is not None:
+            stop = int(
+                np.searchsorted(values, high, "right" if includeHigh else "left")
+            )
+        return np.sort(self.order[field][start:stop])
+
+    def extend(self, lines: Iterable[bytes]) -> None:
+        """
+        Add the jobs that follow the ones already indexed.
+
+        :param lines: the JSON lines of the new jobs, in file order
+        :type lines: Iterable[bytes]
+
+        """
+        added: Dict[str, Dict[str, List[int]]] = {field: {} for field in indexFields}
+        addedValues: Dict[str, List[float]] = {field: [] for field in rangeFields}
+        position: int = self.count
+        for line in lines:
+            job: dict = ujson.loads(line)
+            for field, keys in jobKeys(job).items():
+                for key in keys:
+                    added[field].setdefault(key, []).append(position)
+            for field in rangeFields:
+                addedValues[field].append(jobValue(job, field))
+            self.lastId = job["id"]
+            position += 1
+        first: int = self.count
+        self.count = position
+        for field in rangeFields:
+            values: np.ndarray = np.array(addedValues[field], dtype=np.float64)
+            order: np.ndarray = np.argsort(values, kind="stable")
+            at: np.ndarray = np.searchsorted(self.values[field], values[order], "right")
+            self.values[field] = np.insert(self.values[field], at, values[order])
+            self.order[field] = np.insert(
+                self.order[field], at, (order + first).astype(np.int32)
+            )
+        for field in indexFields:
+            postings: Dict[str, np.ndarray] = self.postings[field]
+            for key, positions in added[field].items():
+                new: np.ndarray = np.array(positions, dtype=np.int32)
+                if key in postings:
+                    new = np.concatenate((postings[key], new))
+                postings[key] = new
+
+
+def postingsPath(data: str) -> str:
+    return data[0:-6] + "Postings.npz"
+
+
+def savePostings(data: str, index: PostingIndex) -> None:
+    """
+    Atomically replace the stored index of a data file.
+
+    Each key field is stored as its keys, one array of every posting list back to
+    back, and where each key's list starts in it. Each range field is stored as
+    its sorted values and their positions. The arrays are compressed with zlib.
+
+    :param data: the full path of the data file
+    :type data: str
+    :param index: the index
+    :type index: PostingIndex
+
+    """
+    arrays: Dict[str, np.ndarray] = {
+        "count": np.array(index.count),
+        "size": np.array(index.size),
+        "mtime": np.array(index.mtime),
+        "last_id": np.array(-1 if index.lastId is None else index.lastId),
+    }
+    for field in rangeFields:
+        arrays[field + "_values"] = index.values[field]
+        arrays[field + "_order"] = index.order[field]
+    for field in indexFields:
+        keys: List[str] = sorted(index.postings[field])
+        lists: List[np.ndarray] = [index.postings[field][key] for key in keys]
+        arrays[field + "_keys"] = np.array(keys, dtype=np.str_)
+        arrays[field + "_offsets"] = np.cumsum(
+            [0] + [len(positions) for positions in lists], dtype=np.int64
+        )
+        arrays[field + "_positions"] = (
+            np.concatenate(lists) if len(lists) > 0 else np.zeros(0, dtype=np.int32)
+        )
+    with open(postingsPath(data) + ".tmp", "wb") as writer:
+        np.savez_compressed(writer, **arrays)
+    os.replace(postingsPath(data) + ".tmp", postingsPath(data))
+
+
+def readPostings(data: str) -> Optional[PostingIndex]:
+    """
+    Read the stored index of a data file.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the index, or None if there is none, it can't be read or it lacks a field
+    :rtype: Optional[PostingIndex]
+
+    """
+    try:
+        stored = np.load(postingsPath(data))
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+    index: PostingIndex = PostingIndex()
+    with stored:
+        if "mtime" not in stored or any(
+            field + "_values" not in stored for field in rangeFields
+        ):
+            return None
+        index.count = int(stored["count"])
+        index.size = int(stored["size"])
+        index.mtime = int(stored["mtime"])
+        lastId: int = int(stored["last_id"])
+        index.lastId = None if lastId < 0 else lastId
+        for field in rangeFields:
+            index.values[field] = stored[field + "_values"]
+            index.order[field] = stored[field + "_order"]
+        for field in indexFields:
+            offsets: List[int] = stored[field + "_offsets"].tolist()
+            positions: np.ndarray = stored[field + "_positions"]
+            index.postings[field] = {
+                key: positions[offsets[i] : offsets[i + 1]]
+                for i, key in enumerate(stored[field + "_keys"].tolist())
+            }
+    return index
+
+
+def loadPostings(data: str) -> PostingIndex:
+    """
+    Read the index of a data file, indexing the jobs added since it was stored.
+
+    The index is built from the whole file the first time. After that, only the
+    jobs appended since are read, so keeping it current costs as much as the
+    new jobs. The index is current while the size and modification time of the
+    file are unchanged. Otherwise it's built again from the whole file if the
+    file no longer starts with the jobs indexed, as after a fetch rewrote it.
+
+    :param data: the full path of the data file
+    :type data: str
+    :return: the index of every job in the file
+    :rtype: PostingIndex
+    :raises gzip.BadGzipFile: if the file exists but isn't a gzip file
+    :raises FileNotFoundError: if the file doesn't exist
+
+    """
+    source: os.stat_result = os.stat(data)
+    index: Optional[PostingIndex] = readPostings(data)
+    if (
+        index is not None
+        and index.size == source.st_size
+        and index.mtime == source.st_mtime_ns
+    ):
+        return index
+    blockIndex: Optional[dict] = readBlockIndex(data)
+    if index is None:
+        index = PostingIndex()
+    try:
+        index.extend(readJobsAfter(data, blockIndex, index.count, index.lastId))
+    except ValueError:
+        index = PostingIndex()
+        index.extend(readJobsAfter(data, blockIndex, 0, None))
+    index.size = source.st_size
+    index.mtime = source.st_mtime_ns
+    savePostings(data, index)
+    return index
@@ -0,0 +1,158 @@
+import operator
+import numpy as np
+from abc import ABC, abstractmethod
+from columns import JobColumns, getColumn
+from typing import Callable, Dict, Iterable, List, Optional
+
+comparisons: Dict[str, Callable] = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class Predicate(ABC):
+    """
+    A filter written as an expression over the columns of a data set.
+
+    Calling a predicate with a JobColumns evaluates the whole expression as NumPy
+    array operations, giving one boolean per job, so it can be passed to the
+    filters wherever they take a function of the header columns. Predicates
+    combine with ``&``, ``|`` and ``~``. A predicate that needs a column the
+    data set doesn't hold raises KeyError.
+
+    """
+
+    __slots__: List[str] = []
+
+    def __call__(self, columns: JobColumns) -> np.ndarray:
+        return self.mask(columns)
+
+    @abstractmethod
+    def mask(self, columns: JobColumns) -> np.ndarray:
+        pass
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return AllOf([self, other])
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return AnyOf([self, other])
+
+    def __invert__(self) -> "Predicate":
+        return Not(self)
+
+
+class HasKey(Predicate):
+    """
+    The jobs where any slot of a coded column holds one of the given keys.
+
+    ``player`` limits the check to one player's slots, 0 being the player who
+    uploaded the job and 1 to 3 the teammates.
+
+    :Example:
+
+    >>> import columns
+    >>> import predicates
+    >>> jobs = columns.loadColumnsFromFile("data/salmonAll.jl.gz")
+    >>> anyKuma = predicates.HasKey("weapons", "weapons", ["kuma_charger", "kuma_slosher"])
+    >>> kumaJobs = jobs.take(anyKuma(jobs))
+
+    """
+
+    __slots__ = ["column", "vocabulary", "keys", "player"]
+
+    def __init__(
+        self,
+        column: str,
+        vocabulary: str,
+        keys: Iterable[str],
+        player: Optional[int] = None,
+    ):
+        self.column: str = column
+        self.vocabulary: str = vocabulary
+        self.keys: List[str] = list(keys)
+        self.player: Optional[int] = player
+
+    def mask(self, columns: JobColumns) -> np.ndarray:
+        values: np.ndarray = columns[self.column]
+        if self.player is not None:
+            values = values[:, self.player]
+        codes: List[str] = columns.codes[self.vocabulary]
+        wanted: List[int] = [codes.index(key) for key in self.keys if key in codes]
+        hits: np.ndarray = np.isin(values, wanted)
+        return hits.reshape(len(values), -1).any(axis=1)
+
+
+class Compare(Predicate):
+    """
+    The jobs where a stat compares to a value with one of the comparisons.
+
+    """
+
+    __slots__ = ["stat", "comparison", "value"]
+
+    def __init__(self, stat: str, comparison: str, value: float):
+        self.stat: str = stat
+        self.comparison: str = comparison
+        self.value: float = value
+
+    def mask(self, columns: JobColumns) -> np.ndarray:
+        return comparisons[self.comparison](getColumn(columns, self.stat), self.value)
+
+
+class Between(Predicate):
+    """
+    The jobs where a stat lies between two values, including the lower one.
+
+    """
+
+    __slots__ = ["stat", "low", "high", "includeHigh"]
+
+    def __init__(self, stat: str, low: float, high: float, includeHigh: bool = True):
+        self.stat: str = stat
+        self.low: float = low
+        self.high: float = high
+        self.includeHigh: bool = includeHigh
+
+    def mask(self, columns: JobColumns) -> np.ndarray:
+        values: np.ndarray = getColumn(columns, self.stat)
+        if self.includeHigh:
+            return (values >= self.low) & (values <= self.high)
+        return (values >= self.low) & (values < self.high)
+
+
+class AllOf(Predicate):
+    __slots__ = ["predicates"]
+
+    def __init__(self, predicates: Iterable[Predicate]):
+        self.predicates: List[Predicate] = list(predicates)
+
+    def mask(self, columns: JobColumns) -> np.ndarray:
+        return np.logical_and.reduce(
+            [predicate.mask(columns) for predicate in self.predicates]
+        )
+
+
+class AnyOf(Predicate):
+    __slots__ = ["predicates"]
+
+    def __init__(self, predicates: Iterable[Predicate]):
+        self.predicates: List[Predicate] = list(predicates)
+
+    def mask(self, columns: JobColumns) -> np.ndarray:
+        return np.logical_or.reduce(
+            [predicate.mask(columns) for predicate in self.predicates]
+        )
+
+
+class Not(Predicate):
+    __slots__ = ["predicate"]
+
+    def __init__(self, predicate: Predicate):
+        self.predicate: Predicate = predicate
+
+    def mask(self, columns: JobColumns) -> np.ndarray:
+        return ~self.predicate.mask(columns)
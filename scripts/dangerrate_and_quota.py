@@ -4,10 +4,10 @@ import matplotlib.pyplot as plt
 import numpy
 from typing import List, cast, Union, Tuple
 import ujson
-import gzip
+from blocks import openJobs
 
 data = core.init("All", "data/")
-with gzip.open(data) as reader:
+with openJobs(data) as reader:
     dangerRates: List[float] = []
     quotas: Tuple[List[float], List[float], List[float]] = ([], [], [])
     count = 0
@@ -2,13 +2,11 @@ import sys
 
 sys.path.insert(0, ".")
 import core
-from objects import Job
-import ujson
-import gzip
+import columns
+import numpy as np
 from typing import Dict
 
-
-data = core.init("All", "data/")
+jobs: columns.JobColumns = columns.loadColumns(core.init("All", "data/"))
 eventDict: Dict[str, dict] = {
     "None": {"key": "none", "count": 0.0},
     "mothership": {"key": "mothership", "count": 0.0},
@@ -18,15 +16,11 @@ eventDict: Dict[str, dict] = {
     "griller": {"key": "griller", "count": 0.0},
     "goldie_seeking": {"key": "goldie_seeking", "count": 0.0},
 }
-total = 0.0
-with gzip.open(data) as reader:
-    for line in reader:
-        job = Job(**ujson.loads(line))
-        for wave in job.waves:
-            total += 1.0
-            if wave.known_occurrence is not None:
-                eventDict[wave.known_occurrence.key]["count"] += 1.0
-            else:
-                eventDict["None"]["count"] += 1.0
+waves: np.ndarray = jobs["water_level"] != -1
+events: np.ndarray = jobs["known_occurrence"]
+total = float(waves.sum())
+eventDict["None"]["count"] += float((waves & (events == -1)).sum())
+for code in range(0, len(jobs.codes["events"])):
+    eventDict[jobs.codes["events"][code]]["count"] += float((events == code).sum())
 for event in eventDict.values():
     print(event["key"] + ": " + str(event["count"] / total))
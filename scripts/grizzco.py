@@ -5,7 +5,7 @@ from scipy.stats import ttest_ind
 from typing import List, cast, Tuple, Optional
 import matplotlib.pyplot as plt
 import ujson
-import zlib
+from jobstore import decompressJob
 import filters
 
 dataFile: str = "data/salmonAll.jl.gz"  # core.init("All", "data/")
@@ -40,7 +40,7 @@ dangerRate: List[float] = []
 goldenTotal: List[float] = []
 powerTotal: List[float] = []
 for line in withVal:
-    job = Job(**ujson.loads(zlib.decompress(line)))
+    job = Job(**ujson.loads(decompressJob(withVal, line)))
     withValClearWaves.append(float(job.clear_waves))
     clearWaves.append(float(job.clear_waves))
     withValDangerRate.append(float(job.danger_rate))
@@ -50,7 +50,7 @@ for line in withVal:
     withValPowerTotal.append(float(job.my_data.power_egg_collected))
     powerTotal.append(float(job.my_data.power_egg_collected))
 for line in withoutVal:
-    job = Job(**ujson.loads(line))
+    job = Job(**ujson.loads(decompressJob(withoutVal, line)))
     withoutValClearWaves.append(float(job.clear_waves))
     clearWaves.append(float(job.clear_waves))
     withoutValDangerRate.append(float(job.danger_rate))
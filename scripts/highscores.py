@@ -1,7 +1,7 @@
 import core
 from objects import Job
 import ujson
-import gzip
+from blocks import openJobs
 
 data = core.init("User", "data/", ujson.load(open("keys.json"))["statink_key"])
 scoresDict: dict = {
@@ -64,7 +64,7 @@ for keyA in scoresDict:
                 "url": None,
             },
         }
-with gzip.open(data) as reader:
+with openJobs(data) as reader:
     for line in reader:
         job = Job(**ujson.loads(line))
         totalEggs = 0
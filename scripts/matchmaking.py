@@ -1,9 +1,11 @@
-from objects import Job
-import numpy as np
 import core
-from typing import List, Union, Tuple, Dict, cast
-import ujson
-import gzip
+from materialized import (
+    overviewAggregate,
+    playersAggregate,
+    refreshAggregate,
+)
+from sketches import Moments
+from typing import List, Dict, cast
 
 
 class PlayerData:
@@ -17,23 +19,20 @@ class PlayerData:
 
 
 # to solve the question, "is matchmaking based on rank?"
-dataFile: str = core.init("All", "data/")
+data: str = core.init("All", "data/")
 playersData: Dict[str, PlayerData] = {}
-dangerRates: List[float] = []
-with gzip.open(dataFile) as reader:
-    for line in reader:
-        job = Job(**ujson.loads(line))
-        userId = job.my_data.splatnet_id
-        dangerRates.append(float(job.danger_rate))
-        if userId not in playersData:
-            playersData[userId] = PlayerData(id)
-        playersData[userId].hazard_level_vals.append(float(job.danger_rate))
-        playersData[userId].count += 1
-dangerRateStd: float = np.std(dangerRates)
+for userId, user in refreshAggregate(data, playersAggregate).groups.items():
+    dangerRates: Moments = user["danger_rate"].moments
+    playersData[userId] = PlayerData(userId)
+    playersData[userId].count = dangerRates.count
+    playersData[userId].std = dangerRates.standardDeviation()
+dangerRateStd: float = (
+    refreshAggregate(data, overviewAggregate)
+    .groups["all"]["danger_rate"]
+    .moments.standardDeviation()
+)
 playersDataList: List[PlayerData] = list(playersData.values())
 with open("reports/player_hazard_level_standard_deviations.txt", "w") as writer:
-    for player in playersDataList:
-        player.std = np.std(player.hazard_level_vals)
     for player in sorted(playersDataList, key=lambda val: cast(float, val.std)):
         writer.write("ID: " + player.id + "\n")
         writer.write("Standard Deviation: " + str(player.std) + "\n")
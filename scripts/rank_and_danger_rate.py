@@ -4,12 +4,12 @@ import matplotlib.pyplot as plt
 import numpy
 from typing import List, cast, Union, Tuple
 import ujson
-import gzip
+from blocks import openJobs
 
 data = core.init("All", "data/")
 x = []
 y = []
-with gzip.open(data) as reader:
+with openJobs(data) as reader:
     for line in reader:
         job = Job(**ujson.loads(line))
         if job.title is not None:
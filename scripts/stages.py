@@ -1,33 +1,27 @@
 import core
-from core import locale
 from objects import Job
+from jobstore import JobBuffer, Selection, decompressJob
 import numpy as np
 from scipy.stats import ttest_ind
-from typing import List, cast, Tuple
+from typing import Dict, List, cast, Tuple
 import matplotlib.pyplot as plt
 import ujson
-import zlib
 import filters
 
 dataFile: str = core.init("All", "data")
-data: List[bytes] = core.loadJobsFromFile(dataFile)
-stageList: List[str] = []
-for line in data:
-    job: Job = Job(**ujson.loads(zlib.decompress(line)))
-    if job.stage is not None:
-        if not (getattr(job.stage.name, locale) in stageList):
-            stageList.append(getattr(job.stage.name, locale))
-listOfData: List[Tuple[List[bytes], List[bytes]]] = []
-for stage in stageList:
-    listOfData.append(
-        cast(Tuple[List[bytes], List[bytes]], filters.onStages("mem", data, [stage]))
-    )
+data: JobBuffer = core.loadJobsFromFile(dataFile)
+stages: Dict[str, Selection] = cast(
+    Dict[str, Selection], filters.partitionJobs("mem", data, "stages")
+)
+listOfData: List[Tuple[Selection, Selection]] = []
+for stage in stages.values():
+    listOfData.append((stage, ~stage))
 with open("reports/stages.txt", "w", encoding="utf-8") as writer:
     i: int = 1
     for stageFiles in listOfData:
         plt.figure(i)
-        withVal: List[bytes] = stageFiles[0]
-        withoutVal: List[bytes] = stageFiles[1]
+        withVal: Selection = stageFiles[0]
+        withoutVal: Selection = stageFiles[1]
         withValClearWaves: List[float] = []
         withValDangerRate: List[float] = []
         withValGoldenTotal: List[float] = []
@@ -41,7 +35,7 @@ with open("reports/stages.txt", "w", encoding="utf-8") as writer:
         goldenTotal: List[float] = []
         powerTotal: List[float] = []
         for line in withVal:
-            job = Job(**ujson.loads(zlib.decompress(line)))
+            job = Job(**ujson.loads(decompressJob(withVal, line)))
             withValClearWaves.append(float(job.clear_waves))
             clearWaves.append(float(job.clear_waves))
             withValDangerRate.append(float(job.danger_rate))
@@ -51,7 +45,7 @@ with open("reports/stages.txt", "w", encoding="utf-8") as writer:
             withValPowerTotal.append(float(job.my_data.power_egg_collected))
             powerTotal.append(float(job.my_data.power_egg_collected))
         for line in withoutVal:
-            job = Job(**ujson.loads(zlib.decompress(line)))
+            job = Job(**ujson.loads(decompressJob(withoutVal, line)))
             withoutValClearWaves.append(float(job.clear_waves))
             clearWaves.append(float(job.clear_waves))
             withoutValDangerRate.append(float(job.danger_rate))
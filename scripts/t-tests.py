@@ -7,8 +7,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from typing import List, Union, Tuple, cast
 import ujson
-import zlib
-
+from jobstore import decompressJob
 
 dataFile: str = core.init(
     "User", "data/", ujson.load(open("keys.json", "r"))["statink_key"]
@@ -63,13 +62,13 @@ withoutValDangerRate: List[float] = []
 withoutValGoldenTotal: List[float] = []
 withoutValPowerTotal: List[float] = []
 for line in withVal:
-    job = Job(**ujson.loads(zlib.decompress(line)))
+    job = Job(**ujson.loads(decompressJob(withVal, line)))
     withValClearWaves.append(float(job.clear_waves))
     withValDangerRate.append(float(job.danger_rate))
     withValGoldenTotal.append(float(job.my_data.golden_egg_delivered))
     withValPowerTotal.append(float(job.my_data.power_egg_collected))
 for line in withoutVal:
-    job = Job(**ujson.loads(zlib.decompress(line)))
+    job = Job(**ujson.loads(decompressJob(withoutVal, line)))
     withoutValClearWaves.append(float(job.clear_waves))
     withoutValDangerRate.append(float(job.danger_rate))
     withoutValGoldenTotal.append(float(job.my_data.golden_egg_delivered))
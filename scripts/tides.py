@@ -2,23 +2,21 @@ import sys
 
 sys.path.insert(0, ".")
 import core
-from objects import Job
-import ujson
-import gzip
+import columns
+import numpy as np
 from typing import Dict
 
-data = core.init("All", "data/")
+jobs: columns.JobColumns = columns.loadColumns(core.init("All", "data/"))
 tideDict: Dict[str, dict] = {
     "high": {"key": "high", "count": 0.0},
     "normal": {"key": "normal", "count": 0.0},
     "low": {"key": "low", "count": 0.0},
 }
-total = 0.0
-with gzip.open(data) as reader:
-    for line in reader:
-        job = Job(**ujson.loads(line))
-        for wave in job.waves:
-            total += 1.0
-            tideDict[wave.water_level.key]["count"] += 1.0
+waterLevels: np.ndarray = jobs["water_level"]
+total = float((waterLevels != -1).sum())
+for code in range(0, len(jobs.codes["water_levels"])):
+    tideDict[jobs.codes["water_levels"][code]]["count"] += float(
+        (waterLevels == code).sum()
+    )
 for tide in tideDict.values():
     print(tide["key"] + ": " + str(tide["count"] / total))
@@ -10,8 +10,7 @@ import pprint
 from itertools import combinations
 from scipy.stats import ttest_ind
 import numpy as np
-import zlib
-
+from jobstore import decompressJob
 
 dataFile = cast(str, core.init("All", "data/"))
 data = core.loadJobsFromFile(dataFile)
@@ -36,7 +35,7 @@ typeCombinations = combinations(typesList, 4)
 typeComboDict: dict = {}
 clear_waves: List[float] = []
 for line in data:
-    job = Job(**ujson.loads(zlib.decompress(line)))
+    job = Job(**ujson.loads(decompressJob(data, line)))
     clear_waves.append(float(job.clear_waves))
 clear_waves_std: float = np.std(clear_waves)
 for combo in typeCombinations:
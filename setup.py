@@ -7,8 +7,18 @@ setup(
     ext_modules=cythonize(
         [
             Extension("objects", ["objects.py", "objects.pxd"]),
+            Extension("columns", ["columns.py"]),
+            Extension("expressions", ["expressions.py"]),
+            Extension("predicates", ["predicates.py"]),
+            Extension("fetcher", ["fetcher.py"]),
+            Extension("blocks", ["blocks.py"]),
+            Extension("postings", ["postings.py"]),
+            Extension("jobstore", ["jobstore.py"]),
+            Extension("sketches", ["sketches.py"]),
+            Extension("materialized", ["materialized.py"]),
             Extension("core", ["core.py", "core.pxd"]),
             Extension("filters", ["filters.py", "filters.pxd"]),
+            Extension("aggregates", ["aggregates.py"]),
             Extension("main", ["main.py", "main.pxd"]),
             Extension("sort_by_stat", ["sort_by_stat.py", "sort_by_stat.pxd"]),
         ],
@@ -0,0 +1,296 @@
+import math
+import numpy as np
+from typing import Dict, List, Optional
+
+
+class Moments:
+    """
+    The count, sum, mean, variance, min and max of a stream of values, in constant memory.
+
+    The mean and variance are kept with Welford's method, so they stay accurate
+    however many values are added. Two Moments merge into the Moments of both
+    streams, so partial results from parts of a data set can be combined.
+
+    """
+
+    __slots__ = ["count", "total", "mean", "squares", "minimum", "maximum"]
+
+    def __init__(self):
+        self.count: float = 0.0
+        self.total: float = 0.0
+        self.mean: float = 0.0
+        self.squares: float = 0.0
+        self.minimum: float = math.inf
+        self.maximum: float = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1.0
+        self.total += value
+        delta: float = value - self.mean
+        self.mean += delta / self.count
+        self.squares += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: "Moments") -> None:
+        """
+        Add every value of another stream.
+
+        :param other: the moments of the other stream
+        :type other: Moments
+
+        """
+        if other.count == 0:
+            return
+        count: float = self.count + other.count
+        delta: float = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.squares += other.squares + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def variance(self) -> float:
+        return self.squares / self.count
+
+    def state(self) -> List[float]:
+        return [
+            self.count,
+            self.total,
+            self.mean,
+            self.squares,
+            self.minimum,
+            self.maximum,
+        ]
+
+    @staticmethod
+    def fromState(state: List[float]) -> "Moments":
+        moments: Moments = Moments()
+        (
+            moments.count,
+            moments.total,
+            moments.mean,
+            moments.squares,
+            moments.minimum,
+            moments.maximum,
+        ) = state
+        return moments
+
+    def standardDeviation(self) -> float:
+        return math.sqrt(self.variance())
+
+
+class QuantileSketch:
+    """
+    A KLL sketch of a stream of values, for quantiles in bounded memory.
+
+    Values are kept exactly until there are more than ``k`` of them. After that,
+    full levels are sorted and every other value is promoted to the level above,
+    where it stands for twice as many values, so the sketch holds about 3k values
+    however long the stream is. The rank of a quantile is then off by about 2/k
+    of the count at most, so a larger k trades memory for accuracy. Sketches with
+    the same k merge into the sketch of both streams.
+
+    :Example:
+
+    >>> import sketches
+    >>> sketch = sketches.QuantileSketch(200)
+    >>> for value in range(1000000):
+    ...     sketch.add(float(value))
+    ...
+    >>> abs(sketch.median() - 500000) < 10000
+    True
+
+    """
+
+    __slots__ = ["k", "levels", "flips", "size", "capacity"]
+
+    def __init__(self, k: int = 200):
+        self.k: int = k
+        self.levels: List[List[float]] = []
+        self.flips: List[bool] = []
+        self.size: int = 0
+        self.capacity: int = 0
+        self.grow()
+
+    def levelCapacity(self, level: int) -> int:
+        return (
+            int(math.ceil((2.0 / 3.0) ** (len(self.levels) - level - 1) * self.k)) + 1
+        )
+
+    def grow(self) -> None:
+        self.levels.append([])
+        self.flips.append(False)
+        self.capacity = sum(
+            self.levelCapacity(level) for level in range(0, len(self.levels))
+        )
+
+    def add(self, value: float) -> None:
+        self.levels[0].append(value)
+        self.size += 1
+        if self.size >= self.capacity:
+            self.compress()
+
+    def compress(self) -> None:
+        for level in range(0, len(self.levels)):
+            if len(self.levels[level]) >= self.levelCapacity(level):
+                if level + 1 >= len(self.levels):
+                    self.grow()
+                items: List[float] = sorted(self.levels[level])
+                kept: List[float] = items[0 : len(items) % 2]
+                items = items[len(items) % 2 :]
+                self.levels[level + 1] += items[int(self.flips[level]) :: 2]
+                self.flips[level] = not self.flips[level]
+                self.levels[level] = kept
+                self.size = sum(len(items) for items in self.levels)
+                if self.size < self.capacity:
+                    break
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Add every value of another stream.
+
+        :param other: the sketch of the other stream, made with the same k
+        :type other: QuantileSketch
+
+        """
+        while len(self.levels) < len(other.levels):
+            self.grow()
+        for level in range(0, len(other.levels)):
+            self.levels[level] += other.levels[level]
+        self.size = sum(len(items) for items in self.levels)
+        while self.size >= self.capacity:
+            self.compress()
+
+    def exact(self) -> bool:
+        return all(len(items) == 0 for items in self.levels[1:])
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Find the value at a fraction of the way through the sorted values.
+
+        :param fraction: the fraction, from 0 to 1
+        :type fraction: float
+        :return: the value, exact while the sketch holds every value, or NaN if it's empty
+        :rtype: float
+
+        """
+        if self.size == 0:
+            return math.nan
+        if self.exact():
+            return float(np.quantile(self.levels[0], fraction))
+        values: np.ndarray = np.concatenate(
+            [np.asarray(items, dtype=np.float64) for items in self.levels]
+        )
+        weights: np.ndarray = np.concatenate(
+            [np.full(len(items), 2.0**level) for level, items in enumerate(self.levels)]
+        )
+        order: np.ndarray = np.argsort(values, kind="stable")
+        ranks: np.ndarray = np.cumsum(weights[order])
+        position: int = int(np.searchsorted(ranks, fraction * ranks[-1], "left"))
+        return float(values[order][min(position, len(values) - 1)])
+
+    def median(self) -> float:
+        if self.size > 0 and self.exact():
+            return float(np.median(self.levels[0]))
+        return self.quantile(0.5)
+
+    def state(self) -> dict:
+        return {"k": self.k, "levels": self.levels, "flips": self.flips}
+
+    @staticmethod
+    def fromState(state: dict) -> "QuantileSketch":
+        sketch: QuantileSketch = QuantileSketch(state["k"])
+        while len(sketch.levels) < len(state["levels"]):
+            sketch.grow()
+        sketch.levels = [list(items) for items in state["levels"]]
+        sketch.flips = list(state["flips"])
+        sketch.size = sum(len(items) for items in sketch.levels)
+        return sketch
+
+
+class StatAccumulator:
+    """
+    The summary of one stat of a data set, gathered a job at a time in bounded memory.
+
+    A k of 0 keeps no quantile sketch, for stats that only need their moments,
+    such as counts of cleared jobs.
+
+    :Example:
+
+    >>> import sketches
+    >>> first = sketches.StatAccumulator()
+    >>> second = sketches.StatAccumulator()
+    >>> for value in (1.0, 2.0):
+    ...     first.add(value)
+    ...
+    >>> second.add(6.0)
+    >>> first.merge(second)
+    >>> first.summary()["mean"]
+    3.0
+
+    """
+
+    __slots__ = ["moments", "quantiles"]
+
+    def __init__(self, k: int = 200):
+        self.moments: Moments = Moments()
+        self.quantiles: Optional[QuantileSketch] = QuantileSketch(k) if k > 0 else None
+
+    def add(self, value: float) -> None:
+        self.moments.add(value)
+        if self.quantiles is not None:
+            self.quantiles.add(value)
+
+    def merge(self, other: "StatAccumulator") -> None:
+        self.moments.merge(other.moments)
+        if self.quantiles is not None and other.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+
+    def median(self) -> float:
+        if self.quantiles is None:
+            return math.nan
+        return self.quantiles.median()
+
+    def state(self) -> dict:
+        """
+        Find the state of the accumulator, as plain lists and dicts that can be stored as JSON.
+
+        :return: the state, which fromState turns back into an equal accumulator
+        :rtype: dict
+
+        """
+        return {
+            "moments": self.moments.state(),
+            "quantiles": self.quantiles.state() if self.quantiles is not None else None,
+        }
+
+    @staticmethod
+    def fromState(state: dict) -> "StatAccumulator":
+        accumulator: StatAccumulator = StatAccumulator(0)
+        accumulator.moments = Moments.fromState(state["moments"])
+        if state["quantiles"] is not None:
+            accumulator.quantiles = QuantileSketch.fromState(state["quantiles"])
+        return accumulator
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarise the values the way core.statSummary does.
+
+        :return: the min, max, count, median, standard deviation, mean and sum
+        :rtype: Dict[str, float]
+        :raises ZeroDivisionError: if no values were added
+
+        """
+        return {
+            "min_val": self.moments.minimum,
+            "max_val": self.moments.maximum,
+            "count": self.moments.count,
+            "median": self.median(),
+            "standard_deviation": self.moments.standardDeviation(),
+            "mean": self.moments.total / self.moments.count,
+            "sum": self.moments.total,
+        }
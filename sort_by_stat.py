@@ -1,16 +1,13 @@
 import core
-from core import (
-    hasJobs,
-    locale,
-    statSummary,
-)
-from objects import Job, Stage_WaterLevel_KnownOccurrence
+from core import locale
+from aggregates import GroupStats, groupStats
+from expressions import Expression
 import filters
 import requests
 import pprint
-from typing import Tuple, List, Dict, Union, cast
+from typing import List, Dict, Union, cast
 import ujson
-import zlib
+from jobstore import Selection
 
 
 def hasVal(var: List[Dict[str, str]], val) -> bool:
@@ -49,26 +46,21 @@ def sortWeapons(data, stat) -> None:
             cast(Dict[str, Dict[str, str]], new)
         )
     results: List[Dict[str, Union[str, float]]] = []
+    weapons: GroupStats = groupStats("mem", data, "weapons", stat)
     for weapon in weaponsList:
-        print(weapon["key"])
-        result: Dict[str, Union[str, float]] = {}
-        filterPaths: Tuple[List[bytes], List[bytes]] = cast(
-            Tuple[List[bytes], List[bytes]],
-            filters.hasWeapons("mem", data, cast(List[str], [weapon["main_ref"]])),
-        )
-        withVal: List[bytes] = filterPaths[0]
-        withoutVal: List[bytes] = filterPaths[1]
-        if hasJobs("mem", withVal) and not hasVal(
-            cast(List[Dict[str, str]], results), cast(str, weapon["main_ref"])
+        key: str = cast(str, weapon["main_ref"])
+        if (
+            weapons.count(key) > 0
+            and weapons.countWithout(key) > 0
+            and not hasVal(cast(List[Dict[str, str]], results), key)
         ):
-            if (hasJobs("mem", withVal)) and (hasJobs("mem", withoutVal)):
-                result["key"] = cast(str, weapon["main_ref"])
-                result["name"] = cast(Dict[str, str], weapon["name"])[locale]
-                result["value"] = (
-                    statSummary("mem", withVal, stat)[0]
-                    - statSummary("mem", withoutVal, stat)[0]
-                )
-                results.append(result)
+            results.append(
+                {
+                    "key": key,
+                    "name": cast(Dict[str, str], weapon["name"])[locale],
+                    "value": weapons.mean(key) - weapons.meanWithout(key),
+                }
+            )
     pprint.pprint(sorted(results, key=lambda val: val["value"]))
 
 
@@ -81,53 +73,10 @@ def sortStages(data, stat) -> None:
     :type stat: str
 
     """
-    stageDict: Dict[str, Dict[str, Union[str, float]]] = {}
+    stages: GroupStats = groupStats("mem", data, "stages", stat)
     stageList: List[Dict[str, Union[str, float]]] = []
-    for line in data:
-        job = Job(**ujson.loads(zlib.decompress(line)))
-        if job.has_stage():
-            if not (
-                getattr(cast(Stage_WaterLevel_KnownOccurrence, job.stage).name, locale)
-                in stageDict
-            ):
-                stageDict[
-                    getattr(
-                        cast(Stage_WaterLevel_KnownOccurrence, job.stage).name,
-                        locale,
-                    )
-                ] = {
-                    "name": getattr(
-                        cast(Stage_WaterLevel_KnownOccurrence, job.stage).name,
-                        locale,
-                    ),
-                    stat: 0.0,
-                    "count": 0.0,
-                }
-            cast(
-                Dict[str, float],
-                stageDict[
-                    getattr(
-                        cast(Stage_WaterLevel_KnownOccurrence, job.stage).name,
-                        locale,
-                    )
-                ],
-            )[stat] += cast(float, core.getValMultiDimensional(job, [stat]))
-            cast(
-                Dict[str, float],
-                stageDict[
-                    getattr(
-                        cast(Stage_WaterLevel_KnownOccurrence, job.stage).name,
-                        locale,
-                    )
-                ],
-            )["count"] += 1.0
-    for stage in stageDict.values():
-        stageList.append(
-            {
-                "name": stage["name"],
-                "value": cast(float, stage[stat]) / cast(float, stage["count"]),
-            }
-        )
+    for key in stages:
+        stageList.append({"name": stages.name(key, locale), "value": stages.mean(key)})
     pprint.pprint(sorted(stageList, key=lambda val: val["value"]))
 
 
@@ -140,29 +89,11 @@ def sortSpecial(data, stat) -> None:
     :type stat: str
 
     """
-    specialDict: Dict[str, Dict[str, Union[str, float]]] = {}
+    specials: GroupStats = groupStats("mem", data, "specials", stat)
     specialList: List[Dict[str, Union[str, float]]] = []
-    for line in data:
-        job = Job(**ujson.loads(zlib.decompress(line)))
-        if not (getattr(job.my_data.special.name, locale) in specialDict):
-            specialDict[getattr(job.my_data.special.name, locale)] = {
-                "name": getattr(job.my_data.special.name, locale),
-                stat: 0.0,
-                "count": 0.0,
-            }
-        cast(Dict[str, float], specialDict[getattr(job.my_data.special.name, locale)],)[
-            stat
-        ] += cast(float, core.getValMultiDimensional(job, [stat]))
-        cast(
-            Dict[str, float],
-            specialDict[getattr(job.my_data.special.name, locale)],
-        )["count"] += 1.0
-    for special in specialDict.values():
+    for key in specials:
         specialList.append(
-            {
-                "name": special["name"],
-                "value": cast(float, special[stat]) / cast(float, special["count"]),
-            }
+            {"name": specials.name(key, locale), "value": specials.mean(key)}
         )
     pprint.pprint(sorted(specialList, key=lambda val: val["value"]))
 
@@ -173,40 +104,30 @@ def sortRotation(data, stat) -> None:
 
     :param data: the data file name
     :type data: str
-    :param stat: the statistic to sort by
-    :type stat: str
+    :param stat: the statistic to sort by, as a stat expression such as "sum(team golden_egg_delivered)"
+    :type stat: Union[str, Expression]
 
     """
-    rotationList: List[int] = []
     rotationResultsList: List[
         Dict[str, Union[int, float, Union[None, Dict[str, Union[str, List[str]]]]]]
     ] = []
-    for line in data:
-        job = Job(**ujson.loads(zlib.decompress(line)))
-        if job.shift_start_at.time not in rotationList:
-            rotationList.append(job.shift_start_at.time)
-    for rotation in rotationList:
-        print(rotation)
-        result: Dict[
-            str, Union[int, float, Union[None, Dict[str, Union[str, List[str]]]]]
-        ] = {}
-        filterPaths: Tuple[List[bytes], List[bytes]] = cast(
-            Tuple[List[bytes], List[bytes]],
-            filters.duringRotationInts("mem", data, [rotation]),
-        )
-        withVal: List[bytes] = filterPaths[0]
-        withoutVal: List[bytes] = filterPaths[1]
-        if hasJobs("mem", withVal):
-            if (hasJobs("mem", withVal)) and (hasJobs("mem", withoutVal)):
-                result["name"] = rotation
-                result["data"] = core.findWeaponsAndStageByRotation(
-                    "mem", withVal, rotation
-                )
-                result["value"] = (
-                    statSummary("mem", withVal, stat)[0]
-                    - statSummary("mem", withoutVal, stat)[0]
-                )
-                rotationResultsList.append(result)
+    rotationStats: GroupStats = groupStats("mem", data, "rotations", stat)
+    jobs: Selection = data if isinstance(data, Selection) else Selection(data)
+    rotations: Dict[str, Selection] = cast(
+        Dict[str, Selection], filters.partitionJobs("mem", jobs, "rotations")
+    )
+    for key in rotationStats:
+        if rotationStats.countWithout(key) > 0:
+            rotation: int = int(key)
+            rotationResultsList.append(
+                {
+                    "name": rotation,
+                    "data": core.findWeaponsAndStageByRotation(
+                        "mem", rotations[key], rotation
+                    ),
+                    "value": rotationStats.mean(key) - rotationStats.meanWithout(key),
+                }
+            )
     pprint.pprint(
         sorted(rotationResultsList, key=lambda val: cast(float, val["value"]))
     )
@@ -0,0 +1,71 @@
+import gzip
+import threading
+import ujson
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+"""
+A local stand-in for the stat.ink salmon listing, serving synthetic jobs over HTTP.
+
+"""
+
+
+class StatInkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        server: StatInkStandIn = self.server
+        query: Dict[str, str] = {
+            key: values[0]
+            for key, values in parse_qs(urlparse(self.path).query).items()
+        }
+        server.requests.append(query)
+        newerThan: int = int(query.get("newer_than", 0))
+        olderThan: int = int(query.get("older_than", 2**62))
+        jobs: List[dict] = [
+            job for job in server.jobs if newerThan < job["id"] < olderThan
+        ]
+        if query.get("order") == "desc":
+            jobs = jobs[::-1]
+        body: bytes = ujson.dumps(jobs[0 : server.pageSize]).encode()
+        compressed: bool = "gzip" in self.headers.get("Accept-Encoding", "")
+        if compressed:
+            body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class StatInkStandIn(ThreadingHTTPServer):
+    """
+    Serve ``jobs`` in pages of ``pageSize``, honouring order, newer_than and older_than.
+
+    Every request's query is kept in ``requests``. ``url`` is the base URL to
+    pass to core.init.
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, jobs: List[dict], pageSize: int = 50):
+        super().__init__(("127.0.0.1", 0), StatInkHandler)
+        self.jobs: List[dict] = jobs
+        self.pageSize: int = pageSize
+        self.requests: List[Dict[str, str]] = []
+        self.url: str = "http://127.0.0.1:{}/api/v2/".format(self.server_address[1])
+        self.thread: threading.Thread = threading.Thread(
+            target=self.serve_forever, daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
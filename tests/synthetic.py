@@ -0,0 +1,202 @@
+import gzip
+import random
+import ujson
+from typing import Dict, List, Optional
+
+"""
+Synthetic stat.ink Salmon Run jobs, shaped like the API's, for the tests.
+
+"""
+
+locales: List[str] = [
+    "de_DE",
+    "en_GB",
+    "en_US",
+    "es_ES",
+    "es_MX",
+    "fr_CA",
+    "fr_FR",
+    "it_IT",
+    "ja_JP",
+    "nl_NL",
+    "ru_RU",
+    "zh_CN",
+    "zh_TW",
+]
+stages: List[str] = ["dam", "donburako", "polaris", "shaketoba", "tokishirazu"]
+weapons: List[str] = [
+    "sshooter",
+    "splatcharger",
+    "kuma_charger",
+    "hokusai",
+    "bamboo14mk1",
+    "dualsweeper",
+    "carbon",
+    "barrel",
+]
+specials: List[str] = ["jetpack", "chakuchi", "pitcher", "presser"]
+tides: List[str] = ["low", "normal", "high"]
+events: List[Optional[str]] = [
+    None,
+    "rush",
+    "fog",
+    "goldie_seeking",
+    "griller",
+    "mothership",
+    "cohock_charge",
+]
+players: List[str] = ["p{:02d}".format(i) for i in range(0, 20)]
+
+
+def name(text: str) -> Dict[str, str]:
+    return {
+        locale: text if locale.startswith("en") else text + "_" + locale
+        for locale in locales
+    }
+
+
+def entity(key: str) -> dict:
+    return {"key": key, "splatnet": 1, "name": name(key.title())}
+
+
+def time(seconds: int) -> dict:
+    return {"time": seconds, "iso8601": "2020-09-15T00:00:00+00:00"}
+
+
+def boss() -> dict:
+    return {
+        "key": "goldie",
+        "splatnet": 3,
+        "splatnet_str": "sakelien-golden",
+        "name": name("Goldie"),
+    }
+
+
+def player(splatnetId: str, weaponCount: int, rng: random.Random) -> dict:
+    return {
+        "splatnet_id": splatnetId,
+        "name": "N" + splatnetId,
+        "special": entity(rng.choice(specials)),
+        "rescue": rng.randint(0, 5),
+        "death": rng.randint(0, 5),
+        "golden_egg_delivered": rng.randint(0, 30),
+        "power_egg_collected": rng.randint(100, 2000),
+        "species": {"key": "inkling", "name": name("Inkling")},
+        "gender": {"key": "boy", "iso5218": 1, "name": name("Boy")},
+        "special_uses": [rng.randint(0, 1) for _ in range(0, weaponCount)],
+        "weapons": [entity(rng.choice(weapons)) for _ in range(0, weaponCount)],
+        "boss_kills": [{"boss": boss(), "count": rng.randint(0, 3)}],
+    }
+
+
+def job(jobId: int, rng: random.Random) -> dict:
+    """
+    Make one job.
+
+    Every seventh job starts a new rotation, every eleventh has no stage, and
+    some have two teammates or none.
+
+    :param jobId: the ID of the job
+    :type jobId: int
+    :param rng: the random number generator to draw the stats from
+    :type rng: random.Random
+    :return: the job, as the stat.ink API returns it
+    :rtype: dict
+
+    """
+    clearWaves: int = rng.randint(0, 3)
+    waveCount: int = min(clearWaves + 1, 3)
+    rotation: int = 1600000000 + (jobId // 7) * 3600
+    ids: List[str] = rng.sample(players, 4)
+    teammates: Optional[int] = rng.choice([3, 3, 3, 2, None])
+    title: dict = entity("profreshional")
+    title["generic_name"] = name("Profreshional")
+    waves: List[dict] = []
+    for _ in range(0, waveCount):
+        event: Optional[str] = rng.choice(events)
+        waves.append(
+            {
+                "known_occurrence": entity(event) if event is not None else None,
+                "water_level": entity(rng.choice(tides)),
+                "golden_egg_quota": 10,
+                "golden_egg_appearances": 20,
+                "golden_egg_delivered": rng.randint(5, 25),
+                "power_egg_collected": 500,
+            }
+        )
+    return {
+        "id": jobId,
+        "uuid": "u" + str(jobId),
+        "splatnet_number": jobId,
+        "url": "https://stat.ink/@u/salmon/" + str(jobId),
+        "api_endpoint": "https://stat.ink/api/v2/salmon/" + str(jobId),
+        "user": {
+            "id": 1,
+            "name": "u",
+            "screen_name": "u",
+            "url": "https://stat.ink/@u",
+            "salmon_url": "https://stat.ink/@u/salmon",
+            "battle_url": "https://stat.ink/@u/spl2",
+            "join_at": time(1),
+            "profile": {
+                "nnid": None,
+                "friend_code": None,
+                "twitter": None,
+                "ikanakama": None,
+                "ikanakama2": None,
+                "environment": None,
+            },
+            "stats": {
+                "work_count": 1,
+                "total_golden_eggs": 1,
+                "total_eggs": 1,
+                "total_rescued": 1,
+                "total_point": 1,
+                "as_of": time(1),
+                "registered_at": time(1),
+            },
+        },
+        "stage": entity(stages[(jobId // 7) % len(stages)]) if jobId % 11 else None,
+        "is_cleared": clearWaves == 3,
+        "fail_reason": (
+            None if clearWaves == 3 else {"key": "wipe_out", "name": name("Wipe out")}
+        ),
+        "clear_waves": clearWaves,
+        "danger_rate": "{:.1f}".format(rng.randint(0, 400) / 2),
+        "quota": [rng.randint(3, 25) for _ in range(0, 3)],
+        "title": title,
+        "title_exp": 100,
+        "title_after": title,
+        "title_exp_after": 120,
+        "boss_appearances": [{"boss": boss(), "count": 3}],
+        "waves": waves,
+        "my_data": player(ids[0], waveCount, rng),
+        "teammates": (
+            None
+            if teammates is None
+            else [
+                player(splatnetId, waveCount, rng)
+                for splatnetId in ids[1 : 1 + teammates]
+            ]
+        ),
+        "agent": {"name": "splatnet2statink", "version": "1.5.0"},
+        "automated": True,
+        "note": None,
+        "link_url": None,
+        "shift_start_at": time(rotation),
+        "start_at": time(rotation + jobId),
+        "end_at": time(rotation + jobId + 1) if jobId % 3 else None,
+        "register_at": time(rotation + jobId + 2),
+    }
+
+
+def makeJobs(count: int, first: int = 1, seed: int = 0) -> List[dict]:
+    rng: random.Random = random.Random(seed)
+    return [job(jobId, rng) for jobId in range(first, first + count)]
+
+
+def writeJobs(path: str, jobs: List[dict]) -> str:
+    with gzip.open(path, "wt", encoding="utf8") as writer:
+        for item in jobs:
+            writer.write(ujson.dumps(item) + "\n")
+    return path
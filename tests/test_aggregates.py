@@ -0,0 +1,26 @@
+import aggregates
+import core
+import synthetic
+
+
+def test_group_stats_skip_none_fail_reason(tmp_path):
+    jobs = synthetic.makeJobs(20)
+    jobs[5]["clear_waves"] = 1
+    jobs[5]["fail_reason"] = "None"
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), jobs)
+    wipedOut = sum(1 for job in jobs if isinstance(job["fail_reason"], dict))
+    for location, source in (
+        ("disk", data),
+        ("mem", core.loadJobsFromFile(data)),
+        ("mem", core.loadJobsFromFile(data, header=True)),
+    ):
+        stats = aggregates.groupStats(location, source, "fail_reasons", "clear_waves")
+        assert list(stats) == ["wipe_out"]
+        assert stats.count("wipe_out") == wipedOut
+        assert stats.countWithout("wipe_out") == 20 - wipedOut
+
+
+def test_key_names_skip_none_fail_reason():
+    job = synthetic.makeJobs(1)[0]
+    job["fail_reason"] = "None"
+    assert aggregates.keyNames(job, "fail_reasons") == {}
@@ -0,0 +1,28 @@
+import blocks
+import core
+import os
+import synthetic
+
+
+def test_reads_leave_the_file_alone(tmp_path):
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), synthetic.makeJobs(30))
+    core.writeDataManifest(data, {"last_id": 30, "count": 30, "size": 0})
+    with open(data, "rb") as reader:
+        before = reader.read()
+    assert core.getSingleJob(data, 12).id == 13
+    assert core.getSingleJob(data, 30) is None
+    assert core.getJobById(data, 25).id == 25
+    assert core.getJobById(data, 31) is None
+    with open(data, "rb") as reader:
+        assert reader.read() == before
+    assert not os.path.exists(blocks.blockIndexPath(data))
+    assert os.path.exists(core.dataManifestPath(data))
+
+
+def test_reads_use_the_block_index(tmp_path):
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), synthetic.makeJobs(30))
+    assert core.blockDataFile(data, 8)["count"] == 30
+    assert core.getSingleJob(data, 12).id == 13
+    assert core.getSingleJob(data, 30) is None
+    assert core.getJobById(data, 25).id == 25
+    assert core.getJobById(data, 31) is None
@@ -0,0 +1,51 @@
+import columns
+import core
+import filters
+import numpy as np
+import pytest
+import synthetic
+import ujson
+
+
+def noneFailReasonFile(tmp_path) -> str:
+    jobs = synthetic.makeJobs(20)
+    jobs[5]["clear_waves"] = 1
+    jobs[5]["fail_reason"] = "None"
+    return synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), jobs)
+
+
+def test_none_fail_reason_is_missing(tmp_path):
+    data = noneFailReasonFile(tmp_path)
+    for jobs in (columns.loadColumnsFromFile(data), columns.loadColumns(data)):
+        assert len(jobs) == 20
+        assert jobs["fail_reason"][5] == -1
+        assert "None" not in jobs.codes["fail_reasons"]
+
+
+def test_none_fail_reason_in_header(tmp_path):
+    jobs = core.loadJobsFromFile(noneFailReasonFile(tmp_path), header=True)
+    assert len(jobs) == 20
+    assert jobs.header["fail_reason"][5] == -1
+    wipedOut, rest = filters.failReasons("mem", jobs, ["wipe_out"])
+    assert len(wipedOut) + len(rest) == 20
+    assert 6 in [ujson.loads(core.decompressJob(rest, line))["id"] for line in rest]
+
+
+def test_unknown_weapon_matches_no_job(tmp_path):
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), synthetic.makeJobs(50))
+    jobs = columns.loadColumnsFromFile(data)
+    assert jobs.code("weapons", "no_such_weapon", core.locale) == -1
+    assert (jobs["weapons"][:, 0, :] == -1).any()
+    with pytest.raises(ZeroDivisionError):
+        core.waveClearPercentageWithWeapon("columns", jobs, "no_such_weapon")
+
+
+def test_weapon_clear_percentage_matches_disk(tmp_path):
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), synthetic.makeJobs(50))
+    expected = core.waveClearPercentageWithWeapon("disk", data, "sshooter")
+    assert np.isclose(
+        core.waveClearPercentageWithWeapon(
+            "columns", columns.loadColumnsFromFile(data), "sshooter"
+        ),
+        expected,
+    )
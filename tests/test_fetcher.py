@@ -0,0 +1,56 @@
+import blocks
+import core
+import fetcher
+import pytest
+import synthetic
+import ujson
+from standin import StatInkStandIn
+
+
+@pytest.fixture
+def server():
+    standIn = StatInkStandIn(synthetic.makeJobs(120))
+    yield standIn
+    standIn.stop()
+
+
+def storedIds(data: str) -> list:
+    with blocks.openJobs(data) as reader:
+        return [ujson.loads(line)["id"] for line in reader]
+
+
+def test_fetch_pages_in_ascending_order(server, capsys):
+    pages = list(
+        fetcher.fetchPages(server.url + "salmon", {"order": "asc", "newer_than": "30"})
+    )
+    assert [len(page) for page in pages] == [50, 40]
+    assert capsys.readouterr().out == ""
+    assert [job["id"] for page in pages for job in page] == list(range(31, 121))
+
+
+def test_latest_id(server):
+    assert fetcher.latestId(server.url + "salmon") == 120
+
+
+def test_init_fetches_only_new_jobs(server, tmp_path):
+    dataPath = str(tmp_path) + "/"
+    data = core.init("All", dataPath, base_url=server.url)
+    assert storedIds(data) == list(range(1, 121))
+    server.jobs += synthetic.makeJobs(30, first=121, seed=1)
+    server.requests.clear()
+    assert core.init("All", dataPath, base_url=server.url) == data
+    assert server.requests[0]["newer_than"] == "120"
+    assert storedIds(data) == list(range(1, 151))
+    assert core.readDataManifest(data)["last_id"] == 150
+
+
+def test_backfill_joins_ranges_in_order(server, tmp_path):
+    data = core.init("All", str(tmp_path) + "/", base_url=server.url, shards=3)
+    assert storedIds(data) == list(range(1, 121))
+    assert blocks.readBlockIndex(data)["count"] == 120
+    ranges = [
+        (query["newer_than"], query["older_than"])
+        for query in server.requests
+        if "older_than" in query
+    ]
+    assert ("0", "41") in ranges and ("80", "121") in ranges
@@ -0,0 +1,54 @@
+import columns
+import core
+import filters
+import pytest
+import synthetic
+import ujson
+
+
+def test_partition_skips_none_fail_reason(tmp_path):
+    jobs = synthetic.makeJobs(20)
+    jobs[5]["clear_waves"] = 1
+    jobs[5]["fail_reason"] = "None"
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), jobs)
+    wipedOut = sum(1 for job in jobs if isinstance(job["fail_reason"], dict))
+    memory = filters.partitionJobs("mem", core.loadJobsFromFile(data), "fail_reasons")
+    assert list(memory) == ["wipe_out"]
+    assert len(memory["wipe_out"]) == wipedOut
+    disk = filters.partitionJobs("disk", data, "fail_reasons")
+    assert list(disk) == ["wipe_out"]
+    with filters.openJobs(disk["wipe_out"]) as reader:
+        assert len(list(reader)) == wipedOut
+
+
+def startTimes(jobs, source):
+    return sorted(
+        ujson.loads(core.decompressJob(jobs, line))["start_at"]["time"]
+        for line in source
+    )
+
+
+def test_time_window_on_columns(tmp_path):
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), synthetic.makeJobs(50))
+    times = sorted(job["start_at"]["time"] for job in synthetic.makeJobs(50))
+    start, end = times[10], times[30]
+    jobs = columns.loadColumnsFromFile(data)
+    inside, outside = filters.duringTimeWindow("columns", jobs, start, end)
+    assert sorted(inside["start_at"].tolist()) == times[10:30]
+    assert len(inside) + len(outside) == 50
+    assert filters.duringTimeWindow("columns", jobs, 0, 2**40)[0]["id"].tolist() == [
+        job["id"] for job in synthetic.makeJobs(50)
+    ]
+    for memory in (
+        core.loadJobsFromFile(data),
+        core.loadJobsFromFile(data, header=True),
+    ):
+        inside, outside = filters.duringTimeWindow("mem", memory, start, end)
+        assert startTimes(memory, inside) == times[10:30]
+
+
+def test_columns_without_the_filtered_column(tmp_path):
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), synthetic.makeJobs(20))
+    jobs = columns.loadColumnsFromFile(data)
+    with pytest.raises(KeyError):
+        filters.filterJobs("columns", jobs, lambda job: True, "all")
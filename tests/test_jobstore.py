@@ -0,0 +1,16 @@
+import jobstore
+
+
+def test_lines_outlive_appends():
+    jobs = jobstore.JobBuffer()
+    jobs.append(b"abc")
+    first = jobs[0]
+    jobs.append(b"def")
+    kept = list(jobs)
+    jobs.extend(jobs[0:2])
+    selected = jobstore.Selection(jobs, [1, 3])
+    for line in selected:
+        jobs.append(line)
+    assert first == b"abc"
+    assert kept == [b"abc", b"def"]
+    assert list(jobs) == [b"abc", b"def", b"abc", b"def", b"def", b"def"]
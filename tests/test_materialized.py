@@ -0,0 +1,61 @@
+import columns
+import core
+import materialized
+import os
+import synthetic
+
+
+def clearWaves(aggregate):
+    moments = aggregate.groups["all"]["clear_waves"].moments
+    return moments.count, moments.total
+
+
+def test_rewritten_blocked_file_is_folded_again(tmp_path):
+    data = str(tmp_path / "salmon.jl.gz")
+    synthetic.writeJobs(data, synthetic.makeJobs(30))
+    core.blockDataFile(data, 8)
+    assert (
+        materialized.refreshAggregate(data, materialized.overviewAggregate).count == 30
+    )
+    synthetic.writeJobs(data, synthetic.makeJobs(40, first=100, seed=1))
+    core.blockDataFile(data, 8)
+    refreshed = materialized.refreshAggregate(data, materialized.overviewAggregate)
+    assert (refreshed.count, refreshed.lastId) == (40, 139)
+    fresh = materialized.MaterializedAggregate(materialized.overviewAggregate)
+    materialized.foldFile(data, fresh, core.readBlockIndex(data))
+    assert clearWaves(refreshed) == clearWaves(fresh)
+
+
+def test_appended_blocked_file_is_folded_in(tmp_path):
+    data = str(tmp_path / "salmon.jl.gz")
+    jobs = synthetic.makeJobs(40)
+    synthetic.writeJobs(data, jobs[0:30])
+    core.blockDataFile(data, 8)
+    materialized.refreshAggregate(data, materialized.overviewAggregate)
+    synthetic.writeJobs(data, jobs)
+    core.blockDataFile(data, 8)
+    refreshed = materialized.refreshAggregate(data, materialized.overviewAggregate)
+    assert (refreshed.count, refreshed.lastId) == (40, 40)
+    assert clearWaves(refreshed)[1] == sum(job["clear_waves"] for job in jobs)
+
+
+def test_empty_overview(tmp_path):
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), [])
+    assert core.getOverview("disk", data) == data + "\nJobs: 0\n"
+    assert core.getOverview("mem", core.loadJobsFromFile(data)) == "Jobs: 0\n"
+    assert core.getOverview("columns", columns.loadColumnsFromFile(data)) == "Jobs: 0\n"
+
+
+def test_rewritten_file_is_folded_again(tmp_path):
+    data = str(tmp_path / "salmon.jl.gz")
+    synthetic.writeJobs(data, synthetic.makeJobs(30))
+    materialized.refreshAggregate(data, materialized.overviewAggregate)
+    synthetic.writeJobs(data, synthetic.makeJobs(30, first=100, seed=1))
+    stored = materialized.readAggregate(data, materialized.overviewAggregate)
+    stored.size = os.path.getsize(data)
+    materialized.saveAggregate(data, stored)
+    refreshed = materialized.refreshAggregate(data, materialized.overviewAggregate)
+    assert (refreshed.count, refreshed.lastId) == (30, 129)
+    fresh = materialized.MaterializedAggregate(materialized.overviewAggregate)
+    materialized.foldFile(data, fresh, None)
+    assert clearWaves(refreshed) == clearWaves(fresh)
@@ -0,0 +1,50 @@
+import gc
+import objects
+import synthetic
+import tracemalloc
+
+
+def tracedJobs(raw) -> int:
+    objects.registry.clear()
+    gc.collect()
+    tracemalloc.start()
+    jobs = [objects.Job(**job) for job in raw]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(jobs) == len(raw)
+    return size
+
+
+def test_jobs_share_entities():
+    jobs = [objects.Job(**job) for job in synthetic.makeJobs(500)]
+    stages = {}
+    weapons = {}
+    for job in jobs:
+        if job.stage is not None:
+            assert stages.setdefault(job.stage.key, job.stage) is job.stage
+        for weapon in job.my_data.weapons:
+            assert weapons.setdefault(weapon.key, weapon) is weapon
+    assert len(stages) == len(synthetic.stages)
+
+
+def test_interning_shrinks_synthetic_jobs(monkeypatch):
+    raw = synthetic.makeJobs(500)
+    shared = tracedJobs(raw)
+    monkeypatch.setattr(objects, "internEntity", lambda cls, data: cls(**data))
+    unshared = tracedJobs(raw)
+    assert shared < unshared / 2
+
+
+def test_decoded_jobs_share_entities():
+    raw = synthetic.makeJobs(2)
+    fields = objects.projectFields(["stage key", "my_data weapons"])
+    first, second = (objects.decodeJob(job, fields, "en_US") for job in raw)
+    whole = objects.decodeJob(raw[0], True, "en_US")
+    other = objects.decodeJob(raw[0], fields, "ja_JP")
+    assert first.stage is whole.stage
+    assert first.stage.name.en_US is not None
+    assert other.stage is not first.stage
+    assert other.stage.name.ja_JP is not None
+    weapons = {weapon.key: weapon for weapon in first.my_data.weapons}
+    for weapon in second.my_data.weapons:
+        assert weapons.setdefault(weapon.key, weapon) is weapon
@@ -0,0 +1,42 @@
+import core
+import os
+import postings
+import synthetic
+
+
+def freshPostings(data):
+    os.remove(postings.postingsPath(data))
+    return postings.loadPostings(data)
+
+
+def samePostings(index, fresh):
+    assert (index.count, index.lastId) == (fresh.count, fresh.lastId)
+    for field in postings.indexFields:
+        assert sorted(index.postings[field]) == sorted(fresh.postings[field])
+        for key, positions in fresh.postings[field].items():
+            assert index.postings[field][key].tolist() == positions.tolist()
+
+
+def test_rewritten_file_is_indexed_again(tmp_path):
+    data = str(tmp_path / "salmon.jl.gz")
+    synthetic.writeJobs(data, synthetic.makeJobs(30))
+    assert postings.loadPostings(data).count == 30
+    synthetic.writeJobs(data, synthetic.makeJobs(30, first=100, seed=1))
+    index = postings.loadPostings(data)
+    assert index.lastId == 129
+    samePostings(index, freshPostings(data))
+
+
+def test_compacted_file_is_not_indexed_twice(tmp_path):
+    data = str(tmp_path / "salmon.jl.gz")
+    jobs = synthetic.makeJobs(40)
+    synthetic.writeJobs(data, jobs[0:30])
+    postings.loadPostings(data)
+    synthetic.writeJobs(data, jobs)
+    core.blockDataFile(data, 8)
+    index = postings.loadPostings(data)
+    assert (index.count, index.lastId) == (40, 40)
+    samePostings(index, freshPostings(data))
+    core.compactBlocks(data, core.readBlockIndex(data))
+    index = postings.loadPostings(data)
+    samePostings(index, freshPostings(data))
@@ -0,0 +1,20 @@
+import columns
+import predicates
+import pytest
+import synthetic
+
+
+def test_predicate_is_abstract():
+    with pytest.raises(TypeError):
+        predicates.Predicate()
+
+
+def test_predicates_combine(tmp_path):
+    data = synthetic.writeJobs(str(tmp_path / "salmon.jl.gz"), synthetic.makeJobs(50))
+    jobs = columns.loadColumnsFromFile(data)
+    cleared = predicates.Compare("clear_waves", "=", 3)
+    polaris = predicates.HasKey("stage", "stages", ["polaris"])
+    both = (cleared & polaris)(jobs)
+    assert (both == (cleared(jobs) & polaris(jobs))).all()
+    assert ((~cleared)(jobs) == ~cleared(jobs)).all()
+    assert not hasattr(cleared, "__dict__")